@@ -0,0 +1,454 @@
+"""
+Response cache for analytics and recommendation endpoints.
+
+Results are cached per endpoint and normalized query parameters, with a TTL and a
+set of tags (``hotel:<id>``, ``city:<name>``, ``events``, ``historical``). Price,
+hotel, event and historical-data changes committed through `SessionLocal`
+invalidate the matching tags, so dashboards see fresh numbers as soon as a scrape
+lands and cached ones the rest of the time.
+
+Configuration (environment):
+    ANALYTICS_CACHE_BACKEND       memory (default), sqlite or none
+    ANALYTICS_CACHE_PATH          sqlite file shared by all workers on the host
+                                  (default analytics_cache.db in DATA_DIR)
+    ANALYTICS_CACHE_TTL           default TTL in seconds (300)
+    ANALYTICS_CACHE_MAX_ENTRIES   maximum number of cached responses (1024)
+"""
+
+import functools
+import hashlib
+import inspect as pyinspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.database import DATA_DIR, SessionLocal
+from app.models.event import Event
+from app.models.historical_data import HistoricalData
+from app.models.hotel import Hotel, HotelPrice
+from app.services import hotel_locations
+from app.services.cities import alias_keys, normalize_key
+
+CACHE_BACKEND = os.getenv("ANALYTICS_CACHE_BACKEND", "memory")
+CACHE_PATH = os.getenv("ANALYTICS_CACHE_PATH", os.path.join(DATA_DIR, "analytics_cache.db"))
+DEFAULT_TTL = int(os.getenv("ANALYTICS_CACHE_TTL", "300"))
+MAX_ENTRIES = int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "1024"))
+
+CITY_TAG_PREFIX = "city:"
+
+
+def hotel_tag(hotel_id: int) -> str:
+    return f"hotel:{hotel_id}"
+
+
+def city_tag(city: str) -> str:
+    return f"{CITY_TAG_PREFIX}{normalize_key(city)}"
+
+
+def _city_tags_matching(tags: Iterable[str], cities: Iterable[str]) -> Set[str]:
+    """
+    City tags to drop for changes in `cities`.
+
+    City filters match every city with a key containing the requested one (see
+    `cities.matching_ids`), so a response cached for "par" covers Paris: a city tag
+    matches when its value is contained in the changed city's name or alias keys.
+    """
+    keys = [normalize_key(city) for city in cities if city]
+    return {
+        tag for tag in tags
+        if tag.startswith(CITY_TAG_PREFIX) and any(tag[len(CITY_TAG_PREFIX):] in key for key in keys)
+    }
+
+
+class CacheBackend:
+    """Interface shared by the cache backends."""
+
+    name = "base"
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: int, tags: Iterable[str]):
+        raise NotImplementedError
+
+    def invalidate(self, tags: Iterable[str], cities: Iterable[str] = ()) -> int:
+        """Drop entries carrying any of `tags` or a city tag matching `cities`."""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class NullBackend(CacheBackend):
+    """Caching disabled."""
+
+    name = "none"
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl, tags):
+        pass
+
+    def invalidate(self, tags, cities=()):
+        return 0
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class LRUBackend(CacheBackend):
+    """In-process LRU cache with per-entry expiry and a tag index."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, Set[str], Any]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _remove(self, key: str):
+        _, tags, _ = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, key, value, ttl, tags):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            tags = set(tags)
+            self._entries[key] = (time.time() + ttl, tags, value)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tags, cities=()):
+        with self._lock:
+            tags = set(tags) | _city_tags_matching(list(self._tags), cities)
+            keys = set()
+            for tag in tags:
+                keys |= self._tags.get(tag, set())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Cache stored in a local SQLite file, shared by every worker process on the host.
+
+    Values are stored as JSON, so only JSON-encodable results can be cached.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, stored_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_tags (tag TEXT NOT NULL, key TEXT NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_tags_tag ON cache_tags (tag)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_tags_key ON cache_tags (key)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _delete_keys(self, conn: sqlite3.Connection, keys: List[str]):
+        conn.executemany("DELETE FROM cache_entries WHERE key = ?", [(key,) for key in keys])
+        conn.executemany("DELETE FROM cache_tags WHERE key = ?", [(key,) for key in keys])
+
+    def get(self, key):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                self._delete_keys(conn, [key])
+                return None
+            return json.loads(row[0])
+
+    def set(self, key, value, ttl, tags):
+        now = time.time()
+        with self._connect() as conn:
+            self._delete_keys(conn, [key])
+            conn.execute(
+                "INSERT INTO cache_entries (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now)
+            )
+            conn.executemany("INSERT INTO cache_tags (tag, key) VALUES (?, ?)", [(tag, key) for tag in set(tags)])
+
+            expired = [row[0] for row in conn.execute("SELECT key FROM cache_entries WHERE expires_at < ?", (now,))]
+            overflow = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0] - len(expired) - self.max_entries
+            if overflow > 0:
+                expired += [row[0] for row in conn.execute(
+                    "SELECT key FROM cache_entries WHERE expires_at >= ? ORDER BY stored_at LIMIT ?", (now, overflow)
+                )]
+                self.evictions += overflow
+            if expired:
+                self._delete_keys(conn, expired)
+
+    def invalidate(self, tags, cities=()):
+        with self._connect() as conn:
+            tags = set(tags)
+            if cities:
+                city_tags = [row[0] for row in conn.execute(
+                    "SELECT DISTINCT tag FROM cache_tags WHERE tag LIKE ?", (f"{CITY_TAG_PREFIX}%",)
+                )]
+                tags |= _city_tags_matching(city_tags, cities)
+            if not tags:
+                return 0
+            placeholders = ",".join("?" * len(tags))
+            keys = [row[0] for row in conn.execute(
+                f"SELECT DISTINCT key FROM cache_tags WHERE tag IN ({placeholders})", list(tags)
+            )]
+            self._delete_keys(conn, keys)
+            return len(keys)
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache_entries")
+            conn.execute("DELETE FROM cache_tags")
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+
+def create_backend(name: str = CACHE_BACKEND) -> CacheBackend:
+    if name == "sqlite":
+        return SQLiteBackend()
+    if name == "none":
+        return NullBackend()
+    return LRUBackend()
+
+
+class ResponseCache:
+    """Cache front end: keys, hit/miss accounting and invalidation."""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.per_endpoint: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, endpoint: str, outcome: str):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            counters = self.per_endpoint.setdefault(endpoint, {"hits": 0, "misses": 0})
+            counters[outcome] += 1
+
+    def get(self, endpoint: str, key: str) -> Optional[Any]:
+        value = self.backend.get(key)
+        self._count(endpoint, "hits" if value is not None else "misses")
+        return value
+
+    def set(self, key: str, value: Any, ttl: int, tags: Iterable[str]):
+        self.backend.set(key, value, ttl, tags)
+
+    def invalidate(self, tags: Iterable[str], cities: Iterable[str] = ()) -> int:
+        removed = self.backend.invalidate(tags, cities)
+        with self._lock:
+            self.invalidated += removed
+        return removed
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend.name,
+            'entries': len(self.backend),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'invalidated_entries': self.invalidated,
+            'evictions': getattr(self.backend, 'evictions', 0),
+            'default_ttl_seconds': DEFAULT_TTL,
+            'endpoints': self.per_endpoint
+        }
+
+
+response_cache = ResponseCache(create_backend())
+
+
+def _cache_key(endpoint: str, params: Dict[str, Any]) -> str:
+    normalized = {
+        name: value.strip() if isinstance(value, str) else value
+        for name, value in sorted(params.items())
+        if value is not None and value != []
+    }
+    payload = json.dumps([endpoint, normalized], sort_keys=True, default=str)
+    return f"{endpoint}:{hashlib.sha1(payload.encode()).hexdigest()}"
+
+
+def cached(tags: Optional[Callable[[Dict[str, Any]], Iterable[str]]] = None, ttl: Optional[int] = None):
+    """
+    Cache an async route handler's JSON result.
+
+    `tags` receives the handler's arguments (including `db`) and returns the
+    invalidation tags for the result; it only runs when a result is stored.
+    Exceptions, such as HTTPException, are never cached.
+    """
+    def decorator(handler):
+        endpoint = f"{handler.__module__.rsplit('.', 1)[-1]}.{handler.__name__}"
+        signature = pyinspect.signature(handler)
+
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs).arguments
+            params = {
+                name: value for name, value in arguments.items()
+                if not isinstance(value, (Session, Request, Response))
+            }
+            key = _cache_key(endpoint, params)
+
+            value = response_cache.get(endpoint, key)
+            if value is not None:
+                return value
+
+            value = jsonable_encoder(await handler(*args, **kwargs))
+            response_cache.set(key, value, ttl or DEFAULT_TTL, tags(arguments) if tags else [])
+            return value
+
+        return wrapper
+    return decorator
+
+
+# Invalidation: collect tags while flushing, apply them once the transaction commits
+
+def _changed_history(obj, attribute: str) -> Set[Any]:
+    history = inspect(obj).attrs[attribute].history
+    return {value for value in history.deleted if value is not None}
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_invalidations(session: Session, flush_context):
+    tags: Set[str] = session.info.setdefault("cache_tags", set())
+    cities: Set[str] = session.info.setdefault("cache_cities", set())
+    city_ids = set()
+    price_hotel_ids = set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, HotelPrice):
+            hotel_ids = {obj.hotel_id} | _changed_history(obj, "hotel_id")
+            price_hotel_ids |= {hotel_id for hotel_id in hotel_ids if hotel_id is not None}
+        elif isinstance(obj, Hotel):
+            tags.add(hotel_tag(obj.id))
+            cities.update(city for city in {obj.city} | _changed_history(obj, "city") if city)
+            city_ids.update({obj.city_id} | _changed_history(obj, "city_id"))
+        elif isinstance(obj, Event):
+            tags.add("events")
+            cities.update(city for city in {obj.city} | _changed_history(obj, "city") if city)
+            city_ids.update({obj.city_id} | _changed_history(obj, "city_id"))
+        elif isinstance(obj, HistoricalData):
+            tags.add("historical")
+
+    if price_hotel_ids:
+        tags.update(hotel_tag(hotel_id) for hotel_id in price_hotel_ids)
+        for hotel in session.query(Hotel).filter(Hotel.id.in_(price_hotel_ids)):
+            if hotel.city:
+                cities.add(hotel.city)
+            city_ids.add(hotel.city_id)
+
+    # Responses cached for another spelling of the city (e.g. "München" for Munich)
+    city_ids.discard(None)
+    if city_ids:
+        cities.update(alias_keys(session, city_ids))
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _apply_invalidations(session: Session):
+    tags = session.info.pop("cache_tags", set())
+    cities = session.info.pop("cache_cities", set())
+    if tags or cities:
+        response_cache.invalidate(tags, cities)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_invalidations(session: Session):
+    session.info.pop("cache_tags", None)
+    session.info.pop("cache_cities", None)
+
+
+# Tag builders for the route decorators
+
+def tags_for_hotels(db: Session, hotel_ids: Iterable[int], competitors: bool = False,
+                    radius_km: Optional[float] = None) -> List[str]:
+    """
+    Tags for results about specific hotels. With `competitors`, the result also
+    depends on the other hotels (and events) in their cities, or with `radius_km`
+    on the hotels within that distance and their cities.
+    """
+    hotel_ids = [hotel_id for hotel_id in hotel_ids if hotel_id is not None]
+    tags = [hotel_tag(hotel_id) for hotel_id in hotel_ids]
+    if competitors and hotel_ids and radius_km is not None:
+        hotels = db.query(Hotel).filter(Hotel.id.in_(hotel_ids)).all()
+        nearby = hotel_locations.neighbours(db, hotels, radius_km, Hotel.is_active == True)
+        area_ids = sorted({hotel.id for area in nearby.values() for hotel in area} - set(hotel_ids))
+        tags += [hotel_tag(hotel_id) for hotel_id in area_ids]
+        hotel_ids += area_ids
+    if competitors and hotel_ids:
+        cities = {city for (city,) in db.query(Hotel.city).filter(Hotel.id.in_(hotel_ids)) if city}
+        tags += [city_tag(city) for city in cities]
+    return tags
+
+
+def tags_for_city(city: Optional[str]) -> List[str]:
+    return [city_tag(city)] if city else []
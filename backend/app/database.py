@@ -9,6 +9,9 @@ load_dotenv()
 # Database URL from environment or default to SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./hotel_monitoring.db")
 
+# Local state files other than the database, such as the shared response cache
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+
 # Create engine
 engine = create_engine(
     DATABASE_URL,
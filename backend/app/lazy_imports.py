@@ -0,0 +1,41 @@
+"""
+Deferred imports of heavy libraries.
+
+NumPy, pandas, PyArrow and BeautifulSoup add about a second to worker boot, and
+most requests never touch them. Modules bind them with `lazy_import` instead of
+`import`:
+
+    np = lazy_import("numpy")
+
+and the library is imported on the first attribute access (`np.mean`), i.e. when
+an endpoint that needs it first runs. Modules using such names in annotations add
+`from __future__ import annotations` so defining a function does not trigger the
+import.
+"""
+
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a module that imports it on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = name
+
+    def __getattr__(self, attribute: str):
+        # Only called for attributes not copied over yet; import_module is idempotent and locked
+        module = importlib.import_module(self.__dict__["_lazy_target"])
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attribute)
+
+    def __dir__(self):
+        return dir(importlib.import_module(self.__dict__["_lazy_target"]))
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """`name` itself if it is already imported, else a `LazyModule` for it."""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
@@ -0,0 +1,175 @@
+"""
+Application logging.
+
+Log calls only put records on an in-memory queue; a background listener thread
+formats and writes them, so request handlers and scrapes never block on stdout.
+Records are written as one JSON object per line (``LOG_FORMAT=json``, the default)
+or as plain text, and structured fields passed with ``extra=`` (hotel_id, job, url,
+...) are included in the output. Debug records are rate limited per call site so a
+loop logging every room or price cannot flood the log pipeline.
+
+Environment:
+    LOG_LEVEL                root level (default INFO)
+    LOG_FORMAT               json or text (default json)
+    LOG_DEBUG_RATE_LIMIT     debug records per call site per window (default 20)
+    LOG_DEBUG_RATE_WINDOW    window length in seconds (default 60)
+"""
+
+import atexit
+import copy
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+import orjson
+
+# Records waiting for the writer thread; beyond this they are dropped, not blocked on
+QUEUE_SIZE = 10000
+
+# Attributes of every LogRecord; anything else was passed with `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+_exception_formatter = logging.Formatter()
+
+
+def structured_fields(record: logging.LogRecord) -> Dict[str, object]:
+    """Fields passed to the log call with `extra=`."""
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: timestamp, level, logger, message and extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(structured_fields(record))
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc"] = record.exc_text
+        return orjson.dumps(payload, default=str).decode()
+
+
+class TextFormatter(logging.Formatter):
+    """Classic text lines with extra fields appended as key=value."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = structured_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class DebugRateLimitFilter(logging.Filter):
+    """
+    Let at most `limit` DEBUG records per call site through per `window` seconds.
+
+    Records at INFO and above always pass. The first record let through in a new
+    window carries the number of records suppressed in the previous one.
+    """
+
+    def __init__(self, limit: int = 20, window: float = 60.0):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._lock = threading.Lock()
+        # call site -> (window start, records seen, records suppressed in the previous window)
+        self._sites: Dict[Tuple[str, int], Tuple[float, int, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.limit <= 0:
+            return True
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            start, seen, suppressed = self._sites.get(site, (now, 0, 0))
+            if now - start >= self.window:
+                start, seen, suppressed = now, 0, max(seen - self.limit, 0)
+            seen += 1
+            self._sites[site] = (start, seen, suppressed)
+            if seen > self.limit:
+                return False
+        if seen == 1 and suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of failing when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args and render tracebacks now (they may not be picklable or may change),
+        # but leave formatting into a line to the writer thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(level: Optional[str] = None, fmt: Optional[str] = None):
+    """
+    Route the root logger through the queue handler and start the writer thread.
+
+    Settings not passed are read from the environment. Safe to call more than once;
+    later calls only change the level.
+    """
+    global _listener
+    root = logging.getLogger()
+    root.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+    if _listener is not None:
+        return
+
+    fmt = (fmt or os.getenv("LOG_FORMAT", "json")).lower()
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    log_queue: queue.Queue = queue.Queue(QUEUE_SIZE)
+    handler = DroppingQueueHandler(log_queue)
+    handler.addFilter(DebugRateLimitFilter(
+        limit=int(os.getenv("LOG_DEBUG_RATE_LIMIT", "20")),
+        window=float(os.getenv("LOG_DEBUG_RATE_WINDOW", "60"))
+    ))
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
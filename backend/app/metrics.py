@@ -0,0 +1,335 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+A small dependency-free registry of counters, gauges and histograms, an ASGI
+middleware recording per-route request counts, latencies and in-flight requests,
+an observer for scraper activity and gauges for the database connection pool.
+Everything is served by `GET /metrics`.
+
+Metrics live in the process: with several workers each one reports its own.
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.database import engine
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Seconds; covers fast cached reads up to slow analytics and scrapes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Metric:
+    """Base class: a named metric family with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def labels(self, *values) -> "_Child":
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        return _Child(self, tuple(str(value) for value in values))
+
+    def samples(self) -> Iterable[Tuple[str, Sequence[str], Sequence[str], float]]:
+        """(suffix, label names, label values, value) for every sample of the family."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, names, values, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_labels_text(names, values)} {_format_value(value)}")
+        return lines
+
+
+class _Child:
+    """A metric bound to one set of label values."""
+
+    __slots__ = ("metric", "key")
+
+    def __init__(self, metric: Metric, key: LabelValues):
+        self.metric = metric
+        self.key = key
+
+    def inc(self, amount: float = 1.0):
+        self.metric._inc(self.key, amount)
+
+    def dec(self, amount: float = 1.0):
+        self.metric._inc(self.key, -amount)
+
+    def set(self, value: float):
+        self.metric._set(self.key, value)
+
+    def observe(self, value: float):
+        self.metric._observe(self.key, value)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0):
+        self._inc((), amount)
+
+    def _inc(self, key: LabelValues, amount: float):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels) -> float:
+        return self._values.get(tuple(str(label) for label in labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", self.labelnames, key, value
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 function: Optional[Callable[[], Optional[float]]] = None):
+        """`function`, if given, is called at render time for the (unlabelled) value."""
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function = function
+
+    def inc(self, amount: float = 1.0):
+        self._inc((), amount)
+
+    def dec(self, amount: float = 1.0):
+        self._inc((), -amount)
+
+    def set(self, value: float):
+        self._set((), value)
+
+    def _inc(self, key: LabelValues, amount: float):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _set(self, key: LabelValues, value: float):
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, *labels) -> float:
+        return self._values.get(tuple(str(label) for label in labels), 0.0)
+
+    def samples(self):
+        if self._function is not None:
+            value = self._function()
+            if value is not None:
+                yield "", (), (), float(value)
+            return
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield "", self.labelnames, key, value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts with a final +Inf slot, sum, count)
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float):
+        self._observe((), value)
+
+    def _observe(self, key: LabelValues, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def count(self, *labels) -> int:
+        entry = self._values.get(tuple(str(label) for label in labels))
+        return entry[2] if entry else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        names = self.labelnames + ("le",)
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                yield "_bucket", names, key + (_format_value(bound),), cumulative
+            yield "_sum", self.labelnames, key, total
+            yield "_count", self.labelnames, key, count
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+# HTTP
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by method, route template and status code.",
+    ("method", "route", "status")
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response body is sent.",
+    ("method", "route")
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", ("method",)
+)
+
+# Requests not matching any route share one label value, so scanners cannot explode the series count
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope: dict) -> str:
+    """Path template of the route that handled the request, e.g. /api/hotels/{hotel_id}."""
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return UNMATCHED_ROUTE
+    templates = getattr(app.state, "route_templates", None)
+    if templates is None:
+        templates = {}
+        for route in app.routes:
+            templates.setdefault(getattr(route, "endpoint", None), getattr(route, "path", UNMATCHED_ROUTE))
+        app.state.route_templates = templates
+    return templates.get(endpoint, UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts, latencies and in-flight requests per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        in_flight = HTTP_IN_FLIGHT.labels(method)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            in_flight.dec()
+            # Routing filled in the endpoint on the shared scope
+            route = route_template(scope)
+            HTTP_REQUESTS.labels(method, route, status).inc()
+            HTTP_LATENCY.labels(method, route).observe(duration)
+
+
+# Scraper
+
+SCRAPER_FETCHES = Counter(
+    "scraper_fetches_total", "Pages fetched by the scraper by HTTP status code (or 'error').", ("status",)
+)
+SCRAPER_BYTES = Counter("scraper_fetch_bytes_total", "Bytes of page content downloaded by the scraper.")
+SCRAPER_FETCH_DURATION = Histogram("scraper_fetch_duration_seconds", "Time to download a page.")
+SCRAPER_PARSE_DURATION = Histogram("scraper_parse_duration_seconds", "Time to parse a page and extract its data.")
+SCRAPER_ROOMS = Counter("scraper_rooms_extracted_total", "Room offers extracted from scraped pages.")
+
+
+def observe_scraper(event: str, **fields):
+    """Scraper observer (see `booking_scraper.add_observer`) feeding the scraper metrics."""
+    if event == "fetch":
+        SCRAPER_FETCHES.labels(fields["status"]).inc()
+        SCRAPER_BYTES.inc(fields.get("bytes", 0))
+        SCRAPER_FETCH_DURATION.observe(fields["duration"])
+    elif event == "parse":
+        SCRAPER_PARSE_DURATION.observe(fields["duration"])
+        SCRAPER_ROOMS.inc(fields.get("rooms", 0))
+
+
+# Database connection pool, read at render time
+
+def _pool_stat(name: str) -> Callable[[], Optional[float]]:
+    def read() -> Optional[float]:
+        stat = getattr(engine.pool, name, None)
+        return stat() if callable(stat) else None
+    return read
+
+
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured size of the connection pool.", function=_pool_stat("size"))
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool.", function=_pool_stat("checkedout")
+)
+DB_POOL_CHECKED_IN = Gauge(
+    "db_pool_checked_in", "Idle connections held by the pool.", function=_pool_stat("checkedin")
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections opened beyond the pool size (negative while below it).",
+    function=_pool_stat("overflow")
+)
+
+PROCESS_START_TIME = Gauge("process_start_time_seconds", "Start time of the process since the Unix epoch.")
+PROCESS_START_TIME.set(time.time())
@@ -0,0 +1,195 @@
+"""
+Schema upkeep for existing databases.
+
+`Base.metadata.create_all` only creates missing tables, so columns and indexes
+added to models after a table was first created are created here, historical rows
+recorded by hotel name are linked to their hotel, hotels and events are linked to
+their canonical city, empty price rollups are backfilled (city rollups keyed by city
+name are replaced by ones keyed by city ID), and the hotel search and location indexes
+are created.
+
+`init_db` runs once per process from the app's startup hook rather than at import,
+so importing `main` stays cheap. Deployments that migrate in a separate step run
+
+    python -m app.migrations
+
+and set SCHEMA_CHECK_ON_STARTUP=0 to skip the check when workers boot.
+"""
+
+import logging
+import os
+from collections import defaultdict
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
+
+from app.database import Base
+from app.models.event import Event
+from app.models.historical_data import HistoricalData
+from app.models.hotel import Hotel, HotelPrice
+from app.models.price_rollup import CityPriceDaily, HotelPriceDaily
+from app.services import cities, hotel_locations, hotel_search, price_rollups
+
+SCHEMA_CHECK_ON_STARTUP = os.getenv("SCHEMA_CHECK_ON_STARTUP", "1").lower() not in ("0", "false", "no")
+
+logger = logging.getLogger(__name__)
+
+
+def rekey_city_rollups(engine: Engine) -> bool:
+    """
+    Recreate city_price_daily, empty, if it is still keyed by city name; returns whether
+    it was. `backfill_price_rollups` fills it again once hotels are linked to cities.
+    """
+    inspector = inspect(engine)
+    table = CityPriceDaily.__tablename__
+    if table not in inspector.get_table_names():
+        return False
+    if "city_id" in {column["name"] for column in inspector.get_columns(table)}:
+        return False
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"DROP TABLE {table}")
+        CityPriceDaily.__table__.create(bind=connection)
+    logger.info("Recreated %s keyed by city ID", table)
+    return True
+
+
+def ensure_columns(engine: Engine):
+    """Add model columns missing from existing tables; such columns must be nullable or have a server default."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = str(CreateColumn(column).compile(dialect=engine.dialect))
+            for foreign_key in column.foreign_keys:
+                ddl += f" REFERENCES {foreign_key.column.table.name} ({foreign_key.column.name})"
+            with engine.begin() as connection:
+                connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+            logger.info("Added column %s.%s", table.name, column.name)
+
+
+def link_historical_data(engine: Engine) -> int:
+    """
+    Set historical_data.hotel_id on rows whose hotel_name is the name of exactly one
+    hotel (ignoring case and surrounding spaces); returns the number of rows linked.
+
+    Names with no or several matching hotels stay unlinked and are retried on the next run.
+    """
+    with engine.begin() as connection:
+        names = connection.execute(
+            select(HistoricalData.hotel_name).where(HistoricalData.hotel_id.is_(None)).distinct()
+        ).scalars().all()
+        if not names:
+            return 0
+        hotel_ids = defaultdict(list)
+        for hotel_id, name in connection.execute(select(Hotel.id, Hotel.name)):
+            hotel_ids[name.strip().lower()].append(hotel_id)
+        links = [{"name": name, "hotel_id": hotel_ids[name.strip().lower()][0]} for name in names
+                 if len(hotel_ids.get(name.strip().lower(), ())) == 1]
+        if not links:
+            return 0
+
+        # One pass over the table, looking each row's name up in an indexed temporary table
+        connection.execute(text(
+            "CREATE TEMPORARY TABLE hotel_name_links (name VARCHAR PRIMARY KEY, hotel_id INTEGER NOT NULL)"
+        ))
+        connection.execute(text("INSERT INTO hotel_name_links (name, hotel_id) VALUES (:name, :hotel_id)"), links)
+        linked = connection.execute(text(
+            "UPDATE historical_data SET hotel_id = "
+            "(SELECT hotel_id FROM hotel_name_links WHERE hotel_name_links.name = historical_data.hotel_name) "
+            "WHERE hotel_id IS NULL AND hotel_name IN (SELECT name FROM hotel_name_links)"
+        )).rowcount
+        connection.execute(text("DROP TABLE hotel_name_links"))
+    logger.info("Linked %d historical rows to %d hotels by name", linked, len(links))
+    return linked
+
+
+def link_cities(engine: Engine) -> int:
+    """
+    Set city_id on hotels and events that have a city but no city_id yet (rows from
+    before the column, or inserted without the session hook), creating missing
+    cities; returns the number of rows linked.
+    """
+    linked = 0
+    with engine.begin() as connection:
+        for model in (Hotel, Event):
+            names = dict(connection.execute(
+                select(model.city, model.country).where(model.city_id.is_(None), model.city.isnot(None)).distinct()
+            ).all())
+            links = [{"name": name, "city_id": city_id}
+                     for name, city_id in cities.resolve_ids(connection, names).items()]
+            if not links:
+                continue
+            connection.execute(text(
+                "CREATE TEMPORARY TABLE city_name_links (name VARCHAR PRIMARY KEY, city_id INTEGER NOT NULL)"
+            ))
+            connection.execute(text("INSERT INTO city_name_links (name, city_id) VALUES (:name, :city_id)"), links)
+            table = model.__tablename__
+            linked += connection.execute(text(
+                f"UPDATE {table} SET city_id = "
+                f"(SELECT city_id FROM city_name_links WHERE city_name_links.name = {table}.city) "
+                f"WHERE city_id IS NULL AND city IN (SELECT name FROM city_name_links)"
+            )).rowcount
+            connection.execute(text("DROP TABLE city_name_links"))
+    if linked:
+        logger.info("Linked %d hotels and events to their city", linked)
+    return linked
+
+
+def ensure_indexes(engine: Engine):
+    """Create every index declared on the models that does not exist yet."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def backfill_price_rollups(engine: Engine) -> bool:
+    """
+    Build the price rollups when they are empty but prices exist (databases from before
+    the rollup tables, or filled by bulk inserts), or only the city rollups when just
+    those are empty; returns whether any were built.
+    """
+    with Session(engine) as session:
+        if not session.query(HotelPrice.id).first():
+            return False
+        if not session.query(HotelPriceDaily.id).first():
+            counts = price_rollups.rebuild_rollups(session)
+        elif not session.query(CityPriceDaily.id).first():
+            price_rollups.refresh_cities(session)
+            session.commit()
+            counts = {"city_rollup_rows": session.query(CityPriceDaily).count()}
+        else:
+            return False
+    logger.info("Backfilled price rollups: %s", counts)
+    return True
+
+
+def run_migrations(engine: Engine):
+    rekey_city_rollups(engine)
+    ensure_columns(engine)
+    link_historical_data(engine)
+    link_cities(engine)
+    ensure_indexes(engine)
+    backfill_price_rollups(engine)
+    hotel_search.create_index(engine)
+    hotel_locations.create_index(engine)
+
+
+def init_db(engine: Engine):
+    """Create missing tables, then bring existing ones up to date."""
+    import app.models  # noqa: F401  Registers every table on Base.metadata
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+
+if __name__ == "__main__":
+    from app.database import engine
+
+    init_db(engine)
@@ -1,3 +1,6 @@
 from .hotel import Hotel, HotelPrice
 from .event import Event
-from .historical_data import HistoricalData, YieldStrategy 
\ No newline at end of file
+from .historical_data import HistoricalData, YieldStrategy
+from .price_rollup import HotelPriceDaily, CityPriceDaily
+from .resource_version import ResourceVersion
+from .city import City, CityAlias 
\ No newline at end of file
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+# SQLAlchemy Models
+class City(Base):
+    """Canonical city that hotels and events refer to by `city_id`."""
+    __tablename__ = "cities"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, nullable=False, unique=True, index=True)  # Normalized name, see services.cities
+    name = Column(String, nullable=False)
+    country = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class CityAlias(Base):
+    """Normalized spelling of a city name, including the city's own key."""
+    __tablename__ = "city_aliases"
+
+    key = Column(String, primary_key=True)
+    city_id = Column(Integer, ForeignKey("cities.id"), nullable=False, index=True)
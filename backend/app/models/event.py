@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey
 from sqlalchemy.sql import func
 from app.database import Base
 from pydantic import BaseModel
@@ -12,6 +12,7 @@ class Event(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     city = Column(String, nullable=False)
+    city_id = Column(Integer, ForeignKey("cities.id"), index=True)  # Resolved from city, see services.cities
     country = Column(String)
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=False)
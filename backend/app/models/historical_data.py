@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database import Base
 from pydantic import BaseModel
@@ -8,8 +8,14 @@ from datetime import datetime
 # SQLAlchemy Model
 class HistoricalData(Base):
     __tablename__ = "historical_data"
+    __table_args__ = (
+        # Per-hotel range scans by stay date and by booking date
+        Index("ix_historical_data_hotel_check_in", "hotel_id", "check_in_date"),
+        Index("ix_historical_data_hotel_booking", "hotel_id", "booking_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    hotel_id = Column(Integer, ForeignKey("hotels.id"))  # Linked from hotel_name by the migrations
     hotel_name = Column(String, nullable=False)
     check_in_date = Column(DateTime, nullable=False)
     check_out_date = Column(DateTime, nullable=False)
@@ -42,6 +48,7 @@ class YieldStrategy(Base):
 
 # Pydantic Models for API
 class HistoricalDataBase(BaseModel):
+    hotel_id: Optional[int] = None
     hotel_name: str
     check_in_date: datetime
     check_out_date: datetime
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, JSON, Boolean, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database import Base
 from pydantic import BaseModel
@@ -14,6 +14,7 @@ class Hotel(Base):
     booking_url = Column(String, unique=True, nullable=False)
     address = Column(String)
     city = Column(String)
+    city_id = Column(Integer, ForeignKey("cities.id"), index=True)  # Resolved from city, see services.cities
     country = Column(String)
     star_rating = Column(Float)
     user_rating = Column(Float)
@@ -27,6 +28,10 @@ class Hotel(Base):
 
 class HotelPrice(Base):
     __tablename__ = "hotel_prices"
+    __table_args__ = (
+        # Keyset pagination of a hotel's prices by (check_in_date, id)
+        Index("ix_hotel_prices_hotel_check_in", "hotel_id", "check_in_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     hotel_id = Column(Integer, nullable=False)
@@ -77,6 +82,26 @@ class HotelResponse(HotelBase):
     class Config:
         from_attributes = True
 
+class HotelSearchResult(BaseModel):
+    id: int
+    name: str
+    city: Optional[str] = None
+    country: Optional[str] = None
+    address: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class HotelCompetitor(BaseModel):
+    id: int
+    name: str
+    city: Optional[str] = None
+    star_rating: Optional[float] = None
+    user_rating: Optional[float] = None
+    latitude: float
+    longitude: float
+    distance_km: float
+
 class HotelPriceBase(BaseModel):
     hotel_id: int
     check_in_date: datetime
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+# SQLAlchemy Models
+class HotelPriceDaily(Base):
+    """Daily price aggregates per hotel, check-in date and room category."""
+    __tablename__ = "hotel_price_daily"
+    __table_args__ = (
+        UniqueConstraint("hotel_id", "check_in_date", "room_category", name="uq_hotel_price_daily"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    hotel_id = Column(Integer, nullable=False, index=True)
+    check_in_date = Column(Date, nullable=False)
+    room_category = Column(String, nullable=False)
+    price_count = Column(Integer, nullable=False)
+    price_sum = Column(Float, nullable=False)
+    price_sum_sq = Column(Float, nullable=False)  # For variance without raw rows
+    price_min = Column(Float, nullable=False)
+    price_max = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class CityPriceDaily(Base):
+    """Daily price aggregates per canonical city and check-in date."""
+    __tablename__ = "city_price_daily"
+    __table_args__ = (
+        UniqueConstraint("city_id", "check_in_date", name="uq_city_price_daily"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    city_id = Column(Integer, ForeignKey("cities.id"), nullable=False)
+    check_in_date = Column(Date, nullable=False)
+    price_count = Column(Integer, nullable=False)
+    price_sum = Column(Float, nullable=False)
+    price_sum_sq = Column(Float, nullable=False)
+    price_min = Column(Float, nullable=False)
+    price_max = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
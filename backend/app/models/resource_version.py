@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+# SQLAlchemy Model
+class ResourceVersion(Base):
+    """Monotonic data version per API resource, used to build ETags."""
+    __tablename__ = "resource_versions"
+
+    resource = Column(String, primary_key=True)  # "hotels" or "hotel:<id>"
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -3,22 +3,37 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
-import pandas as pd
-import numpy as np
 
 from app.database import get_db
+from app.lazy_imports import lazy_import
+from app.cache import cached, tags_for_city, tags_for_hotels
 from app.models.hotel import Hotel, HotelPrice
 from app.models.historical_data import HistoricalData
+from app.services import (
+    analytics_kernels, cities, downsampling, historical_bookings, hotel_locations, price_aggregates, price_archive,
+    price_rollups
+)
+from app.services.latest_prices import latest_prices
+
+np = lazy_import("numpy")
 
 router = APIRouter()
 
 @router.get("/price-evolution/{hotel_id}")
+@cached(tags=lambda args: tags_for_hotels(args['db'], [args['hotel_id']]))
 async def get_price_evolution(
     hotel_id: int,
     days_back: int = Query(30, ge=1, le=365),
+    max_points: Optional[int] = Query(None, ge=downsampling.MIN_POINTS, le=downsampling.MAX_POINTS),
+    resolution: Optional[str] = Query(None, regex=downsampling.RESOLUTION_PATTERN),
     db: Session = Depends(get_db)
 ):
-    """Get price evolution for a specific hotel."""
+    """
+    Get price evolution for a specific hotel.
+    
+    `resolution` aggregates the observations into hour/day/week/month buckets
+    (mean, min and max price) and `max_points` caps the number of points with LTTB.
+    """
     hotel = db.query(Hotel).filter(Hotel.id == hotel_id).first()
     if not hotel:
         raise HTTPException(status_code=404, detail="Hotel not found")
@@ -41,45 +56,127 @@ async def get_price_evolution(
             'check_out_date': price.check_out_date.strftime('%Y-%m-%d')
         })
     
-    return {
+    result = {
         'hotel_id': hotel_id,
         'hotel_name': hotel.name,
         'price_evolution': price_data,
         'total_records': len(price_data)
     }
+    
+    if max_points or resolution:
+        result['price_evolution'], result['downsampling'] = downsampling.downsample_series(
+            price_data,
+            [price.scraped_at for price in prices],
+            {'price': [price.price for price in prices]},
+            max_points=max_points,
+            resolution=resolution,
+            keep=['currency']
+        )
+    
+    return result
 
 @router.get("/market-comparison")
+@cached(tags=lambda args: tags_for_city(args['city']) + tags_for_hotels(
+    args['db'], [args['hotel_id']], competitors=True, radius_km=args['radius_km']
+))
 async def get_market_comparison(
-    city: str,
+    city: Optional[str] = None,
+    hotel_id: Optional[int] = None,
+    radius_km: Optional[float] = Query(None, gt=0, le=hotel_locations.MAX_RADIUS_KM),
     check_in_date: Optional[str] = None,
     check_out_date: Optional[str] = None,
+    use_rollups: bool = Query(False),
     db: Session = Depends(get_db)
 ):
-    """Compare hotel prices in a specific city."""
-    query = db.query(Hotel).filter(
-        Hotel.city.ilike(f"%{city}%"),
-        Hotel.is_active == True
-    )
+    """
+    Compare hotel prices in a specific city, or in a hotel's market.
     
-    hotels = query.all()
+    With `hotel_id` the market is the hotel and its competitors: the active hotels
+    of its city, or with `radius_km` those within that distance of it.
     
-    if not hotels:
-        raise HTTPException(status_code=404, detail=f"No hotels found in {city}")
-    
-    # Get latest prices for each hotel
-    market_data = []
-    for hotel in hotels:
-        price_query = db.query(HotelPrice).filter(HotelPrice.hotel_id == hotel.id)
+    With `use_rollups`, each hotel's price is its average nightly price over the
+    check-in window and the market stats cover every observation in the window,
+    both read from the daily rollup tables.
+    """
+    if hotel_id is not None:
+        hotel = db.query(Hotel).filter(Hotel.id == hotel_id).first()
+        if not hotel:
+            raise HTTPException(status_code=404, detail="Hotel not found")
+        try:
+            competitors = hotel_locations.competitors(db, hotel, radius_km)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        hotels = sorted([hotel] + competitors, key=lambda item: item.id)
+        market = {'hotel_id': hotel_id, 'radius_km': radius_km}
+    elif radius_km is not None:
+        raise HTTPException(status_code=400, detail="A hotel ID is required for a radius search")
+    elif not city:
+        raise HTTPException(status_code=400, detail="Either a city or a hotel ID is required")
+    else:
+        query = db.query(Hotel).filter(
+            Hotel.city_id.in_(cities.matching_ids(city)),
+            Hotel.is_active == True
+        )
         
-        if check_in_date:
-            check_in_dt = datetime.strptime(check_in_date, '%Y-%m-%d')
-            price_query = price_query.filter(HotelPrice.check_in_date >= check_in_dt)
+        hotels = query.order_by(Hotel.id).all()
+        market = {}
         
-        if check_out_date:
-            check_out_dt = datetime.strptime(check_out_date, '%Y-%m-%d')
-            price_query = price_query.filter(HotelPrice.check_out_date <= check_out_dt)
+        if not hotels:
+            raise HTTPException(status_code=404, detail=f"No hotels found in {city}")
+    
+    if use_rollups:
+        first_day = datetime.strptime(check_in_date, '%Y-%m-%d').date() if check_in_date else None
+        # Stays must check out by check_out_date, so the last night is the day before
+        last_day = (datetime.strptime(check_out_date, '%Y-%m-%d') - timedelta(days=1)).date() if check_out_date else None
         
-        latest_price = price_query.order_by(desc(HotelPrice.scraped_at)).first()
+        hotel_stats = price_rollups.hotel_window_stats(db, [hotel.id for hotel in hotels], first_day, last_day)
+        market_data = [
+            {
+                'hotel_id': hotel.id,
+                'hotel_name': hotel.name,
+                'star_rating': hotel.star_rating,
+                'user_rating': hotel.user_rating,
+                'price': round(hotel_stats[hotel.id]['average'], 2),
+                'min_price': hotel_stats[hotel.id]['min'],
+                'max_price': hotel_stats[hotel.id]['max'],
+                'amenities': hotel.amenities,
+                'address': hotel.address
+            }
+            for hotel in hotels if hotel.id in hotel_stats
+        ]
+        if hotel_id is not None:
+            # A compset is not a whole city, so combine the hotels' own rollups
+            city_stats = price_rollups.hotels_window_stats(db, [hotel.id for hotel in hotels], first_day, last_day)
+        else:
+            city_stats = price_rollups.city_window_stats(
+                db, {hotel.city_id for hotel in hotels if hotel.city_id}, first_day, last_day
+            )
+        
+        return {
+            'city': city,
+            **market,
+            'hotels_count': len(market_data),
+            'data_source': 'rollups',
+            'market_stats': {
+                'average_price': round(city_stats['average'], 2),
+                'min_price': round(city_stats['min'], 2),
+                'max_price': round(city_stats['max'], 2),
+                'price_range': round(city_stats['max'] - city_stats['min'], 2)
+            } if city_stats else {},
+            'hotels': market_data
+        }
+    
+    # Get latest prices for all hotels in one query
+    latest = latest_prices(
+        db,
+        [hotel.id for hotel in hotels],
+        check_in_from=datetime.strptime(check_in_date, '%Y-%m-%d') if check_in_date else None,
+        check_out_to=datetime.strptime(check_out_date, '%Y-%m-%d') if check_out_date else None
+    )
+    
+    market_data = []
+    for hotel in hotels:
+        latest_price = latest.get(hotel.id)
         
         if latest_price:
             market_data.append({
@@ -102,6 +199,7 @@ async def get_market_comparison(
         
         return {
             'city': city,
+            **market,
             'hotels_count': len(market_data),
             'market_stats': {
                 'average_price': round(avg_price, 2),
@@ -114,86 +212,146 @@ async def get_market_comparison(
     
     return {
         'city': city,
+        **market,
         'hotels_count': 0,
         'market_stats': {},
         'hotels': []
     }
 
 @router.get("/price-trends")
+@cached(tags=lambda args: tags_for_hotels(args['db'], args['hotel_ids']))
 async def get_price_trends(
     hotel_ids: List[int] = Query([]),
     days_back: int = Query(30, ge=1, le=365),
+    use_rollups: bool = Query(False),
+    max_points: Optional[int] = Query(None, ge=downsampling.MIN_POINTS, le=downsampling.MAX_POINTS),
+    resolution: Optional[str] = Query(None, regex=downsampling.RESOLUTION_PATTERN),
     db: Session = Depends(get_db)
 ):
-    """Get price trends for multiple hotels."""
+    """
+    Get price trends for multiple hotels.
+    
+    With `use_rollups`, each point is a hotel's average price for one check-in
+    date since the cutoff, instead of one raw observation per scrape. `resolution`
+    and `max_points` downsample each hotel's points; the trend statistics are
+    always computed from the full series.
+    """
     if not hotel_ids:
         raise HTTPException(status_code=400, detail="At least one hotel ID is required")
     
     cutoff_date = datetime.now() - timedelta(days=days_back)
     
+    series_points = None
+    if use_rollups:
+        data_source = 'rollups'
+        series_points = {
+            hotel_id: [(day, average, None) for day, average in points]
+            for hotel_id, points in price_rollups.daily_hotel_series(db, hotel_ids, cutoff_date.date()).items()
+        }
+    elif price_archive.use_archive_for(days_back):
+        # Long windows are scanned from the columnar archive in a single pass
+        data_source = 'archive'
+        table = price_archive.scan_prices(
+            ['hotel_id', 'scraped_at', 'price', 'currency'],
+            hotel_ids=hotel_ids,
+            scraped_from=cutoff_date
+        ).sort_by('scraped_at')
+        series_points = {}
+        for row in table.to_pylist():
+            series_points.setdefault(row['hotel_id'], []).append(
+                (row['scraped_at'], row['price'], row['currency'])
+            )
+    else:
+        data_source = 'database'
+    
     trends_data = []
     for hotel_id in hotel_ids:
         hotel = db.query(Hotel).filter(Hotel.id == hotel_id).first()
         if not hotel:
             continue
         
-        prices = db.query(HotelPrice).filter(
-            HotelPrice.hotel_id == hotel_id,
-            HotelPrice.scraped_at >= cutoff_date
-        ).order_by(HotelPrice.scraped_at).all()
+        if series_points is not None:
+            prices = series_points.get(hotel_id, [])
+        else:
+            prices = [
+                (p.scraped_at, p.price, p.currency)
+                for p in db.query(HotelPrice).filter(
+                    HotelPrice.hotel_id == hotel_id,
+                    HotelPrice.scraped_at >= cutoff_date
+                ).order_by(HotelPrice.scraped_at).all()
+            ]
         
         if prices:
-            price_values = [p.price for p in prices]
+            price_values = [price for _, price, _ in prices]
             trend_data = {
                 'hotel_id': hotel_id,
                 'hotel_name': hotel.name,
-                'price_trend': {
-                    'current_price': price_values[-1],
-                    'price_change': round(price_values[-1] - price_values[0], 2),
-                    'price_change_percent': round(((price_values[-1] - price_values[0]) / price_values[0]) * 100, 2) if price_values[0] > 0 else 0,
-                    'volatility': round(np.std(price_values), 2),
-                    'data_points': len(price_values)
-                },
+                'price_trend': analytics_kernels.price_trend(price_values),
                 'prices': [
                     {
-                        'date': p.scraped_at.strftime('%Y-%m-%d'),
-                        'price': p.price,
-                        'currency': p.currency
-                    } for p in prices
+                        'date': scraped_at.strftime('%Y-%m-%d'),
+                        'price': price,
+                        'currency': currency
+                    } for scraped_at, price, currency in prices
                 ]
             }
+            if max_points or resolution:
+                trend_data['prices'], trend_data['downsampling'] = downsampling.downsample_series(
+                    trend_data['prices'],
+                    [scraped_at for scraped_at, _, _ in prices],
+                    {'price': price_values},
+                    max_points=max_points,
+                    resolution=resolution,
+                    keep=['currency']
+                )
             trends_data.append(trend_data)
     
     return {
         'analysis_period_days': days_back,
         'hotels_analyzed': len(trends_data),
+        'data_source': data_source,
         'trends': trends_data
     }
 
 @router.get("/occupancy-analysis")
+@cached(tags=lambda args: ['historical'])
 async def get_occupancy_analysis(
-    hotel_name: str,
+    hotel_name: Optional[str] = None,
+    hotel_id: Optional[int] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    max_points: Optional[int] = Query(None, ge=downsampling.MIN_POINTS, le=downsampling.MAX_POINTS),
+    resolution: Optional[str] = Query(None, regex=downsampling.RESOLUTION_PATTERN),
     db: Session = Depends(get_db)
 ):
-    """Analyze occupancy patterns for a hotel using historical data."""
-    query = db.query(HistoricalData).filter(
-        HistoricalData.hotel_name.ilike(f"%{hotel_name}%")
-    )
+    """
+    Analyze occupancy patterns for a hotel using historical data.
+    
+    The hotel is given by `hotel_id`, or by `hotel_name`, which matches every hotel
+    whose name contains it. `resolution` and `max_points` downsample `occupancy_data` (ordered by check-in
+    date when set); the booking curve is always computed from every record.
+    """
+    if hotel_id is None and not hotel_name:
+        raise HTTPException(status_code=400, detail="Either a hotel ID or a hotel name is required")
+    
+    filters = [historical_bookings.hotel_filter(db, hotel_id, hotel_name)]
     
     if start_date:
         start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-        query = query.filter(HistoricalData.check_in_date >= start_dt)
+        filters.append(HistoricalData.check_in_date >= start_dt)
     
     if end_date:
         end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-        query = query.filter(HistoricalData.check_in_date <= end_dt)
+        filters.append(HistoricalData.check_in_date <= end_dt)
     
-    historical_data = query.all()
+    # Only the columns used below, as rows rather than ORM objects
+    historical_data = db.query(
+        HistoricalData.check_in_date, HistoricalData.booking_date,
+        HistoricalData.occupancy_rate, HistoricalData.price, HistoricalData.season
+    ).filter(*filters).all()
     
     if not historical_data:
-        raise HTTPException(status_code=404, detail=f"No historical data found for {hotel_name}")
+        raise HTTPException(status_code=404, detail=f"No historical data found for {hotel_name or f'hotel {hotel_id}'}")
     
     # Analyze occupancy patterns
     occupancy_data = []
@@ -206,53 +364,59 @@ async def get_occupancy_analysis(
             'booking_date': record.booking_date.strftime('%Y-%m-%d') if record.booking_date else None
         })
     
-    # Calculate booking curve (days between booking and check-in)
-    booking_curves = []
-    for record in historical_data:
-        if record.booking_date and record.check_in_date:
-            days_before = (record.check_in_date - record.booking_date).days
-            if days_before >= 0:
-                booking_curves.append({
-                    'days_before_checkin': days_before,
-                    'occupancy_rate': record.occupancy_rate,
-                    'price': record.price
-                })
-    
-    # Group by days before check-in
-    if booking_curves:
-        df = pd.DataFrame(booking_curves)
-        curve_analysis = df.groupby('days_before_checkin').agg({
-            'occupancy_rate': ['mean', 'std'],
-            'price': ['mean', 'std']
-        }).reset_index()
-        
-        curve_data = []
-        for _, row in curve_analysis.iterrows():
-            curve_data.append({
-                'days_before_checkin': int(row['days_before_checkin']),
-                'avg_occupancy': round(row[('occupancy_rate', 'mean')], 2),
-                'avg_price': round(row[('price', 'mean')], 2)
-            })
-    else:
-        curve_data = []
+    # Booking curve: average occupancy and price by days between booking and check-in,
+    # from the rows already loaded
+    check_in_dates, booking_dates, occupancy_rates, prices, _ = zip(*historical_data)
+    curve = analytics_kernels.booking_curve(analytics_kernels.lead_time_bookings(
+        check_in_dates, booking_dates, occupancy_rates, prices
+    ))
+    curve_data = [
+        {
+            'days_before_checkin': int(days_before),
+            'avg_occupancy': round(avg_occupancy, 2),
+            'avg_price': round(avg_price, 2)
+        }
+        for days_before, avg_occupancy, avg_price in zip(
+            curve['days_before_checkin'], curve['avg_occupancy'], curve['avg_price']
+        )
+    ]
     
-    return {
+    result = {
+        'hotel_id': hotel_id,
         'hotel_name': hotel_name,
         'total_records': len(historical_data),
         'occupancy_data': occupancy_data,
         'booking_curve': curve_data
     }
+    
+    if max_points or resolution:
+        order = sorted(range(len(historical_data)), key=lambda i: historical_data[i].check_in_date)
+        result['occupancy_data'], result['downsampling'] = downsampling.downsample_series(
+            [occupancy_data[i] for i in order],
+            [historical_data[i].check_in_date for i in order],
+            {
+                'occupancy_rate': [historical_data[i].occupancy_rate for i in order],
+                'price': [historical_data[i].price for i in order]
+            },
+            max_points=max_points,
+            resolution=resolution,
+            keep=['season']
+        )
+    
+    return result
 
 @router.get("/seasonal-analysis")
+@cached(tags=lambda args: tags_for_city(args['city']))
 async def get_seasonal_analysis(
     city: str,
     year: int = Query(2024),
+    use_rollups: bool = Query(False),
     db: Session = Depends(get_db)
 ):
     """Analyze seasonal pricing patterns for a city."""
     # Get hotels in the city
     hotels = db.query(Hotel).filter(
-        Hotel.city.ilike(f"%{city}%"),
+        Hotel.city_id.in_(cities.matching_ids(city)),
         Hotel.is_active == True
     ).all()
     
@@ -265,39 +429,54 @@ async def get_seasonal_analysis(
     start_date = datetime(year, 1, 1)
     end_date = datetime(year, 12, 31)
     
-    prices = db.query(HotelPrice).filter(
-        HotelPrice.hotel_id.in_(hotel_ids),
-        HotelPrice.check_in_date >= start_date,
-        HotelPrice.check_in_date <= end_date
-    ).all()
+    if use_rollups:
+        data_source = 'rollups'
+        monthly_stats = price_rollups.monthly_hotel_stats(
+            db, hotel_ids, start_date.date(), end_date.date()
+        )
+    else:
+        if price_archive.use_archive_for((end_date - start_date).days):
+            data_source = 'archive'
+            table = price_archive.scan_prices(
+                ['check_in_date', 'price'],
+                hotel_ids=hotel_ids,
+                cities={hotel.city for hotel in hotels},
+                check_in_from=start_date,
+                check_in_to=end_date
+            )
+            monthly = price_aggregates.monthly_aggregates_from_table(table)
+        else:
+            data_source = 'database'
+            monthly = price_aggregates.monthly_aggregates(
+                db, hotel_ids, check_in_from=start_date, check_in_to=end_date
+            )
+        
+        # Count, average, min and max per month from the aggregates
+        monthly_stats = {
+            month: price_rollups.summarize(*aggregates)
+            for month, aggregates in monthly.items()
+        }
     
-    if not prices:
+    total_price_records = sum(stats['count'] for stats in monthly_stats.values())
+    if total_price_records == 0:
         return {
             'city': city,
             'year': year,
             'message': 'No price data available for the specified period'
         }
     
-    # Group by month
-    monthly_data = {}
-    for price in prices:
-        month = price.check_in_date.month
-        if month not in monthly_data:
-            monthly_data[month] = []
-        monthly_data[month].append(price.price)
-    
     # Calculate monthly statistics
     seasonal_analysis = []
     for month in range(1, 13):
-        if month in monthly_data:
-            prices_month = monthly_data[month]
+        if month in monthly_stats:
+            stats = monthly_stats[month]
             seasonal_analysis.append({
                 'month': month,
                 'month_name': datetime(year, month, 1).strftime('%B'),
-                'average_price': round(np.mean(prices_month), 2),
-                'min_price': round(np.min(prices_month), 2),
-                'max_price': round(np.max(prices_month), 2),
-                'price_count': len(prices_month)
+                'average_price': round(stats['average'], 2),
+                'min_price': round(stats['min'], 2),
+                'max_price': round(stats['max'], 2),
+                'price_count': stats['count']
             })
         else:
             seasonal_analysis.append({
@@ -313,6 +492,7 @@ async def get_seasonal_analysis(
         'city': city,
         'year': year,
         'hotels_analyzed': len(hotels),
-        'total_price_records': len(prices),
+        'total_price_records': total_price_records,
+        'data_source': data_source,
         'seasonal_analysis': seasonal_analysis
-    } 
\ No newline at end of file
+    }
\ No newline at end of file
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+
+from app.cache import response_cache
+
+router = APIRouter()
+
+@router.get("/stats")
+async def get_cache_stats():
+    """Get analytics response cache statistics (hits, misses, entries per endpoint)."""
+    return response_cache.stats()
+
+@router.delete("/")
+async def clear_cache():
+    """Drop every cached analytics response."""
+    response_cache.clear()
+    return {"message": "Cache cleared"}
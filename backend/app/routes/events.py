@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 
 from app.database import get_db
 from app.models.event import Event, EventCreate, EventUpdate, EventResponse
+from app.services import cities
 
 router = APIRouter()
 
@@ -22,7 +23,7 @@ async def get_events(
     query = db.query(Event)
     
     if city:
-        query = query.filter(Event.city.ilike(f"%{city}%"))
+        query = query.filter(Event.city_id.in_(cities.matching_ids(city)))
     
     if event_type:
         query = query.filter(Event.event_type == event_type)
@@ -35,7 +36,7 @@ async def get_events(
         end_dt = datetime.strptime(end_date, '%Y-%m-%d')
         query = query.filter(Event.end_date <= end_dt)
     
-    events = query.offset(skip).limit(limit).order_by(Event.start_date).all()
+    events = query.order_by(Event.start_date).offset(skip).limit(limit).all()
     return events
 
 @router.get("/{event_id}", response_model=EventResponse)
@@ -101,7 +102,7 @@ async def get_upcoming_events(
     )
     
     if city:
-        query = query.filter(Event.city.ilike(f"%{city}%"))
+        query = query.filter(Event.city_id.in_(cities.matching_ids(city)))
     
     events = query.order_by(Event.start_date).all()
     
@@ -165,7 +166,7 @@ async def get_event_impact_analysis(
     # Get events in the city
     cutoff_date = datetime.now() - timedelta(days=days_back)
     events = db.query(Event).filter(
-        Event.city.ilike(f"%{city}%"),
+        Event.city_id.in_(cities.matching_ids(city)),
         Event.start_date >= cutoff_date
     ).order_by(Event.start_date).all()
     
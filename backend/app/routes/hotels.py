@@ -1,40 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
+import logging
 
 from app.database import get_db
 from app.models.hotel import (
-    Hotel, HotelPrice, HotelCreate, HotelUpdate, HotelResponse, 
+    Hotel, HotelPrice, HotelCreate, HotelUpdate, HotelResponse, HotelSearchResult, HotelCompetitor,
     HotelPriceCreate, HotelPriceResponse, HotelWithPrices
 )
+from app.services import cities, downsampling, hotel_locations, hotel_search, price_rows, resource_versions
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def _passthrough_headers(response: Response) -> dict:
+    """Headers set on the injected Response, for handlers returning their own response."""
+    return {name: value for name, value in response.headers.items() if name != "content-length"}
 
 @router.get("/", response_model=List[HotelResponse])
 async def get_hotels(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = Query(None, ge=0),
     city: Optional[str] = None,
     active_only: bool = Query(True),  # Changed back to True so deleted hotels don't show
     db: Session = Depends(get_db)
 ):
-    """Get all hotels with optional filtering."""
+    """
+    Get all hotels with optional filtering. Supports If-None-Match.
+    
+    `after_id` switches from OFFSET to keyset pagination: hotels are ordered by ID
+    and the next page starts after the ID in the X-Next-After-Id header.
+    """
+    not_modified = resource_versions.conditional_get(request, response, db, [resource_versions.HOTEL_LIST])
+    if not_modified:
+        return not_modified
+    
     query = db.query(Hotel)
     
     if active_only:
         query = query.filter(Hotel.is_active == True)
     
     if city:
-        query = query.filter(Hotel.city.ilike(f"%{city}%"))
+        query = query.filter(Hotel.city_id.in_(cities.matching_ids(city)))
     
-    hotels = query.offset(skip).limit(limit).all()
-    print(f"GET /api/hotels - Found {len(hotels)} hotels in database")
-    print(f"active_only filter: {active_only}")
-    for hotel in hotels:
-        print(f"  - Hotel: {hotel.name} (ID: {hotel.id}, Active: {hotel.is_active})")
+    if after_id is not None:
+        hotels = query.filter(Hotel.id > after_id).order_by(Hotel.id).limit(limit).all()
+        if len(hotels) == limit:
+            response.headers["X-Next-After-Id"] = str(hotels[-1].id)
+    else:
+        hotels = query.order_by(Hotel.id).offset(skip).limit(limit).all()
+    logger.debug("Listed %d hotels", len(hotels), extra={'count': len(hotels), 'active_only': active_only, 'city': city})
     return hotels
 
+# Declared before /{hotel_id} so "search" is not taken for a hotel ID
+@router.get("/search", response_model=List[HotelSearchResult])
+async def search_hotels(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+    active_only: bool = Query(True),
+    db: Session = Depends(get_db)
+):
+    """
+    Autocomplete over hotel names, cities and addresses.
+    
+    Every term of `q` must occur in one of them; hotels whose name starts with `q`
+    come first.
+    """
+    return hotel_search.search(db, q, limit=limit, active_only=active_only)
+
 @router.get("/{hotel_id}", response_model=HotelResponse)
 async def get_hotel(hotel_id: int, db: Session = Depends(get_db)):
     """Get a specific hotel by ID."""
@@ -43,6 +81,57 @@ async def get_hotel(hotel_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Hotel not found")
     return hotel
 
+@router.get("/{hotel_id}/competitors", response_model=List[HotelCompetitor])
+async def get_hotel_competitors(
+    request: Request,
+    response: Response,
+    hotel_id: int,
+    radius_km: Optional[float] = Query(None, gt=0, le=hotel_locations.MAX_RADIUS_KM),
+    k: Optional[int] = Query(None, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Active hotels near a hotel, nearest first, with their distance in km.
+    
+    Returns the hotels within `radius_km`, the `k` nearest (at most 100 km away) or
+    the `k` nearest within `radius_km`; with neither, the 10 nearest. Supports
+    If-None-Match.
+    """
+    not_modified = resource_versions.conditional_get(request, response, db, [resource_versions.HOTEL_LIST])
+    if not_modified:
+        return not_modified
+    
+    hotel = db.query(Hotel).filter(Hotel.id == hotel_id).first()
+    if not hotel:
+        raise HTTPException(status_code=404, detail="Hotel not found")
+    if hotel.latitude is None or hotel.longitude is None:
+        raise HTTPException(status_code=400, detail=f"Hotel {hotel_id} has no coordinates")
+    
+    filters = [Hotel.id != hotel_id, Hotel.is_active == True]
+    if k is None and radius_km is None:
+        k = hotel_locations.DEFAULT_NEAREST
+    if k is None:
+        found = hotel_locations.within(db, hotel.latitude, hotel.longitude, radius_km, *filters)
+    else:
+        found = hotel_locations.nearest(
+            db, hotel.latitude, hotel.longitude, k, *filters,
+            max_radius_km=radius_km or hotel_locations.MAX_RADIUS_KM
+        )
+    
+    return [
+        HotelCompetitor(
+            id=competitor.id,
+            name=competitor.name,
+            city=competitor.city,
+            star_rating=competitor.star_rating,
+            user_rating=competitor.user_rating,
+            latitude=competitor.latitude,
+            longitude=competitor.longitude,
+            distance_km=round(distance, 3)
+        )
+        for competitor, distance in found
+    ]
+
 @router.post("/", response_model=HotelResponse)
 async def create_hotel(hotel_data: HotelCreate, db: Session = Depends(get_db)):
     """Create a new hotel."""
@@ -84,53 +173,118 @@ async def update_hotel(
 @router.delete("/{hotel_id}")
 async def delete_hotel(hotel_id: int, db: Session = Depends(get_db)):
     """Permanently delete a hotel and all its associated data."""
-    print(f"DELETE request for hotel ID: {hotel_id}")
-    
     hotel = db.query(Hotel).filter(Hotel.id == hotel_id).first()
     if not hotel:
-        print(f"Hotel with ID {hotel_id} not found")
         raise HTTPException(status_code=404, detail="Hotel not found")
     
-    print(f"Found hotel: {hotel.name} (ID: {hotel.id}) - will be permanently deleted")
-    
     # Delete all associated price data first
-    price_count = db.query(HotelPrice).filter(HotelPrice.hotel_id == hotel_id).count()
-    db.query(HotelPrice).filter(HotelPrice.hotel_id == hotel_id).delete()
-    print(f"Deleted {price_count} price records for hotel {hotel_id}")
+    price_count = db.query(HotelPrice).filter(HotelPrice.hotel_id == hotel_id).delete()
     
     # Delete the hotel
     db.delete(hotel)
     db.commit()
     
-    print(f"Hotel {hotel.name} (ID: {hotel_id}) permanently deleted from database")
-    
-    # Check total hotels after deletion
-    total_hotels = db.query(Hotel).count()
-    active_hotels = db.query(Hotel).filter(Hotel.is_active == True).count()
-    print(f"After deletion - Total hotels: {total_hotels}, Active hotels: {active_hotels}")
+    logger.info(
+        "Permanently deleted hotel %s and %d prices", hotel.name, price_count,
+        extra={'hotel_id': hotel_id, 'prices_deleted': price_count}
+    )
     
     return {"message": "Hotel permanently deleted successfully"}
 
 @router.get("/{hotel_id}/prices", response_model=List[HotelPriceResponse])
 async def get_hotel_prices(
     hotel_id: int,
+    request: Request,
+    response: Response,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    max_points: Optional[int] = Query(None, ge=downsampling.MIN_POINTS, le=downsampling.MAX_POINTS),
+    resolution: Optional[str] = Query(None, regex=downsampling.RESOLUTION_PATTERN),
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    cursor: Optional[str] = None,
+    format: str = Query("json", regex="^(json|ndjson)$"),
     db: Session = Depends(get_db)
 ):
-    """Get price history for a specific hotel."""
-    query = db.query(HotelPrice).filter(HotelPrice.hotel_id == hotel_id)
+    """
+    Get price history for a specific hotel.
+    
+    The response stays a list of price records: `resolution` keeps only the lowest
+    and highest priced record per check-in hour/day/week/month, and `max_points`
+    keeps at most that many records chosen by LTTB. The reduction is reported in
+    the X-Original-Count, X-Returned-Count and X-Reduction-Ratio headers.
+    
+    `limit` returns one page ordered by (check_in_date, id) descending; pass the
+    X-Next-Cursor header back as `cursor` for the next page. `format=ndjson` streams
+    one record per line without loading the history in memory. Without these the
+    whole history is returned. Supports If-None-Match.
+    """
+    paginated = limit is not None or cursor is not None or format == "ndjson"
+    if paginated and (max_points or resolution):
+        raise HTTPException(status_code=400, detail="Downsampling cannot be combined with pagination or streaming")
+    
+    not_modified = resource_versions.conditional_get(
+        request, response, db, [resource_versions.hotel_resource(hotel_id)]
+    )
+    if not_modified:
+        return not_modified
+    
+    filters = [HotelPrice.hotel_id == hotel_id]
     
     if start_date:
         start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-        query = query.filter(HotelPrice.check_in_date >= start_dt)
+        filters.append(HotelPrice.check_in_date >= start_dt)
     
     if end_date:
         end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-        query = query.filter(HotelPrice.check_in_date <= end_dt)
+        filters.append(HotelPrice.check_in_date <= end_dt)
     
-    prices = query.order_by(HotelPrice.check_in_date.desc()).all()
-    return prices
+    if paginated:
+        try:
+            if cursor:
+                filters.append(price_rows.after_cursor(cursor))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if format == "ndjson":
+            return StreamingResponse(
+                price_rows.stream_ndjson(filters, limit),
+                media_type="application/x-ndjson",
+                headers=_passthrough_headers(response)
+            )
+        
+        page, next_cursor = price_rows.price_page(db, filters, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return ORJSONResponse(price_rows.as_dicts(page), headers=_passthrough_headers(response))
+    
+    # Column tuples instead of ORM objects, serialized with orjson below
+    prices = price_rows.price_rows(db, *filters, order_by=price_rows.KEYSET_ORDER)
+    
+    if max_points or resolution:
+        # Downsample in chronological order, return in the usual newest-first order
+        series = prices[::-1]
+        methods = []
+        if resolution:
+            keep = downsampling.bucket_extreme_indices(
+                [price.check_in_date for price in series], [price.price for price in series], resolution
+            )
+            series = [series[i] for i in keep]
+            methods.append(f'{resolution}_extremes')
+        if max_points and len(series) > max_points:
+            keep = downsampling.lttb_indices(
+                [price.check_in_date for price in series], [price.price for price in series], max_points
+            )
+            series = [series[i] for i in keep]
+            methods.append('lttb')
+        
+        summary = downsampling.reduction_summary(methods, len(prices), len(series))
+        response.headers["X-Downsampling-Method"] = summary['method']
+        response.headers["X-Original-Count"] = str(summary['original_points'])
+        response.headers["X-Returned-Count"] = str(summary['returned_points'])
+        response.headers["X-Reduction-Ratio"] = str(summary['reduction_ratio'])
+        prices = series[::-1]
+    
+    return ORJSONResponse(price_rows.as_dicts(prices), headers=_passthrough_headers(response))
 
 @router.post("/{hotel_id}/prices", response_model=HotelPriceResponse)
 async def add_hotel_price(
@@ -153,24 +307,41 @@ async def add_hotel_price(
 @router.get("/{hotel_id}/with-prices", response_model=HotelWithPrices)
 async def get_hotel_with_prices(
     hotel_id: int,
+    request: Request,
+    response: Response,
     days_back: int = Query(30, ge=1, le=365),
     db: Session = Depends(get_db)
 ):
-    """Get hotel with recent price data grouped by room type."""
-    hotel = db.query(Hotel).filter(Hotel.id == hotel_id).first()
+    """
+    Get hotel with recent price data grouped by room type.
+    
+    Supports If-None-Match; the ETag also changes daily as prices leave the
+    `days_back` window, which starts at midnight so the body is fixed for the day.
+    """
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    not_modified = resource_versions.conditional_get(
+        request, response, db, [resource_versions.hotel_resource(hotel_id)],
+        today.strftime('%Y%m%d')
+    )
+    if not_modified:
+        return not_modified
+    
+    hotel = price_rows.hotel_row(db, hotel_id)
     if not hotel:
         raise HTTPException(status_code=404, detail="Hotel not found")
     
     # Get recent prices
-    cutoff_date = datetime.now() - timedelta(days=days_back)
-    prices = db.query(HotelPrice).filter(
+    cutoff_date = today - timedelta(days=days_back)
+    prices = price_rows.price_rows(
+        db,
         HotelPrice.hotel_id == hotel_id,
-        HotelPrice.scraped_at >= cutoff_date
-    ).order_by(HotelPrice.check_in_date.desc(), HotelPrice.scraped_at.desc()).all()
+        HotelPrice.scraped_at >= cutoff_date,
+        order_by=[HotelPrice.check_in_date.desc(), HotelPrice.scraped_at.desc()]
+    )
     
-    return HotelWithPrices(
-        **hotel.__dict__,
-        prices=prices
+    return ORJSONResponse(
+        {**hotel, 'prices': price_rows.as_dicts(prices)},
+        headers=_passthrough_headers(response)
     )
 
 @router.get("/cities/list")
@@ -226,19 +397,13 @@ def test_create_hotel(db: Session = Depends(get_db)):
             longitude=-74.0060
         )
         
-        print(f"Creating test hotel: {test_hotel.name}")
         db.add(test_hotel)
         db.commit()
         db.refresh(test_hotel)
-        print(f"Test hotel created with ID: {test_hotel.id}")
-        
-        # Verify it was saved
-        saved_hotel = db.query(Hotel).filter(Hotel.id == test_hotel.id).first()
-        print(f"Verification - saved test hotel: {saved_hotel.name if saved_hotel else 'NOT FOUND'}")
         
         # Check total hotels
         total_hotels = db.query(Hotel).count()
-        print(f"Total hotels in database: {total_hotels}")
+        logger.info("Created test hotel", extra={'hotel_id': test_hotel.id, 'total_hotels': total_hotels})
         
         return {
             "success": True,
@@ -247,7 +412,7 @@ def test_create_hotel(db: Session = Depends(get_db)):
             "message": "Test hotel created successfully"
         }
     except Exception as e:
-        print(f"Error creating test hotel: {e}")
+        logger.exception("Error creating test hotel")
         return {
             "success": False,
             "error": str(e)
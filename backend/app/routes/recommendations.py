@@ -3,58 +3,76 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
-import numpy as np
-import pandas as pd
 
 from app.database import get_db
+from app.lazy_imports import lazy_import
+from app.cache import cached, tags_for_city, tags_for_hotels
 from app.models.hotel import Hotel, HotelPrice
 from app.models.historical_data import HistoricalData, YieldStrategy
 from app.models.event import Event
 from app.models.historical_data import YieldRecommendation, MarketAnalysis
+from app.services import (
+    amenity_model, analytics_kernels, cities, historical_bookings, hotel_locations, price_aggregates, price_archive,
+    price_rollups, yield_engine
+)
+from app.services.latest_prices import latest_prices
+
+np = lazy_import("numpy")
 
 router = APIRouter()
 
+def _no_competitors_reasoning(radius_km: Optional[float]) -> str:
+    """Reasoning of the recommendation for a hotel without competitors."""
+    if radius_km is None:
+        return "No competitors found in the same city for comparison"
+    return f"No competitors found within {radius_km:g} km for comparison"
+
 @router.get("/yield-recommendation/{hotel_id}")
+@cached(tags=lambda args: tags_for_hotels(args['db'], [args['hotel_id']], competitors=True, radius_km=args['radius_km']))
 async def get_yield_recommendation(
     hotel_id: int,
     check_in_date: Optional[str] = None,
     check_out_date: Optional[str] = None,
+    radius_km: Optional[float] = Query(None, gt=0, le=hotel_locations.MAX_RADIUS_KM),
     db: Session = Depends(get_db)
 ):
-    """Get yield management recommendations for a hotel."""
+    """
+    Get yield management recommendations for a hotel.
+    
+    Competitors are the other active hotels in the same city, or with `radius_km`
+    those within that distance of the hotel.
+    """
     hotel = db.query(Hotel).filter(Hotel.id == hotel_id).first()
     if not hotel:
         raise HTTPException(status_code=404, detail="Hotel not found")
     
-    # Get competitor hotels in the same city
-    competitors = db.query(Hotel).filter(
-        Hotel.city == hotel.city,
-        Hotel.id != hotel_id,
-        Hotel.is_active == True
-    ).all()
+    try:
+        competitors = hotel_locations.competitors(db, hotel, radius_km)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     if not competitors:
         return YieldRecommendation(
             recommendation_type="maintain",
-            reasoning="No competitors found in the same city for comparison",
+            reasoning=_no_competitors_reasoning(radius_km),
             confidence_score=0.5,
             factors=["No competitor data available"]
         )
     
-    # Get latest prices for competitors
+    check_in_dt = datetime.strptime(check_in_date, '%Y-%m-%d') if check_in_date else None
+    check_out_dt = datetime.strptime(check_out_date, '%Y-%m-%d') if check_out_date else None
+    
+    # Get latest prices for all competitors in one query
+    latest_competitor_prices = latest_prices(
+        db,
+        [competitor.id for competitor in competitors],
+        check_in_from=check_in_dt,
+        check_out_to=check_out_dt
+    )
+    
     competitor_prices = []
     for competitor in competitors:
-        price_query = db.query(HotelPrice).filter(HotelPrice.hotel_id == competitor.id)
-        
-        if check_in_date:
-            check_in_dt = datetime.strptime(check_in_date, '%Y-%m-%d')
-            price_query = price_query.filter(HotelPrice.check_in_date >= check_in_dt)
-        
-        if check_out_date:
-            check_out_dt = datetime.strptime(check_out_date, '%Y-%m-%d')
-            price_query = price_query.filter(HotelPrice.check_out_date <= check_out_dt)
-        
-        latest_price = price_query.order_by(desc(HotelPrice.scraped_at)).first()
+        latest_price = latest_competitor_prices.get(competitor.id)
         if latest_price:
             competitor_prices.append({
                 'hotel_id': competitor.id,
@@ -74,12 +92,7 @@ async def get_yield_recommendation(
         )
     
     # Get your hotel's latest price
-    your_price_query = db.query(HotelPrice).filter(HotelPrice.hotel_id == hotel_id)
-    if check_in_date:
-        check_in_dt = datetime.strptime(check_in_date, '%Y-%m-%d')
-        your_price_query = your_price_query.filter(HotelPrice.check_in_date >= check_in_dt)
-    
-    your_latest_price = your_price_query.order_by(desc(HotelPrice.scraped_at)).first()
+    your_latest_price = latest_prices(db, [hotel_id], check_in_from=check_in_dt).get(hotel_id)
     
     if not your_latest_price:
         return YieldRecommendation(
@@ -89,203 +102,434 @@ async def get_yield_recommendation(
             factors=["No hotel price data available"]
         )
     
-    # Calculate market analysis
-    competitor_prices_list = [cp['price'] for cp in competitor_prices]
-    avg_market_price = np.mean(competitor_prices_list)
-    your_price = your_latest_price.price
-    
-    # Calculate percentile
-    price_percentile = np.percentile(competitor_prices_list, 50)
-    your_percentile = np.percentile([your_price] + competitor_prices_list, 50)
-    
     # Check for events
+    now = datetime.now()
     events = db.query(Event).filter(
-        Event.city == hotel.city,
-        Event.start_date <= datetime.now() + timedelta(days=30),
-        Event.end_date >= datetime.now()
+        Event.city_id == hotel.city_id,
+        Event.start_date <= now + timedelta(days=30),
+        Event.end_date >= now
     ).all()
-    
-    event_impact = 0
-    event_factors = []
-    for event in events:
-        days_until_event = (event.start_date - datetime.now()).days
-        if days_until_event <= 7:
-            event_impact += event.impact_score * 0.3
-            event_factors.append(f"Major event: {event.name}")
-        elif days_until_event <= 30:
-            event_impact += event.impact_score * 0.1
-            event_factors.append(f"Upcoming event: {event.name}")
+    event_impact, event_factors = yield_engine.event_impacts(
+        events, np.zeros(len(events), dtype=int), 1, now
+    )
     
     # Generate recommendation
-    recommendation_type = "maintain"
-    reasoning = ""
-    suggested_price = None
-    confidence_score = 0.7
-    factors = []
-    
-    # Price positioning analysis
-    if your_price < avg_market_price * 0.8:
-        recommendation_type = "raise_price"
-        reasoning = "Your hotel is significantly underpriced compared to competitors"
-        suggested_price = avg_market_price * 0.9
-        factors.append("Underpriced vs market average")
-        confidence_score = 0.8
-    elif your_price > avg_market_price * 1.2:
-        recommendation_type = "lower_price"
-        reasoning = "Your hotel is overpriced compared to competitors"
-        suggested_price = avg_market_price * 1.1
-        factors.append("Overpriced vs market average")
-        confidence_score = 0.8
-    
-    # Event-based adjustments
-    if event_impact > 0:
-        if recommendation_type == "maintain":
-            recommendation_type = "raise_price"
-            reasoning = "Local events suggest opportunity for price increase"
-            suggested_price = your_price * (1 + event_impact)
-            factors.extend(event_factors)
-            confidence_score = 0.7
-        elif recommendation_type == "raise_price":
-            suggested_price = suggested_price * (1 + event_impact)
-            factors.extend(event_factors)
-    
-    # Seasonal adjustments
-    current_month = datetime.now().month
-    if current_month in [6, 7, 8]:  # Summer
-        if recommendation_type == "maintain":
-            recommendation_type = "raise_price"
-            reasoning = "Summer season typically allows for higher pricing"
-            suggested_price = your_price * 1.1
-            factors.append("Summer season")
-            confidence_score = 0.6
-    elif current_month in [12, 1, 2]:  # Winter
-        if recommendation_type == "maintain":
-            recommendation_type = "lower_price"
-            reasoning = "Winter season may require competitive pricing"
-            suggested_price = your_price * 0.9
-            factors.append("Winter season")
-            confidence_score = 0.6
-    
-    market_analysis = MarketAnalysis(
-        competitor_count=len(competitor_prices),
-        average_market_price=round(avg_market_price, 2),
-        price_percentile=round(your_percentile, 2),
-        recommended_price=round(suggested_price, 2) if suggested_price else your_price,
-        confidence_score=confidence_score
+    return analytics_kernels.yield_recommendation(
+        your_latest_price.price,
+        [cp['price'] for cp in competitor_prices],
+        event_impact[0],
+        event_factors[0],
+        now.month
+    )
+
+@router.get("/yield-recommendation/{hotel_id}/horizon")
+@cached(tags=lambda args: tags_for_hotels(args['db'], [args['hotel_id']], competitors=True, radius_km=args['radius_km']))
+async def get_yield_recommendation_horizon(
+    hotel_id: int,
+    days: int = Query(30, ge=1, le=365),
+    start_date: Optional[str] = None,
+    room_type: Optional[str] = None,
+    radius_km: Optional[float] = Query(None, gt=0, le=hotel_locations.MAX_RADIUS_KM),
+    db: Session = Depends(get_db)
+):
+    """
+    Get one yield recommendation per check-in night over the next `days` nights.
+    
+    Each night is compared against the competitors' latest prices for that same night,
+    with the events around that night and its own month for the seasonal rule. All
+    prices for the horizon are loaded in a single query. Competitors are chosen as
+    for /yield-recommendation/{hotel_id}.
+    """
+    hotel = db.query(Hotel).filter(Hotel.id == hotel_id).first()
+    if not hotel:
+        raise HTTPException(status_code=404, detail="Hotel not found")
+    
+    if start_date:
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+    else:
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    end = start + timedelta(days=days)
+    nights = [start + timedelta(days=i) for i in range(days)]
+    night_index = {night.date(): i for i, night in enumerate(nights)}
+    
+    try:
+        competitors = hotel_locations.competitors(db, hotel, radius_km)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    competitor_row = {competitor.id: i for i, competitor in enumerate(competitors)}
+    
+    # Latest price per hotel and night for the whole horizon in one query
+    prices = latest_prices(
+        db,
+        [hotel_id] + list(competitor_row),
+        per_night=True,
+        room_type=room_type,
+        check_in_from=start,
+        check_in_to=end - timedelta(seconds=1)
     )
     
-    return YieldRecommendation(
-        recommendation_type=recommendation_type,
-        reasoning=reasoning,
-        suggested_price=round(suggested_price, 2) if suggested_price else None,
-        confidence_score=confidence_score,
-        factors=factors,
-        market_analysis=market_analysis
+    your_price = np.full(days, np.nan)
+    market = np.full((len(competitors), days), np.nan)
+    for (price_hotel_id, night), price in prices.items():
+        if price_hotel_id == hotel_id:
+            your_price[night_index[night]] = price.price
+        else:
+            market[competitor_row[price_hotel_id], night_index[night]] = price.price
+    
+    has_price = ~np.isnan(your_price)
+    competitor_count = (~np.isnan(market)).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        market_average = np.nansum(market, axis=0) / competitor_count
+    
+    # Median of the hotel's price together with the competitors', per night
+    valid = has_price & (competitor_count > 0)
+    percentile = np.zeros(days)
+    if valid.any():
+        percentile[valid] = np.nanmedian(np.vstack([your_price, market])[:, valid], axis=0)
+    
+    events = db.query(Event).filter(
+        Event.city_id == hotel.city_id,
+        Event.start_date <= end + timedelta(days=yield_engine.NIGHT_EVENT_LEAD_DAYS),
+        Event.end_date >= start
+    ).order_by(Event.id).all()
+    event_impact, event_factors = yield_engine.nightly_event_impacts(events, nights)
+    
+    rules = yield_engine.evaluate_rules(
+        np.nan_to_num(your_price),
+        np.nan_to_num(market_average),
+        event_impact,
+        np.array([night.month for night in nights])
+    )
+    
+    results = []
+    for i, night in enumerate(nights):
+        if not competitors:
+            recommendation = YieldRecommendation(
+                recommendation_type="maintain",
+                reasoning=_no_competitors_reasoning(radius_km),
+                confidence_score=0.5,
+                factors=["No competitor data available"]
+            )
+        elif competitor_count[i] == 0:
+            recommendation = YieldRecommendation(
+                recommendation_type="maintain",
+                reasoning="No recent competitor price data available",
+                confidence_score=0.5,
+                factors=["No competitor price data"]
+            )
+        elif not has_price[i]:
+            recommendation = YieldRecommendation(
+                recommendation_type="maintain",
+                reasoning="No recent price data for your hotel",
+                confidence_score=0.3,
+                factors=["No hotel price data available"]
+            )
+        else:
+            recommendation = yield_engine.build_recommendation(
+                rules, i,
+                your_price=float(your_price[i]),
+                market_average=market_average[i],
+                price_percentile=percentile[i],
+                competitor_count=int(competitor_count[i]),
+                event_factors=event_factors[i]
+            )
+        results.append({
+            'check_in_date': night.strftime('%Y-%m-%d'),
+            'your_price': float(your_price[i]) if has_price[i] else None,
+            'event_impact': round(float(event_impact[i]), 4),
+            **recommendation.dict()
+        })
+    
+    return {
+        'hotel_id': hotel_id,
+        'hotel_name': hotel.name,
+        'start_date': start.strftime('%Y-%m-%d'),
+        'days': days,
+        'room_type': room_type,
+        'nights_with_prices': int(valid.sum()),
+        'nights': results
+    }
+
+def _batch_tags(args: Dict[str, Any]) -> List[str]:
+    """Cache tags of /yield-recommendations; with a radius, markets reach past the city's hotels."""
+    hotel_ids = args['hotel_ids']
+    if args['radius_km'] is not None and not hotel_ids:
+        hotel_ids = [hotel_id for (hotel_id,) in args['db'].query(Hotel.id).filter(
+            Hotel.city_id.in_(cities.matching_ids(args['city'])),
+            Hotel.is_active == True
+        )]
+    return tags_for_city(args['city']) + tags_for_hotels(
+        args['db'], hotel_ids, competitors=True, radius_km=args['radius_km']
     )
 
+@router.get("/yield-recommendations")
+@cached(tags=_batch_tags)
+async def get_batch_yield_recommendations(
+    city: Optional[str] = None,
+    hotel_ids: List[int] = Query([]),
+    check_in_date: Optional[str] = None,
+    check_out_date: Optional[str] = None,
+    radius_km: Optional[float] = Query(None, gt=0, le=hotel_locations.MAX_RADIUS_KM),
+    db: Session = Depends(get_db)
+):
+    """
+    Get yield management recommendations for every hotel in a city or a list of hotels.
+    
+    Produces the same recommendation as /yield-recommendation/{hotel_id} for each
+    hotel, but loads the market once and evaluates the rules over all hotels at once.
+    With `radius_km`, each hotel's competitors are the hotels within that distance.
+    """
+    if not city and not hotel_ids:
+        raise HTTPException(status_code=400, detail="Either a city or at least one hotel ID is required")
+    
+    target_query = db.query(Hotel)
+    if hotel_ids:
+        target_query = target_query.filter(Hotel.id.in_(hotel_ids))
+    if city:
+        target_query = target_query.filter(
+            Hotel.city_id.in_(cities.matching_ids(city)),
+            Hotel.is_active == True
+        )
+    targets = target_query.order_by(Hotel.id).all()
+    
+    if not targets:
+        raise HTTPException(status_code=404, detail="No hotels found")
+    
+    check_in_dt = datetime.strptime(check_in_date, '%Y-%m-%d') if check_in_date else None
+    check_out_dt = datetime.strptime(check_out_date, '%Y-%m-%d') if check_out_date else None
+    now = datetime.now()
+    
+    # Load the market once: every active hotel in the target cities (or within the
+    # radius of a target), their latest prices (competitor window and own-price
+    # window) and upcoming events
+    city_ids = sorted({hotel.city_id for hotel in targets if hotel.city_id is not None})
+    if radius_km is None:
+        market_hotels = db.query(Hotel).filter(
+            Hotel.city_id.in_(city_ids),
+            Hotel.is_active == True
+        ).all() if city_ids else []
+    else:
+        areas = hotel_locations.neighbours(db, targets, radius_km, Hotel.is_active == True)
+        market_hotels = list({hotel.id: hotel for area in areas.values() for hotel in area}.values())
+    market_prices = latest_prices(
+        db, [hotel.id for hotel in market_hotels],
+        check_in_from=check_in_dt, check_out_to=check_out_dt
+    )
+    own_prices = latest_prices(db, [hotel.id for hotel in targets], check_in_from=check_in_dt)
+    events = db.query(Event).filter(
+        Event.city_id.in_(city_ids),
+        Event.start_date <= now + timedelta(days=30),
+        Event.end_date >= now
+    ).order_by(Event.id).all() if city_ids else []
+    
+    city_index = {city_id: i for i, city_id in enumerate(city_ids)}
+    event_impact_by_city, event_factors_by_city = yield_engine.event_impacts(
+        events, np.array([city_index[event.city_id] for event in events], dtype=int), len(city_ids), now
+    )
+    
+    hotels_by_city = {}
+    for hotel in market_hotels:
+        hotels_by_city.setdefault(hotel.city_id, []).append(hotel)
+    
+    results = []
+    if radius_km is not None:
+        # Every hotel has a market of its own, so recommend hotel by hotel
+        for hotel in targets:
+            competitor_prices = [
+                market_prices[competitor.id].price
+                for competitor in areas.get(hotel.id, []) if competitor.id in market_prices
+            ]
+            if hotel.id not in areas:
+                recommendation = YieldRecommendation(
+                    recommendation_type="maintain",
+                    reasoning=f"Hotel {hotel.id} has no coordinates",
+                    confidence_score=0.5,
+                    factors=["No hotel coordinates available"]
+                )
+            elif not areas[hotel.id]:
+                recommendation = YieldRecommendation(
+                    recommendation_type="maintain",
+                    reasoning=_no_competitors_reasoning(radius_km),
+                    confidence_score=0.5,
+                    factors=["No competitor data available"]
+                )
+            elif not competitor_prices:
+                recommendation = YieldRecommendation(
+                    recommendation_type="maintain",
+                    reasoning="No recent competitor price data available",
+                    confidence_score=0.5,
+                    factors=["No competitor price data"]
+                )
+            elif hotel.id not in own_prices:
+                recommendation = YieldRecommendation(
+                    recommendation_type="maintain",
+                    reasoning="No recent price data for your hotel",
+                    confidence_score=0.3,
+                    factors=["No hotel price data available"]
+                )
+            else:
+                group = city_index.get(hotel.city_id)
+                recommendation = analytics_kernels.yield_recommendation(
+                    own_prices[hotel.id].price,
+                    competitor_prices,
+                    event_impact_by_city[group] if group is not None else 0.0,
+                    event_factors_by_city[group] if group is not None else [],
+                    now.month
+                )
+            results.append((hotel, recommendation))
+    
+    # With a radius every hotel was handled above
+    for city_id in ([None] + city_ids if radius_km is None else []):
+        group = [hotel for hotel in targets if hotel.city_id == city_id]
+        if not group:
+            continue
+        if city_id is None:
+            # Hotels without a city have no competitor set
+            for hotel in group:
+                results.append((hotel, YieldRecommendation(
+                    recommendation_type="maintain",
+                    reasoning="No competitors found in the same city for comparison",
+                    confidence_score=0.5,
+                    factors=["No competitor data available"]
+                )))
+            continue
+        
+        competitors = hotels_by_city.get(city_id, [])
+        market_ids = [hotel.id for hotel in competitors if hotel.id in market_prices]
+        market = np.sort(np.array([market_prices[hotel_id].price for hotel_id in market_ids], dtype=float))
+        market_sum = market.sum()
+        
+        competitor_ids = {hotel.id for hotel in competitors}
+        in_market = np.array([hotel.id in market_prices and hotel.id in competitor_ids for hotel in group])
+        own_market_price = np.array([
+            market_prices[hotel.id].price if in_market[i] else 0.0 for i, hotel in enumerate(group)
+        ])
+        has_price = np.array([hotel.id in own_prices for hotel in group])
+        your_price = np.array([own_prices[hotel.id].price if has_price[i] else 0.0 for i, hotel in enumerate(group)])
+        
+        # Leave-one-out market statistics per hotel
+        competitor_count = len(market) - in_market.astype(int)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            market_average = (market_sum - own_market_price) / competitor_count
+        percentile = yield_engine.leave_one_out_median(market, own_market_price, in_market, your_price)
+        
+        rules = yield_engine.evaluate_rules(
+            your_price,
+            market_average,
+            np.full(len(group), event_impact_by_city[city_index[city_id]]),
+            np.full(len(group), now.month)
+        )
+        
+        for i, hotel in enumerate(group):
+            if len(competitor_ids - {hotel.id}) == 0:
+                recommendation = YieldRecommendation(
+                    recommendation_type="maintain",
+                    reasoning="No competitors found in the same city for comparison",
+                    confidence_score=0.5,
+                    factors=["No competitor data available"]
+                )
+            elif competitor_count[i] == 0:
+                recommendation = YieldRecommendation(
+                    recommendation_type="maintain",
+                    reasoning="No recent competitor price data available",
+                    confidence_score=0.5,
+                    factors=["No competitor price data"]
+                )
+            elif not has_price[i]:
+                recommendation = YieldRecommendation(
+                    recommendation_type="maintain",
+                    reasoning="No recent price data for your hotel",
+                    confidence_score=0.3,
+                    factors=["No hotel price data available"]
+                )
+            else:
+                recommendation = yield_engine.build_recommendation(
+                    rules, i,
+                    your_price=float(your_price[i]),
+                    market_average=market_average[i],
+                    price_percentile=percentile[i],
+                    competitor_count=int(competitor_count[i]),
+                    event_factors=event_factors_by_city[city_index[city_id]]
+                )
+            results.append((hotel, recommendation))
+    
+    return {
+        'city': city,
+        'hotels_analyzed': len(results),
+        'generated_at': now.isoformat(),
+        'recommendations': [
+            {
+                'hotel_id': hotel.id,
+                'hotel_name': hotel.name,
+                **recommendation.dict()
+            }
+            for hotel, recommendation in sorted(results, key=lambda item: item[0].id)
+        ]
+    }
+
 @router.get("/booking-pace-analysis")
+@cached(tags=lambda args: ['historical'])
 async def get_booking_pace_analysis(
-    hotel_name: str,
+    hotel_name: Optional[str] = None,
+    hotel_id: Optional[int] = None,
     days_back: int = Query(90, ge=30, le=365),
     db: Session = Depends(get_db)
 ):
-    """Analyze booking pace patterns for yield management."""
+    """
+    Analyze booking pace patterns for yield management.
+    
+    The hotel is given by `hotel_id`, or by `hotel_name`, which matches every hotel
+    whose name contains it.
+    """
+    if hotel_id is None and not hotel_name:
+        raise HTTPException(status_code=400, detail="Either a hotel ID or a hotel name is required")
+    
     # Get historical data
     cutoff_date = datetime.now() - timedelta(days=days_back)
-    historical_data = db.query(HistoricalData).filter(
-        HistoricalData.hotel_name.ilike(f"%{hotel_name}%"),
+    columns = historical_bookings.booking_columns(
+        db,
+        historical_bookings.hotel_filter(db, hotel_id, hotel_name),
         HistoricalData.booking_date >= cutoff_date
-    ).all()
+    )
     
-    if not historical_data:
-        raise HTTPException(status_code=404, detail=f"No historical data found for {hotel_name}")
+    if not columns['prices'].size:
+        raise HTTPException(status_code=404, detail=f"No historical data found for {hotel_name or f'hotel {hotel_id}'}")
     
     # Calculate booking curve
-    booking_curves = []
-    for record in historical_data:
-        if record.booking_date and record.check_in_date:
-            days_before = (record.check_in_date - record.booking_date).days
-            if days_before >= 0:
-                booking_curves.append({
-                    'days_before_checkin': days_before,
-                    'occupancy_rate': record.occupancy_rate,
-                    'price': record.price,
-                    'check_in_date': record.check_in_date
-                })
-    
-    if not booking_curves:
+    bookings = analytics_kernels.lead_time_bookings(**columns)
+    
+    if not bookings['days_before_checkin'].size:
         return {
+            'hotel_id': hotel_id,
             'hotel_name': hotel_name,
             'message': 'No booking curve data available'
         }
     
-    # Group by days before check-in
-    df = pd.DataFrame(booking_curves)
-    curve_analysis = df.groupby('days_before_checkin').agg({
-        'occupancy_rate': ['mean', 'std', 'count'],
-        'price': ['mean', 'std']
-    }).reset_index()
-    
-    # Calculate booking pace trends
-    pace_analysis = []
-    for _, row in curve_analysis.iterrows():
-        days_before = int(row['days_before_checkin'])
-        avg_occupancy = row[('occupancy_rate', 'mean')]
-        booking_count = row[('occupancy_rate', 'count')]
-        avg_price = row[('price', 'mean')]
-        
-        pace_analysis.append({
-            'days_before_checkin': days_before,
+    # Booking pace by days before check-in
+    curve = analytics_kernels.booking_curve(bookings)
+    pace_analysis = [
+        {
+            'days_before_checkin': int(days_before),
             'avg_occupancy_rate': round(avg_occupancy, 2),
             'booking_count': int(booking_count),
             'avg_price': round(avg_price, 2)
-        })
-    
-    # Sort by days before check-in
-    pace_analysis.sort(key=lambda x: x['days_before_checkin'])
-    
-    # Calculate pace recommendations
-    recent_bookings = [b for b in booking_curves if b['days_before_checkin'] <= 30]
-    if recent_bookings:
-        recent_avg_occupancy = np.mean([b['occupancy_rate'] for b in recent_bookings])
-        recent_avg_price = np.mean([b['price'] for b in recent_bookings])
-        
-        # Compare with historical average
-        historical_avg_occupancy = np.mean([b['occupancy_rate'] for b in booking_curves])
-        historical_avg_price = np.mean([b['price'] for b in booking_curves])
-        
-        occupancy_trend = recent_avg_occupancy - historical_avg_occupancy
-        price_trend = recent_avg_price - historical_avg_price
-        
-        if occupancy_trend < -0.1:  # 10% decrease
-            pace_recommendation = "discount"
-            pace_reasoning = "Recent booking pace is slower than historical average"
-        elif occupancy_trend > 0.1:  # 10% increase
-            pace_recommendation = "raise_price"
-            pace_reasoning = "Recent booking pace is faster than historical average"
-        else:
-            pace_recommendation = "maintain"
-            pace_reasoning = "Booking pace is within normal range"
-    else:
-        pace_recommendation = "maintain"
-        pace_reasoning = "Insufficient recent booking data"
-        occupancy_trend = 0
-        price_trend = 0
+        }
+        for days_before, avg_occupancy, booking_count, avg_price in zip(
+            curve['days_before_checkin'], curve['avg_occupancy'], curve['booking_count'], curve['avg_price']
+        )
+    ]
     
     return {
+        'hotel_id': hotel_id,
         'hotel_name': hotel_name,
         'analysis_period_days': days_back,
-        'total_bookings_analyzed': len(booking_curves),
+        'total_bookings_analyzed': len(bookings['days_before_checkin']),
         'booking_pace_analysis': pace_analysis,
-        'pace_recommendation': {
-            'recommendation': pace_recommendation,
-            'reasoning': pace_reasoning,
-            'occupancy_trend': round(occupancy_trend, 3),
-            'price_trend': round(price_trend, 2)
-        }
+        'pace_recommendation': analytics_kernels.booking_pace(bookings)
     }
 
 @router.get("/seasonal-recommendations")
+@cached(tags=lambda args: tags_for_city(args['city']))
 async def get_seasonal_recommendations(
     city: str,
     season: Optional[str] = Query(None, regex="^(spring|summer|autumn|winter)$"),
@@ -294,7 +538,7 @@ async def get_seasonal_recommendations(
     """Get seasonal pricing recommendations based on historical patterns."""
     # Get hotels in the city
     hotels = db.query(Hotel).filter(
-        Hotel.city.ilike(f"%{city}%"),
+        Hotel.city_id.in_(cities.matching_ids(city)),
         Hotel.is_active == True
     ).all()
     
@@ -303,28 +547,23 @@ async def get_seasonal_recommendations(
     
     hotel_ids = [hotel.id for hotel in hotels]
     
-    # Define season months
-    season_months = {
-        'spring': [3, 4, 5],
-        'summer': [6, 7, 8],
-        'autumn': [9, 10, 11],
-        'winter': [12, 1, 2]
-    }
+    months_filter = price_aggregates.SEASON_MONTHS[season] if season else None
     
-    # Get historical price data for the season
-    if season:
-        months = season_months[season]
-        prices = db.query(HotelPrice).filter(
-            HotelPrice.hotel_id.in_(hotel_ids),
-            func.extract('month', HotelPrice.check_in_date).in_(months)
-        ).all()
+    # Aggregate historical prices per check-in month; the whole history is scanned,
+    # so read it from the columnar archive when one is available
+    use_archive = price_archive.archive_available()
+    if use_archive:
+        table = price_archive.scan_prices(
+            ['check_in_date', 'price'],
+            hotel_ids=hotel_ids,
+            cities={hotel.city for hotel in hotels}
+        )
+        monthly = price_aggregates.monthly_aggregates_from_table(table, months=months_filter)
     else:
-        # Get all seasonal data
-        prices = db.query(HotelPrice).filter(
-            HotelPrice.hotel_id.in_(hotel_ids)
-        ).all()
+        monthly = price_aggregates.monthly_aggregates(db, hotel_ids, months=months_filter)
     
-    if not prices:
+    total_price_records = sum(aggregates[0] for aggregates in monthly.values())
+    if total_price_records == 0:
         return {
             'city': city,
             'season': season,
@@ -332,33 +571,25 @@ async def get_seasonal_recommendations(
         }
     
     # Group by season and calculate statistics
-    seasonal_stats = {}
-    for price in prices:
-        month = price.check_in_date.month
-        current_season = None
-        for s, months in season_months.items():
-            if month in months:
-                current_season = s
-                break
-        
-        if current_season not in seasonal_stats:
-            seasonal_stats[current_season] = []
-        seasonal_stats[current_season].append(price.price)
+    seasonal_stats = {
+        s: price_rollups.summarize(*aggregates)
+        for s, aggregates in price_aggregates.seasonal_aggregates(monthly).items()
+    }
     
     # Calculate seasonal recommendations
     recommendations = []
-    for s, prices_list in seasonal_stats.items():
-        if len(prices_list) < 10:  # Need minimum data points
+    for s, stats in seasonal_stats.items():
+        if stats['count'] < 10:  # Need minimum data points
             continue
         
-        avg_price = np.mean(prices_list)
-        std_price = np.std(prices_list)
+        avg_price = stats['average']
+        std_price = stats['std']
         
         # Compare with other seasons
         other_seasons_avg = []
-        for other_s, other_prices in seasonal_stats.items():
-            if other_s != s and len(other_prices) >= 10:
-                other_seasons_avg.append(np.mean(other_prices))
+        for other_s, other_stats in seasonal_stats.items():
+            if other_s != s and other_stats['count'] >= 10:
+                other_seasons_avg.append(other_stats['average'])
         
         if other_seasons_avg:
             overall_avg = np.mean(other_seasons_avg)
@@ -385,46 +616,42 @@ async def get_seasonal_recommendations(
             'price_multiplier': round(price_multiplier, 2),
             'recommendation': recommendation,
             'reasoning': reasoning,
-            'data_points': len(prices_list)
+            'data_points': stats['count']
         })
     
     return {
         'city': city,
         'requested_season': season,
         'seasonal_recommendations': recommendations,
-        'total_price_records': len(prices)
+        'total_price_records': total_price_records,
+        'data_source': 'archive' if use_archive else 'database'
     }
 
 @router.get("/amenity-impact-analysis")
+@cached(tags=lambda args: tags_for_city(args['city']))
 async def get_amenity_impact_analysis(
     city: str,
     db: Session = Depends(get_db)
 ):
-    """Analyze the impact of amenities on pricing."""
-    hotels = db.query(Hotel).filter(
-        Hotel.city.ilike(f"%{city}%"),
-        Hotel.is_active == True,
-        Hotel.amenities.isnot(None)
-    ).all()
+    """
+    Analyze the impact of amenities on pricing.
+    
+    Alongside the raw with/without averages, each amenity gets a price premium from a
+    ridge regression on all amenities plus star and user rating.
+    """
+    hotels = db.query(Hotel).filter(*amenity_model.city_hotel_filters(city)).order_by(Hotel.id).all()
     
     if not hotels:
         raise HTTPException(status_code=404, detail=f"No hotels with amenity data found in {city}")
     
-    # Get latest prices for each hotel
-    hotel_data = []
-    for hotel in hotels:
-        latest_price = db.query(HotelPrice).filter(
-            HotelPrice.hotel_id == hotel.id
-        ).order_by(desc(HotelPrice.scraped_at)).first()
-        
-        if latest_price and hotel.amenities:
-            hotel_data.append({
-                'hotel_id': hotel.id,
-                'hotel_name': hotel.name,
-                'price': latest_price.price,
-                'star_rating': hotel.star_rating,
-                'amenities': hotel.amenities
-            })
+    # Get latest prices for all hotels in one query
+    latest = latest_prices(db, [hotel.id for hotel in hotels])
+    
+    hotel_data = [
+        (hotel, latest[hotel.id].price)
+        for hotel in hotels
+        if hotel.id in latest and hotel.amenities
+    ]
     
     if not hotel_data:
         return {
@@ -432,46 +659,16 @@ async def get_amenity_impact_analysis(
             'message': 'No price data available for amenity analysis'
         }
     
-    # Analyze amenity impact
-    amenity_analysis = {}
-    all_amenities = set()
-    
-    # Collect all unique amenities
-    for hotel in hotel_data:
-        all_amenities.update(hotel['amenities'])
-    
-    # Analyze each amenity
-    for amenity in all_amenities:
-        hotels_with_amenity = [h for h in hotel_data if amenity in h['amenities']]
-        hotels_without_amenity = [h for h in hotel_data if amenity not in h['amenities']]
-        
-        if hotels_with_amenity and hotels_without_amenity:
-            avg_price_with = np.mean([h['price'] for h in hotels_with_amenity])
-            avg_price_without = np.mean([h['price'] for h in hotels_without_amenity])
-            
-            price_impact = avg_price_with - avg_price_without
-            price_impact_percent = (price_impact / avg_price_without) * 100 if avg_price_without > 0 else 0
-            
-            amenity_analysis[amenity] = {
-                'hotels_with_amenity': len(hotels_with_amenity),
-                'hotels_without_amenity': len(hotels_without_amenity),
-                'avg_price_with': round(avg_price_with, 2),
-                'avg_price_without': round(avg_price_without, 2),
-                'price_impact': round(price_impact, 2),
-                'price_impact_percent': round(price_impact_percent, 1),
-                'significance': 'high' if abs(price_impact_percent) > 10 else 'medium' if abs(price_impact_percent) > 5 else 'low'
-            }
-    
-    # Sort by price impact
-    sorted_amenities = sorted(
-        amenity_analysis.items(),
-        key=lambda x: abs(x[1]['price_impact_percent']),
-        reverse=True
+    analysis = amenity_model.analyze_amenities(
+        prices=[price for _, price in hotel_data],
+        amenity_lists=[hotel.amenities for hotel, _ in hotel_data],
+        star_ratings=[hotel.star_rating for hotel, _ in hotel_data],
+        user_ratings=[hotel.user_rating for hotel, _ in hotel_data]
     )
     
     return {
         'city': city,
         'total_hotels_analyzed': len(hotel_data),
-        'total_amenities_analyzed': len(amenity_analysis),
-        'amenity_impact_analysis': dict(sorted_amenities)
+        'total_amenities_analyzed': len(analysis['amenity_impact_analysis']),
+        **analysis
     } 
\ No newline at end of file
@@ -4,12 +4,15 @@ from typing import List, Optional
 from datetime import datetime, timedelta
 import sys
 import os
+import logging
 from pydantic import BaseModel
 
 # Add the scraper directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'scraper'))
 
-from booking_scraper import BookingScraper
+from extraction_telemetry import telemetry
+from selector_ranking import ranking
+from app import metrics
 from app.database import get_db
 from app.models.hotel import (
     Hotel, HotelPrice, HotelCreate, HotelPriceCreate, 
@@ -17,6 +20,14 @@ from app.models.hotel import (
 )
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def new_scraper():
+    """A BookingScraper reporting to the metrics; requests and BeautifulSoup load on the first scrape, not at startup."""
+    from booking_scraper import BookingScraper, add_observer
+    
+    add_observer(metrics.observe_scraper)
+    return BookingScraper()
 
 class UpdatePricesRequest(BaseModel):
     check_in_date: str
@@ -34,7 +45,7 @@ async def scrape_hotel(
 ):
     """Scrape hotel data from Booking.com URL."""
     try:
-        scraper = BookingScraper()
+        scraper = new_scraper()
         
         # Extract hotel data
         scraped_data = scraper.extract_hotel_data(
@@ -49,9 +60,9 @@ async def scrape_hotel(
                 error=scraped_data['error']
             )
         
-        # Debug: Log what type was detected
-        print(f"DEBUG: Scraped data type: {scraped_data.get('type')}")
-        print(f"DEBUG: Scraped data keys: {list(scraped_data.keys())}")
+        logger.debug(
+            "Scraped hotel page", extra={'url': request.booking_url, 'fields': sorted(scraped_data.keys())}
+        )
         
         # Individual hotel page
         # Check if hotel already exists
@@ -95,30 +106,22 @@ async def scrape_hotel(
                 is_active=True  # Explicitly set as active
             )
             
-            print(f"Creating new hotel: {hotel_data.name}")
             hotel = Hotel(**hotel_data.dict())
             db.add(hotel)
-            print(f"Hotel created with ID: {hotel.id}")
-            print(f"Hotel is_active status: {hotel.is_active}")
-            
-            # Verify hotel was saved
-            saved_hotel = db.query(Hotel).filter(Hotel.id == hotel.id).first()
-            print(f"Verification - saved hotel: {saved_hotel.name if saved_hotel else 'NOT FOUND'}")
-            if saved_hotel:
-                print(f"Verification - saved hotel is_active: {saved_hotel.is_active}")
-            
-            # Check total hotels in database
-            total_hotels = db.query(Hotel).count()
-            active_hotels = db.query(Hotel).filter(Hotel.is_active == True).count()
-            print(f"Total hotels in database: {total_hotels}")
-            print(f"Active hotels in database: {active_hotels}")
         
         db.commit()
         db.refresh(hotel)
+        logger.info(
+            "%s hotel %s", "Updated" if existing_hotel else "Created", hotel.name,
+            extra={'hotel_id': hotel.id, 'url': request.booking_url}
+        )
         
         # If check-in and check-out dates are provided, automatically range scrape
         if request.check_in_date and request.check_out_date:
-            print(f"Automatically range scraping for hotel {hotel.id} from {request.check_in_date} to {request.check_out_date}")
+            logger.info(
+                "Range scraping new hotel from %s to %s", request.check_in_date, request.check_out_date,
+                extra={'hotel_id': hotel.id, 'job': 'auto_range'}
+            )
             
             # Call the range scraping function
             range_result = await scrape_date_range_internal(
@@ -129,9 +132,13 @@ async def scrape_hotel(
             )
             
             if range_result['success']:
-                print(f"Range scraping completed: {range_result['results']}")
+                logger.info(
+                    "Range scraping completed", extra={'hotel_id': hotel.id, 'job': 'auto_range', **range_result['results']}
+                )
             else:
-                print(f"Range scraping failed: {range_result['error']}")
+                logger.warning(
+                    "Range scraping failed: %s", range_result['error'], extra={'hotel_id': hotel.id, 'job': 'auto_range'}
+                )
         
         # Add guest information to response if available
         response_data = {
@@ -176,7 +183,7 @@ async def scrape_date_range_internal(
         if date_range > 30:
             return {'success': False, 'error': 'Date range cannot exceed 30 days'}
         
-        scraper = BookingScraper()
+        scraper = new_scraper()
         total_prices_added = 0
         total_prices_updated = 0
         successful_scrapes = 0
@@ -188,14 +195,15 @@ async def scrape_date_range_internal(
             check_in = current_date.strftime('%Y-%m-%d')
             check_out = (current_date + timedelta(days=1)).strftime('%Y-%m-%d')
             
-            print(f"Auto-scraping prices for {hotel.name}: {check_in} to {check_out}")
+            log_fields = {'hotel_id': hotel.id, 'job': 'auto_range', 'check_in': check_in}
+            logger.debug("Scraping prices for %s", check_in, extra=log_fields)
             
             try:
                 url = scraper._add_dates_to_url(hotel.booking_url, check_in, check_out)
                 scraped_data = scraper.extract_hotel_data(url, check_in, check_out)
                 
                 if 'error' in scraped_data:
-                    print(f"Error auto-scraping {check_in}: {scraped_data['error']}")
+                    logger.warning("Error scraping %s: %s", check_in, scraped_data['error'], extra={**log_fields, 'url': url})
                     failed_scrapes += 1
                     current_date += timedelta(days=1)
                     continue
@@ -248,7 +256,7 @@ async def scrape_date_range_internal(
                                 prices_added_for_date += 1
                         
                         except Exception as e:
-                            print(f"Error processing room price for {check_in}: {e}")
+                            logger.warning("Error processing room price for %s: %s", check_in, e, extra=log_fields)
                             continue
                     
                     if prices_added_for_date > 0 or prices_updated_for_date > 0:
@@ -263,7 +271,7 @@ async def scrape_date_range_internal(
                 time.sleep(1)
                 
             except Exception as e:
-                print(f"Error auto-scraping {check_in}: {e}")
+                logger.exception("Error scraping %s", check_in, extra=log_fields)
                 failed_scrapes += 1
             
             current_date += timedelta(days=1)
@@ -314,7 +322,7 @@ async def scrape_date_range(
                 'error': 'Date range cannot exceed 30 days'
             }
         
-        scraper = BookingScraper()
+        scraper = new_scraper()
         total_prices_added = 0
         total_prices_updated = 0
         successful_scrapes = 0
@@ -327,7 +335,8 @@ async def scrape_date_range(
             check_in = current_date.strftime('%Y-%m-%d')
             check_out = (current_date + timedelta(days=1)).strftime('%Y-%m-%d')
             
-            print(f"Scraping prices for {hotel.name}: {check_in} to {check_out}")
+            log_fields = {'hotel_id': hotel.id, 'job': 'date_range', 'check_in': check_in}
+            logger.debug("Scraping prices for %s", check_in, extra=log_fields)
             
             try:
                 # Add dates to URL
@@ -337,7 +346,7 @@ async def scrape_date_range(
                 scraped_data = scraper.extract_hotel_data(url, check_in, check_out)
                 
                 if 'error' in scraped_data:
-                    print(f"Error scraping {check_in}: {scraped_data['error']}")
+                    logger.warning("Error scraping %s: %s", check_in, scraped_data['error'], extra={**log_fields, 'url': url})
                     failed_scrapes += 1
                     current_date += timedelta(days=1)
                     continue
@@ -358,7 +367,7 @@ async def scrape_date_range(
                             
                             # Skip if no room type or price
                             if not room_type or not price:
-                                print(f"Skipping room with missing data for {check_in}: {room_info}")
+                                logger.debug("Skipping room with missing data: %s", room_info, extra=log_fields)
                                 continue
                             
                             # Check if price already exists for this hotel, date, and room type
@@ -377,7 +386,7 @@ async def scrape_date_range(
                                 existing_price.scraped_at = datetime.now()
                                 existing_price.source = 'booking.com'
                                 prices_updated_for_date += 1
-                                print(f"Updated price for {check_in}: {room_type} - {price} EUR")
+                                logger.debug("Updated price: %s - %s", room_type, price, extra=log_fields)
                             else:
                                 # Create new price record
                                 price_data = HotelPrice(
@@ -392,30 +401,34 @@ async def scrape_date_range(
                                 )
                                 db.add(price_data)
                                 prices_added_for_date += 1
-                                print(f"Added price for {check_in}: {room_type} - {price} EUR")
+                                logger.debug("Added price: %s - %s", room_type, price, extra=log_fields)
                         
                         except Exception as e:
-                            print(f"Error adding room price data for {check_in}: {e}")
+                            logger.warning("Error adding room price for %s: %s", check_in, e, extra=log_fields)
                             continue
                     
                     if prices_added_for_date > 0 or prices_updated_for_date > 0:
                         successful_scrapes += 1
                         total_prices_added += prices_added_for_date
                         total_prices_updated += prices_updated_for_date
-                        print(f"Successfully processed {prices_added_for_date} new and {prices_updated_for_date} updated prices for {check_in}")
+                        logger.info(
+                            "Processed %d new and %d updated prices for %s",
+                            prices_added_for_date, prices_updated_for_date, check_in,
+                            extra={**log_fields, 'prices_added': prices_added_for_date, 'prices_updated': prices_updated_for_date}
+                        )
                     else:
                         failed_scrapes += 1
-                        print(f"No prices found for {check_in}")
+                        logger.warning("No prices found for %s", check_in, extra=log_fields)
                 else:
                     failed_scrapes += 1
-                    print(f"No room data found for {check_in}")
+                    logger.warning("No room data found for %s", check_in, extra=log_fields)
                 
                 # Small delay to be respectful to the server
                 import time
                 time.sleep(1)
                 
             except Exception as e:
-                print(f"Error scraping {check_in}: {e}")
+                logger.exception("Error scraping %s", check_in, extra=log_fields)
                 failed_scrapes += 1
             
             current_date += timedelta(days=1)
@@ -453,4 +466,18 @@ async def get_scraping_status():
         'service': 'hotel-scraper',
         'version': '1.0.0',
         'timestamp': datetime.now().isoformat()
-    } 
\ No newline at end of file
+    }
+
+@router.get("/stats")
+async def get_extraction_stats():
+    """
+    Per-extractor timing, null rates and selector/pattern hit rates since startup or
+    the last reset, plus the decayed hit rates used to order selector fallbacks.
+    """
+    return {**telemetry.snapshot(), 'selector_ranking': ranking.snapshot()}
+
+@router.delete("/stats")
+async def reset_extraction_stats():
+    """Reset the scraper extraction statistics."""
+    telemetry.reset()
+    return {"message": "Extraction stats reset"}
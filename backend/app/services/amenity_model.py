@@ -0,0 +1,149 @@
+"""
+Hedonic amenity pricing model.
+
+Prices are regressed on a one-hot hotel x amenity matrix plus star and user rating
+with a ridge penalty, so each amenity's coefficient is its price premium once the
+hotel's class is accounted for. The endpoint caches results per city through
+`app.cache`, so they are dropped when the city's prices or hotels change.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.lazy_imports import lazy_import
+from app.models.hotel import Hotel
+from app.services import cities
+
+np = lazy_import("numpy")
+
+RIDGE_ALPHA = 1.0
+CONTROLS = ["star_rating", "user_rating"]
+
+
+def city_hotel_filters(city: str) -> list:
+    """Hotels considered for a city's amenity analysis."""
+    return [
+        Hotel.city_id.in_(cities.matching_ids(city)),
+        Hotel.is_active == True,
+        Hotel.amenities.isnot(None)
+    ]
+
+
+def amenity_matrix(amenity_lists: Sequence[Sequence[str]]) -> Tuple[np.ndarray, List[str]]:
+    """
+    One-hot hotel x amenity matrix built from (row, column) index arrays.
+
+    SciPy is not a dependency, so the matrix is a dense 0/1 array; at city scale
+    (thousands of hotels, a few hundred amenities) it stays small.
+    """
+    vocabulary = sorted({amenity for amenities in amenity_lists for amenity in amenities})
+    column = {amenity: j for j, amenity in enumerate(vocabulary)}
+    rows = np.repeat(np.arange(len(amenity_lists)), [len(amenities) for amenities in amenity_lists])
+    cols = np.fromiter(
+        (column[amenity] for amenities in amenity_lists for amenity in amenities),
+        dtype=int, count=len(rows)
+    )
+    matrix = np.zeros((len(amenity_lists), len(vocabulary)))
+    matrix[rows, cols] = 1.0
+    return matrix, vocabulary
+
+
+def _impute(values: Sequence[Optional[float]]) -> np.ndarray:
+    """Replace missing ratings with the mean of the known ones (0 if none are known)."""
+    array = np.array([np.nan if value is None else value for value in values], dtype=float)
+    known = ~np.isnan(array)
+    return np.where(known, array, array[known].mean() if known.any() else 0.0)
+
+
+def ridge_fit(features: np.ndarray, target: np.ndarray, alpha: float = RIDGE_ALPHA) -> Tuple[np.ndarray, float, float]:
+    """
+    Ridge regression with an unpenalized intercept.
+
+    Features are standardized before the fit so the penalty treats amenities and
+    ratings alike; coefficients are returned in the original units (price per unit
+    of each feature) together with the intercept and R².
+    """
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0)
+    varying = scale > 0
+    standardized = (features[:, varying] - mean[varying]) / scale[varying]
+    centered = target - target.mean()
+
+    gram = standardized.T @ standardized + alpha * np.eye(standardized.shape[1])
+    standardized_coef = np.linalg.solve(gram, standardized.T @ centered)
+
+    coef = np.zeros(features.shape[1])
+    coef[varying] = standardized_coef / scale[varying]
+    intercept = target.mean() - mean @ coef
+
+    residual = centered - standardized @ standardized_coef
+    total = centered @ centered
+    r_squared = 1 - (residual @ residual) / total if total > 0 else 0.0
+    return coef, float(intercept), float(r_squared)
+
+
+def _significance(percent: float) -> str:
+    return 'high' if abs(percent) > 10 else 'medium' if abs(percent) > 5 else 'low'
+
+
+def analyze_amenities(prices: Sequence[float], amenity_lists: Sequence[Sequence[str]],
+                      star_ratings: Sequence[Optional[float]],
+                      user_ratings: Sequence[Optional[float]]) -> Dict[str, Any]:
+    """
+    Per-amenity price impact for one city.
+
+    Keeps the raw with/without average comparison and adds the amenity's ridge
+    coefficient (`adjusted_price_impact`), controlling for the other amenities and
+    for star and user rating. Amenities every hotel (or no hotel) has are skipped.
+    """
+    price = np.asarray(prices, dtype=float)
+    matrix, vocabulary = amenity_matrix(amenity_lists)
+    controls = np.column_stack([_impute(star_ratings), _impute(user_ratings)])
+
+    coef, intercept, r_squared = ridge_fit(np.hstack([matrix, controls]), price)
+
+    # With/without averages for every amenity at once
+    with_count = matrix.sum(axis=0)
+    without_count = len(price) - with_count
+    with_sum = matrix.T @ price
+    without_sum = price.sum() - with_sum
+    mean_price = price.mean()
+
+    analysis = {}
+    for j in np.nonzero((with_count > 0) & (without_count > 0))[0]:
+        avg_price_with = with_sum[j] / with_count[j]
+        avg_price_without = without_sum[j] / without_count[j]
+        price_impact = avg_price_with - avg_price_without
+        price_impact_percent = (price_impact / avg_price_without) * 100 if avg_price_without > 0 else 0
+        adjusted_percent = (coef[j] / mean_price) * 100 if mean_price > 0 else 0
+        analysis[vocabulary[j]] = {
+            'hotels_with_amenity': int(with_count[j]),
+            'hotels_without_amenity': int(without_count[j]),
+            'avg_price_with': round(float(avg_price_with), 2),
+            'avg_price_without': round(float(avg_price_without), 2),
+            'price_impact': round(float(price_impact), 2),
+            'price_impact_percent': round(float(price_impact_percent), 1),
+            'significance': _significance(price_impact_percent),
+            'adjusted_price_impact': round(float(coef[j]), 2),
+            'adjusted_price_impact_percent': round(float(adjusted_percent), 1),
+            'adjusted_significance': _significance(adjusted_percent)
+        }
+
+    return {
+        'amenity_impact_analysis': dict(sorted(
+            analysis.items(),
+            key=lambda item: abs(item[1]['price_impact_percent']),
+            reverse=True
+        )),
+        'model': {
+            'method': 'ridge',
+            'alpha': RIDGE_ALPHA,
+            'r_squared': round(r_squared, 3),
+            'intercept': round(intercept, 2),
+            'controls': {
+                name: round(float(value), 2)
+                for name, value in zip(CONTROLS, coef[len(vocabulary):])
+            }
+        }
+    }
@@ -0,0 +1,149 @@
+"""
+Pure computations behind the analytics and recommendation endpoints.
+
+Route handlers load rows and shape responses; the math in between lives here, on
+plain sequences, so it can be benchmarked in isolation (`benchmarks.kernels`) and
+changed without touching the handlers.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.lazy_imports import lazy_import
+from app.models.historical_data import YieldRecommendation
+from app.services import yield_engine
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Bookings at most this many days before check-in count as recent booking pace
+RECENT_PACE_DAYS = 30
+# Occupancy difference (recent vs all bookings) that moves the pace recommendation
+PACE_OCCUPANCY_THRESHOLD = 0.1
+
+# Lead time bookings: days before check-in, occupancy rate (NaN when unknown) and price, in parallel arrays
+Bookings = Dict[str, "np.ndarray"]
+
+
+def lead_time_bookings(check_in_dates: Sequence[Optional[datetime]], booking_dates: Sequence[Optional[datetime]],
+                       occupancy_rates: Sequence[Optional[float]], prices: Sequence[float]) -> Bookings:
+    """
+    Bookings with both dates set and made on or before check-in, with their lead time in days.
+
+    Dates are datetime64 arrays (NaT when missing, see `historical_bookings.booking_columns`)
+    or sequences of datetimes and None.
+    """
+    check_in = np.asarray(check_in_dates, dtype="datetime64[us]")
+    booked = np.asarray(booking_dates, dtype="datetime64[us]")
+    dated = np.flatnonzero(~(np.isnat(check_in) | np.isnat(booked)))
+    # Whole days, rounded down like timedelta.days
+    days_before = (check_in[dated] - booked[dated]) // np.timedelta64(1, "D")
+    kept = days_before >= 0
+    rows = dated[kept]
+    return {
+        "days_before_checkin": days_before[kept],
+        "occupancy_rate": np.asarray(occupancy_rates, dtype=np.float64)[rows],
+        "price": np.asarray(prices, dtype=np.float64)[rows],
+    }
+
+
+def booking_curve(bookings: Bookings) -> Dict[str, np.ndarray]:
+    """
+    Mean occupancy, mean price and number of bookings per lead time, by increasing lead time.
+
+    Bookings without an occupancy rate count towards the mean price only.
+    """
+    days = bookings["days_before_checkin"]
+    if not days.size:
+        empty = np.array([], dtype=np.int64)
+        return {"days_before_checkin": empty, "avg_occupancy": np.array([]), "avg_price": np.array([]),
+                "booking_count": empty}
+    occupancy = bookings["occupancy_rate"]
+    rows = np.bincount(days)
+    lead = np.flatnonzero(rows)
+    price_sum = np.bincount(days, weights=bookings["price"])[lead]
+
+    known = ~np.isnan(occupancy)
+    if known.all():
+        occupancy_count = rows[lead]
+        occupancy_sum = np.bincount(days, weights=occupancy)[lead]
+    else:
+        occupancy_count = np.bincount(days[known], minlength=rows.size)[lead]
+        occupancy_sum = np.bincount(days[known], weights=occupancy[known], minlength=rows.size)[lead]
+    with np.errstate(invalid="ignore"):
+        avg_occupancy = occupancy_sum / occupancy_count
+    return {
+        "days_before_checkin": lead,
+        "avg_occupancy": avg_occupancy,
+        "avg_price": price_sum / rows[lead],
+        "booking_count": occupancy_count,
+    }
+
+
+def booking_pace(bookings: Bookings, recent_days: int = RECENT_PACE_DAYS,
+                 threshold: float = PACE_OCCUPANCY_THRESHOLD) -> Dict[str, object]:
+    """Compare recent bookings' occupancy and price with all bookings and recommend a price move."""
+    recent = bookings["days_before_checkin"] <= recent_days
+    if not recent.any():
+        return {
+            "recommendation": "maintain",
+            "reasoning": "Insufficient recent booking data",
+            "occupancy_trend": 0,
+            "price_trend": 0
+        }
+
+    occupancy = bookings["occupancy_rate"]
+    prices = bookings["price"]
+    occupancy_trend = np.nanmean(occupancy[recent]) - np.nanmean(occupancy)
+    price_trend = np.mean(prices[recent]) - np.mean(prices)
+
+    if occupancy_trend < -threshold:
+        recommendation = "discount"
+        reasoning = "Recent booking pace is slower than historical average"
+    elif occupancy_trend > threshold:
+        recommendation = "raise_price"
+        reasoning = "Recent booking pace is faster than historical average"
+    else:
+        recommendation = "maintain"
+        reasoning = "Booking pace is within normal range"
+    return {
+        "recommendation": recommendation,
+        "reasoning": reasoning,
+        "occupancy_trend": round(occupancy_trend, 3),
+        "price_trend": round(price_trend, 2)
+    }
+
+
+def price_trend(prices: Sequence[float]) -> Dict[str, float]:
+    """Latest price, change since the first observation and volatility of a non-empty price series."""
+    first, last = prices[0], prices[-1]
+    return {
+        "current_price": last,
+        "price_change": round(last - first, 2),
+        "price_change_percent": round(((last - first) / first) * 100, 2) if first > 0 else 0,
+        "volatility": round(np.std(prices), 2),
+        "data_points": len(prices)
+    }
+
+
+def market_position(your_price: float, competitor_prices: Sequence[float]) -> Tuple[float, float]:
+    """Average competitor price, and the median price of the market including yours."""
+    competitor_prices = list(competitor_prices)
+    return np.mean(competitor_prices), np.percentile([your_price] + competitor_prices, 50)
+
+
+def yield_recommendation(your_price: float, competitor_prices: Sequence[float], event_impact: float,
+                         event_factors: List[str], month: int) -> YieldRecommendation:
+    """Recommendation for one hotel from its price, its competitors' prices and upcoming events."""
+    market_average, percentile = market_position(your_price, competitor_prices)
+    rules = yield_engine.evaluate_rules([your_price], [market_average], [event_impact], [month])
+    return yield_engine.build_recommendation(
+        rules, 0,
+        your_price=your_price,
+        market_average=market_average,
+        price_percentile=percentile,
+        competitor_count=len(competitor_prices),
+        event_factors=event_factors
+    )
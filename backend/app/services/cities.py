@@ -0,0 +1,140 @@
+"""
+Canonical cities.
+
+Hotels and events name their city as free text, so "Paris", "paris " and "PARIS"
+would be three markets if compared as strings. Each spelling is normalized to a key
+(`normalize_key`) and keys are mapped to a `cities` row through `city_aliases`; the
+result is stored as an indexed integer `city_id` on hotels and events.
+
+`city_id` is resolved at ingest: a `before_flush` hook sets it whenever a hotel or
+event is saved with a new city, creating the city the first time it is seen. Rows
+inserted in bulk, and rows from before the column existed, are linked by
+`migrations.link_cities`. Competitors and events are then matched to a hotel by
+equal `city_id`, and a `city` query parameter is resolved against the (small)
+alias table once instead of being matched against every hotel's name.
+
+Other spellings of a city (local names, exonyms) are added as aliases with
+
+    python -m app.services.cities alias Munich "München"
+
+which also merges the city previously created for the alias into the first one.
+"""
+
+import re
+import sys
+import unicodedata
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import delete, event, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.city import City, CityAlias
+from app.models.event import Event
+from app.models.hotel import Hotel
+from app.services import price_rollups
+
+_APOSTROPHES = re.compile(r"['’`]")
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def normalize_key(name: Optional[str]) -> str:
+    """Case-, accent- and punctuation-insensitive form of a city name: " Saint-Étienne" -> "saint etienne"."""
+    if not name:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", name)
+    letters = "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+    return _SEPARATORS.sub(" ", _APOSTROPHES.sub("", letters)).strip()
+
+
+def resolve_ids(connection, names: Dict[str, Optional[str]]) -> Dict[str, int]:
+    """
+    City ID of each name in `names` (name -> country), creating cities for unknown keys.
+
+    `connection` is a Session or Connection; names that normalize to an empty key
+    are left out of the result.
+    """
+    keys = {name: normalize_key(name) for name in names}
+    wanted = {key for key in keys.values() if key}
+    if not wanted:
+        return {}
+    found = dict(connection.execute(
+        select(CityAlias.key, CityAlias.city_id).where(CityAlias.key.in_(wanted))
+    ).all())
+    for name, key in keys.items():
+        if key and key not in found:
+            city_id = connection.execute(
+                insert(City).values(key=key, name=name.strip(), country=names[name])
+            ).inserted_primary_key[0]
+            connection.execute(insert(CityAlias).values(key=key, city_id=city_id))
+            found[key] = city_id
+    return {name: found[key] for name, key in keys.items() if key}
+
+
+def matching_ids(city: str):
+    """Subquery of the IDs of cities with a name or alias containing `city`, compared as keys."""
+    # Keys contain no LIKE wildcards: "%" and "_" normalize to spaces
+    return select(CityAlias.city_id).where(CityAlias.key.like(f"%{normalize_key(city)}%"))
+
+
+def alias_keys(connection, city_ids: Iterable[int]) -> Iterable[str]:
+    """Every alias key of the given cities."""
+    return connection.execute(
+        select(CityAlias.key).where(CityAlias.city_id.in_(list(city_ids)))
+    ).scalars().all()
+
+
+def add_alias(db: Session, city: str, alias: str) -> int:
+    """
+    Make `alias` another spelling of `city` (which must exist); returns the city ID.
+
+    A city previously created for the alias, with all its aliases, hotels and events,
+    is merged into `city`, and the city price rollups of both are recomputed.
+    """
+    city_id = db.execute(select(CityAlias.city_id).where(CityAlias.key == normalize_key(city))).scalar()
+    if city_id is None:
+        raise ValueError(f"Unknown city: {city}")
+    key = normalize_key(alias)
+    if not key:
+        raise ValueError(f"Not a city name: {alias!r}")
+    merged_id = db.execute(select(CityAlias.city_id).where(CityAlias.key == key)).scalar()
+    if merged_id is None:
+        db.execute(insert(CityAlias).values(key=key, city_id=city_id))
+    elif merged_id != city_id:
+        for table in (CityAlias, Hotel, Event):
+            db.execute(update(table).where(table.city_id == merged_id).values(city_id=city_id))
+        price_rollups.refresh_cities(db, [city_id, merged_id])
+        db.execute(delete(City).where(City.id == merged_id))
+    return city_id
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def _resolve_city_ids(session: Session, flush_context, instances):
+    """Set `city_id` on hotels and events added or moved to another city."""
+    changed = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, (Hotel, Event))
+        and (obj in session.new or inspect(obj).attrs.city.history.has_changes())
+    ]
+    if not changed:
+        return
+    ids = resolve_ids(session, {obj.city: obj.country for obj in changed if obj.city})
+    for obj in changed:
+        obj.city_id = ids.get(obj.city) if obj.city else None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "alias":
+        print("Usage: python -m app.services.cities alias <city> <alias>")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        city_id = add_alias(db, sys.argv[2], sys.argv[3])
+        db.commit()
+        print(f"{sys.argv[3]} is now an alias of city {city_id}")
+    except ValueError as exc:
+        print(exc)
+        sys.exit(1)
+    finally:
+        db.close()
@@ -0,0 +1,191 @@
+"""
+Downsampling for time-series responses.
+
+Charts plot a few hundred points at most, so long series can be reduced before
+serialization, either by time bucketing (min/max/mean per hour, day, week or month)
+or with Largest-Triangle-Three-Buckets (LTTB), which keeps a subset of the original
+points chosen to preserve the visual shape of the series.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+RESOLUTIONS = {'hour': 'h', 'day': 'D', 'week': 'W', 'month': 'M'}
+RESOLUTION_PATTERN = "^(hour|day|week|month)$"
+
+# Upper bound accepted for `max_points`; LTTB needs at least three points
+MIN_POINTS = 3
+MAX_POINTS = 10000
+
+
+def _datetime64(timestamps: Sequence) -> np.ndarray:
+    return np.array(timestamps, dtype="datetime64[us]")
+
+
+def _seconds(timestamps: np.ndarray) -> np.ndarray:
+    """Seconds since the first timestamp, as floats for geometry."""
+    return (timestamps - timestamps[0]) / np.timedelta64(1, "s")
+
+
+def time_buckets(timestamps: Sequence, resolution: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Assign each timestamp to a calendar bucket.
+
+    Returns the sorted bucket start times and, for each timestamp, the index of its
+    bucket. Weeks start on Monday.
+    """
+    ts = _datetime64(timestamps)
+    if resolution == 'week':
+        days = ts.astype("datetime64[D]")
+        # 1970-01-01 was a Thursday
+        floored = days - ((days.astype(np.int64) + 3) % 7)
+    else:
+        floored = ts.astype(f"datetime64[{RESOLUTIONS[resolution]}]")
+    starts, inverse = np.unique(floored, return_inverse=True)
+    return starts, inverse
+
+
+def bucket_stats(inverse: np.ndarray, bucket_count: int, values: Sequence[float]) -> Dict[str, np.ndarray]:
+    """Count, mean, min and max of `values` per bucket, ignoring NaN (None) values."""
+    values = np.array(values, dtype=float)
+    valid = ~np.isnan(values)
+    count = np.bincount(inverse[valid], minlength=bucket_count)
+    total = np.bincount(inverse[valid], weights=values[valid], minlength=bucket_count)
+    minimum = np.full(bucket_count, np.inf)
+    maximum = np.full(bucket_count, -np.inf)
+    np.minimum.at(minimum, inverse[valid], values[valid])
+    np.maximum.at(maximum, inverse[valid], values[valid])
+
+    empty = count == 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+    return {
+        'count': count,
+        'mean': np.where(empty, np.nan, mean),
+        'min': np.where(empty, np.nan, minimum),
+        'max': np.where(empty, np.nan, maximum)
+    }
+
+
+def bucket_extreme_indices(timestamps: Sequence, values: Sequence[float], resolution: str) -> np.ndarray:
+    """Indices of the lowest and highest value in each time bucket, in input order."""
+    if not len(values):
+        return np.array([], dtype=int)
+    _, inverse = time_buckets(timestamps, resolution)
+    order = np.lexsort((np.asarray(values, dtype=float), inverse))
+    sorted_buckets = inverse[order]
+    first = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    last = np.r_[first[1:] - 1, len(order) - 1]
+    return np.unique(np.concatenate([order[first], order[last]]))
+
+
+def lttb_indices(timestamps: Sequence, values: Sequence[float], max_points: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; the points in between are split into
+    `max_points - 2` buckets and from each the point forming the largest triangle
+    with the previously kept point and the next bucket's average is kept.
+    """
+    n = len(values)
+    if max_points >= n or max_points < MIN_POINTS:
+        return np.arange(n)
+
+    x = _seconds(_datetime64(timestamps))
+    y = np.array(values, dtype=float)
+    if np.isnan(y).any():
+        y = np.where(np.isnan(y), np.nanmean(y) if (~np.isnan(y)).any() else 0.0, y)
+
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    selected = np.empty(max_points, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+
+    previous = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def reduction_summary(methods: List[str], original: int, returned: int) -> Dict[str, Any]:
+    """Describe a downsampling step for the response."""
+    return {
+        'method': '+'.join(methods) if methods else 'none',
+        'original_points': original,
+        'returned_points': returned,
+        'reduction_ratio': round(original / returned, 2) if returned else 1.0
+    }
+
+
+def _bucket_label(start: np.datetime64, resolution: str) -> str:
+    value = start.astype("datetime64[us]").astype(datetime)
+    return value.strftime('%Y-%m-%dT%H:00') if resolution == 'hour' else value.strftime('%Y-%m-%d')
+
+
+def downsample_series(
+    points: List[Dict[str, Any]],
+    timestamps: Sequence,
+    values: Dict[str, Sequence[float]],
+    max_points: Optional[int] = None,
+    resolution: Optional[str] = None,
+    keep: Sequence[str] = ()
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Downsample chart points ordered by `timestamps`.
+
+    With `resolution`, points are replaced by one point per time bucket holding the
+    bucket's `date`, point `count`, and the mean, `min_` and `max_` of each series in
+    `values`; fields listed in `keep` are copied from the bucket's first point. With
+    `max_points`, LTTB on the first series in `values` then keeps at most that many
+    points. Returns the points and a summary of the reduction.
+    """
+    original = len(points)
+    methods = []
+
+    if resolution and points:
+        starts, inverse = time_buckets(timestamps, resolution)
+        first_in_bucket = np.full(len(starts), len(points))
+        np.minimum.at(first_in_bucket, inverse, np.arange(len(points)))
+        counts = np.bincount(inverse, minlength=len(starts))
+        stats = {name: bucket_stats(inverse, len(starts), series) for name, series in values.items()}
+
+        bucketed = []
+        for b, start in enumerate(starts):
+            point = {'date': _bucket_label(start, resolution)}
+            for key in keep:
+                point[key] = points[first_in_bucket[b]].get(key)
+            for name, series_stats in stats.items():
+                for prefix, stat in (('', 'mean'), ('min_', 'min'), ('max_', 'max')):
+                    value = series_stats[stat][b]
+                    point[f'{prefix}{name}'] = None if np.isnan(value) else round(float(value), 2)
+            point['count'] = int(counts[b])
+            bucketed.append(point)
+
+        points = bucketed
+        timestamps = starts
+        values = {name: series_stats['mean'] for name, series_stats in stats.items()}
+        methods.append(f'{resolution}_buckets')
+
+    if max_points and len(points) > max_points:
+        first_series = next(iter(values.values()))
+        indices = lttb_indices(timestamps, first_series, max_points)
+        points = [points[i] for i in indices]
+        methods.append('lttb')
+
+    return points, reduction_summary(methods, original, len(points))
@@ -0,0 +1,60 @@
+"""
+Historical bookings as columns.
+
+Loads the check-in date, booking date, occupancy rate and price of `historical_data`
+rows as NumPy arrays, the input of `analytics_kernels.lead_time_bookings`, without
+building ORM objects. Dates are selected as stored and parsed by NumPy in one pass,
+which keeps millions of bookings per hotel cheap to load.
+
+Rows are selected by `hotel_id` so queries are range scans of the (hotel_id, ...)
+indexes; `hotel_filter` resolves hotel names to IDs.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from sqlalchemy import String, and_, or_, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.lazy_imports import lazy_import
+from app.models.historical_data import HistoricalData
+from app.models.hotel import Hotel
+
+np = lazy_import("numpy")
+
+
+def hotel_filter(db: Session, hotel_id: Optional[int] = None, hotel_name: Optional[str] = None):
+    """
+    Filter on the historical rows of hotel `hotel_id`, or else of the hotels whose
+    name contains `hotel_name` (case-insensitive). Rows not linked to a hotel yet
+    (see `migrations.link_historical_data`) still match by their own name.
+    """
+    if hotel_id is not None:
+        return HistoricalData.hotel_id == hotel_id
+    pattern = f"%{hotel_name}%"
+    hotel_ids = db.execute(select(Hotel.id).where(Hotel.name.ilike(pattern))).scalars().all()
+    return or_(
+        HistoricalData.hotel_id.in_(hotel_ids),
+        and_(HistoricalData.hotel_id.is_(None), HistoricalData.hotel_name.ilike(pattern))
+    )
+
+
+def booking_columns(db: Session, *filters) -> Dict[str, np.ndarray]:
+    """Columns of the rows matching `filters`, keyed by the `lead_time_bookings` argument names."""
+    rows = db.execute(
+        select(
+            # SQLite stores DateTime as ISO text, which NumPy parses much faster than SQLAlchemy
+            type_coerce(HistoricalData.check_in_date, String),
+            type_coerce(HistoricalData.booking_date, String),
+            HistoricalData.occupancy_rate,
+            HistoricalData.price
+        ).where(*filters)
+    ).all()
+    check_in, booked, occupancy, price = zip(*rows) if rows else ((), (), (), ())
+    return {
+        "check_in_dates": np.array(check_in, dtype="datetime64[us]"),
+        "booking_dates": np.array(booked, dtype="datetime64[us]"),
+        "occupancy_rates": np.array(occupancy, dtype=np.float64),
+        "prices": np.array(price, dtype=np.float64),
+    }
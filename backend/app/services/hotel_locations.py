@@ -0,0 +1,233 @@
+"""
+Spatial index of hotel coordinates.
+
+`hotel_locations` is an SQLite R*Tree over the latitude and longitude of every hotel
+that has both. Like the search index (`hotel_search`) it is kept in sync with
+`hotels` by triggers, so bulk inserts are covered too, and `create_index` (run by
+the migrations) creates it. A radius query reads the hotels inside the circle's
+bounding box from the R*Tree and keeps those whose great-circle distance is within
+the radius. Without the R*Tree the bounding box is a range filter on the coordinate
+columns instead.
+
+`competitors` picks a hotel's compset: the hotels within `radius_km` when a radius is
+given, else the hotels of its city.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, column, or_, select, table, text, union_all
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.lazy_imports import lazy_import
+from app.models.hotel import Hotel
+
+np = lazy_import("numpy")
+
+LOCATION_TABLE = "hotel_locations"
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Largest radius accepted by the API, and how far a k-nearest search looks
+MAX_RADIUS_KM = 100.0
+# First radius of a k-nearest search, widened until k hotels are found
+NEAREST_START_KM = 1.0
+# Competitors returned when neither a radius nor a count is asked for
+DEFAULT_NEAREST = 10
+# Bounding boxes per query of `neighbours`; SQLite caps a compound SELECT at 500 terms
+BOXES_PER_QUERY = 200
+
+location_table = table(
+    LOCATION_TABLE, column("id"), column("min_latitude"), column("max_latitude"),
+    column("min_longitude"), column("max_longitude")
+)
+
+# Whether the index exists, per database URL
+_available: Dict[str, bool] = {}
+
+_HAS_COORDINATES = "new.latitude IS NOT NULL AND new.longitude IS NOT NULL"
+INDEX_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {LOCATION_TABLE} USING rtree("
+    "id, min_latitude, max_latitude, min_longitude, max_longitude)",
+    f"CREATE TRIGGER IF NOT EXISTS hotels_location_insert AFTER INSERT ON hotels WHEN {_HAS_COORDINATES} BEGIN "
+    f"INSERT INTO {LOCATION_TABLE} VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude); END",
+    f"CREATE TRIGGER IF NOT EXISTS hotels_location_delete AFTER DELETE ON hotels BEGIN "
+    f"DELETE FROM {LOCATION_TABLE} WHERE id = old.id; END",
+    f"CREATE TRIGGER IF NOT EXISTS hotels_location_update AFTER UPDATE OF latitude, longitude ON hotels BEGIN "
+    f"DELETE FROM {LOCATION_TABLE} WHERE id = old.id; "
+    f"INSERT INTO {LOCATION_TABLE} SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude "
+    f"WHERE {_HAS_COORDINATES}; END",
+]
+
+
+def create_index(engine: Engine) -> bool:
+    """Create the location index and its triggers if missing; False when the database has no R*Tree."""
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.begin() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": LOCATION_TABLE}
+        ).first() is not None
+        try:
+            for statement in INDEX_DDL:
+                connection.exec_driver_sql(statement)
+        except OperationalError:
+            # SQLite built without the R*Tree module
+            return False
+        if not exists:
+            # Index the hotels that existed before the table
+            connection.exec_driver_sql(
+                f"INSERT INTO {LOCATION_TABLE} SELECT id, latitude, latitude, longitude, longitude FROM hotels "
+                f"WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+            )
+    _available.pop(str(engine.url), None)
+    return True
+
+
+def available(db: Session) -> bool:
+    """Whether the session's database has the location index (checked once per database)."""
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _available:
+        _available[key] = bind.dialect.name == "sqlite" and db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": LOCATION_TABLE}
+        ).first() is not None
+    return _available[key]
+
+
+def distance_km(latitude, longitude, latitudes, longitudes):
+    """Great-circle (haversine) distance from one point to one or more points, in km."""
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def bounding_boxes(latitude: float, longitude: float, radius_km: float) -> List[Tuple[float, float, float, float]]:
+    """
+    (min latitude, max latitude, min longitude, max longitude) boxes covering the circle;
+    two when it crosses the antimeridian.
+    """
+    delta_latitude = radius_km / KM_PER_DEGREE
+    min_latitude, max_latitude = max(latitude - delta_latitude, -90.0), min(latitude + delta_latitude, 90.0)
+    # Parallels are shortest at the box's poleward edge, so that edge bounds the longitude span
+    cos_latitude = math.cos(math.radians(max(abs(min_latitude), abs(max_latitude))))
+    if cos_latitude * 180 <= delta_latitude:
+        return [(min_latitude, max_latitude, -180.0, 180.0)]
+    delta_longitude = delta_latitude / cos_latitude
+    west, east = longitude - delta_longitude, longitude + delta_longitude
+    if west < -180:
+        return [(min_latitude, max_latitude, west + 360, 180.0), (min_latitude, max_latitude, -180.0, east)]
+    if east > 180:
+        return [(min_latitude, max_latitude, west, 180.0), (min_latitude, max_latitude, -180.0, east - 360)]
+    return [(min_latitude, max_latitude, west, east)]
+
+
+def _box_filter(db: Session, boxes: Sequence[Tuple[float, float, float, float]]):
+    if not available(db):
+        return or_(*[
+            and_(Hotel.latitude.between(south, north), Hotel.longitude.between(west, east))
+            for south, north, west, east in boxes
+        ])
+    # One R*Tree lookup per box; an OR inside a single lookup would scan the tree
+    lookups = [
+        select(location_table.c.id).where(
+            location_table.c.max_latitude >= south, location_table.c.min_latitude <= north,
+            location_table.c.max_longitude >= west, location_table.c.min_longitude <= east
+        )
+        for south, north, west, east in boxes
+    ]
+    return Hotel.id.in_(lookups[0] if len(lookups) == 1 else union_all(*lookups))
+
+
+def within(db: Session, latitude: float, longitude: float, radius_km: float, *filters) -> List[Tuple[Hotel, float]]:
+    """Hotels matching `filters` within `radius_km` of a point, with their distance in km, nearest first."""
+    hotels = db.query(Hotel).filter(_box_filter(db, bounding_boxes(latitude, longitude, radius_km)), *filters).all()
+    if not hotels:
+        return []
+    distances = distance_km(
+        latitude, longitude,
+        np.array([hotel.latitude for hotel in hotels]), np.array([hotel.longitude for hotel in hotels])
+    )
+    found = [(hotel, float(distance)) for hotel, distance in zip(hotels, distances) if distance <= radius_km]
+    return sorted(found, key=lambda item: (item[1], item[0].id))
+
+
+def nearest(db: Session, latitude: float, longitude: float, k: int, *filters,
+            max_radius_km: float = MAX_RADIUS_KM) -> List[Tuple[Hotel, float]]:
+    """The `k` hotels matching `filters` nearest to a point, at most `max_radius_km` away, nearest first."""
+    radius_km = min(NEAREST_START_KM, max_radius_km)
+    while True:
+        # Once k hotels are within the radius, no hotel outside it can be among the k nearest
+        found = within(db, latitude, longitude, radius_km, *filters)
+        if len(found) >= k or radius_km >= max_radius_km:
+            return found[:k]
+        radius_km = min(radius_km * 4, max_radius_km)
+
+
+def competitors(db: Session, hotel: Hotel, radius_km: Optional[float] = None) -> List[Hotel]:
+    """
+    Active hotels competing with `hotel`: those within `radius_km`, or with no radius
+    those in the same city. A radius needs the hotel's coordinates.
+    """
+    filters = [Hotel.id != hotel.id, Hotel.is_active == True]
+    if radius_km is None:
+        return db.query(Hotel).filter(Hotel.city_id == hotel.city_id, *filters).all()
+    if hotel.latitude is None or hotel.longitude is None:
+        raise ValueError(f"Hotel {hotel.id} has no coordinates")
+    return [competitor for competitor, _ in within(db, hotel.latitude, hotel.longitude, radius_km, *filters)]
+
+
+def _area(box: Tuple[float, float, float, float]) -> float:
+    return (box[1] - box[0]) * (box[3] - box[2])
+
+
+def neighbours(db: Session, hotels: Sequence[Hotel], radius_km: float, *filters) -> Dict[int, List[Hotel]]:
+    """
+    Hotels matching `filters` within `radius_km` of each hotel with coordinates (other
+    than itself), nearest first, for many hotels at once.
+
+    The hotels of a city share one bounding box when it is no larger than their own
+    boxes together; boxes are looked up `BOXES_PER_QUERY` per query.
+    """
+    cities: Dict[Optional[int], List[Hotel]] = {}
+    for hotel in hotels:
+        if hotel.latitude is not None and hotel.longitude is not None:
+            cities.setdefault(hotel.city_id, []).append(hotel)
+    boxes = []
+    for city_hotels in cities.values():
+        city_boxes = [box for hotel in city_hotels for box in bounding_boxes(hotel.latitude, hotel.longitude, radius_km)]
+        combined = (min(box[0] for box in city_boxes), max(box[1] for box in city_boxes),
+                    min(box[2] for box in city_boxes), max(box[3] for box in city_boxes))
+        # Boxes split at the antimeridian would combine into a box around the globe
+        if len(city_boxes) == len(city_hotels) and _area(combined) <= sum(map(_area, city_boxes)):
+            city_boxes = [combined]
+        boxes += city_boxes
+    candidates: Dict[int, Hotel] = {}
+    for start in range(0, len(boxes), BOXES_PER_QUERY):
+        for candidate in db.query(Hotel).filter(_box_filter(db, boxes[start:start + BOXES_PER_QUERY]), *filters):
+            candidates[candidate.id] = candidate
+    located = [hotel for city_hotels in cities.values() for hotel in city_hotels]
+    if not candidates:
+        return {hotel.id: [] for hotel in located}
+
+    # By latitude, so each hotel only measures the candidates in its latitude band
+    candidates = sorted(candidates.values(), key=lambda candidate: (candidate.latitude, candidate.id))
+    candidate_ids = np.array([candidate.id for candidate in candidates])
+    candidate_latitudes = np.array([candidate.latitude for candidate in candidates])
+    candidate_longitudes = np.array([candidate.longitude for candidate in candidates])
+    delta_latitude = radius_km / KM_PER_DEGREE
+    result = {}
+    for hotel in located:
+        band = np.arange(
+            np.searchsorted(candidate_latitudes, hotel.latitude - delta_latitude, side="left"),
+            np.searchsorted(candidate_latitudes, hotel.latitude + delta_latitude, side="right")
+        )
+        distances = distance_km(hotel.latitude, hotel.longitude, candidate_latitudes[band], candidate_longitudes[band])
+        inside = (distances <= radius_km) & (candidate_ids[band] != hotel.id)
+        band, distances = band[inside], distances[inside]
+        result[hotel.id] = [candidates[i] for i in band[np.lexsort((candidate_ids[band], distances))]]
+    return result
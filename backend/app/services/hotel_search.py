@@ -0,0 +1,112 @@
+"""
+Hotel search over an SQLite FTS5 index.
+
+`hotel_search` is an FTS5 table with the trigram tokenizer over the name, city and
+address of every hotel. It reads its content from `hotels` and SQLite triggers keep
+it in sync on insert, update and delete, including bulk inserts that bypass the ORM.
+`create_index` (run by the migrations) creates it. Trigram indexes answer substring
+queries, so autocomplete is an index lookup. On databases without FTS5 `search`
+falls back to `ILIKE` scans.
+"""
+
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.models.hotel import Hotel
+
+SEARCH_TABLE = "hotel_search"
+# Trigram queries need at least this many characters per term to use the index
+MIN_TERM_LENGTH = 3
+
+# Whether the index exists, per database URL
+_available: Dict[str, bool] = {}
+
+INDEX_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "name, city, address, content='hotels', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS hotels_search_insert AFTER INSERT ON hotels BEGIN "
+    f"INSERT INTO {SEARCH_TABLE} (rowid, name, city, address) VALUES (new.id, new.name, new.city, new.address); END",
+    f"CREATE TRIGGER IF NOT EXISTS hotels_search_delete AFTER DELETE ON hotels BEGIN "
+    f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, name, city, address) "
+    f"VALUES ('delete', old.id, old.name, old.city, old.address); END",
+    f"CREATE TRIGGER IF NOT EXISTS hotels_search_update AFTER UPDATE OF name, city, address ON hotels BEGIN "
+    f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, name, city, address) "
+    f"VALUES ('delete', old.id, old.name, old.city, old.address); "
+    f"INSERT INTO {SEARCH_TABLE} (rowid, name, city, address) VALUES (new.id, new.name, new.city, new.address); END",
+]
+
+
+def create_index(engine: Engine) -> bool:
+    """Create the search index and its triggers if missing; False when the database has no FTS5."""
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.begin() as connection:
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": SEARCH_TABLE}
+        ).first() is not None
+        try:
+            for statement in INDEX_DDL:
+                connection.exec_driver_sql(statement)
+        except OperationalError:
+            # SQLite built without FTS5 or older than 3.34 (trigram tokenizer)
+            return False
+        if not exists:
+            # Index the hotels that existed before the table
+            connection.exec_driver_sql(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')")
+    _available.pop(str(engine.url), None)
+    return True
+
+
+def available(db: Session) -> bool:
+    """Whether the session's database has the search index (checked once per database)."""
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _available:
+        _available[key] = bind.dialect.name == "sqlite" and db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": SEARCH_TABLE}
+        ).first() is not None
+    return _available[key]
+
+
+def search(db: Session, query: str, limit: int = 10, active_only: bool = True) -> List[Hotel]:
+    """
+    Hotels whose name, city or address contain every term of `query`, best first.
+
+    Hotels whose name starts with the query come first, then FTS5 rank (bm25).
+    Terms shorter than `MIN_TERM_LENGTH` are matched with LIKE.
+    """
+    terms = query.split()
+    if not terms:
+        return []
+    if not available(db):
+        hotels = db.query(Hotel)
+        for term in terms:
+            pattern = f"%{term}%"
+            hotels = hotels.filter(Hotel.name.ilike(pattern) | Hotel.city.ilike(pattern) | Hotel.address.ilike(pattern))
+        if active_only:
+            hotels = hotels.filter(Hotel.is_active == True)
+        return hotels.order_by(Hotel.name.ilike(f"{query}%").desc(), Hotel.name).limit(limit).all()
+
+    conditions, params = [], {"prefix": f"{query.strip()}%", "limit": limit}
+    long_terms = [term for term in terms if len(term) >= MIN_TERM_LENGTH]
+    if long_terms:
+        # Each term as a quoted phrase, so FTS5 query syntax in user input is matched literally
+        conditions.append(f"{SEARCH_TABLE} MATCH :match")
+        params["match"] = " AND ".join('"' + term.replace('"', '""') + '"' for term in long_terms)
+    for i, term in enumerate(term for term in terms if len(term) < MIN_TERM_LENGTH):
+        conditions.append(" OR ".join(f"{SEARCH_TABLE}.{field} LIKE :short{i}" for field in ("name", "city", "address")))
+        params[f"short{i}"] = f"%{term}%"
+    if active_only:
+        conditions.append("hotels.is_active = 1")
+    order = f"{SEARCH_TABLE}.rank" if long_terms else f"{SEARCH_TABLE}.name"
+    hotel_ids = db.execute(text(
+        f"SELECT hotels.id FROM {SEARCH_TABLE} JOIN hotels ON hotels.id = {SEARCH_TABLE}.rowid "
+        f"WHERE {' AND '.join(f'({condition})' for condition in conditions)} "
+        f"ORDER BY {SEARCH_TABLE}.name LIKE :prefix DESC, {order} LIMIT :limit"
+    ), params).scalars().all()
+    hotels = {hotel.id: hotel for hotel in db.query(Hotel).filter(Hotel.id.in_(hotel_ids))}
+    return [hotels[hotel_id] for hotel_id in hotel_ids]
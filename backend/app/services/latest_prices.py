@@ -0,0 +1,79 @@
+"""
+Latest scraped price per hotel in a single query.
+
+Replaces per-hotel `order_by(desc(HotelPrice.scraped_at)).first()` loops with one
+ROW_NUMBER() window over the whole set of hotels.
+"""
+
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.hotel import HotelPrice
+
+
+def latest_prices(
+    db: Session,
+    hotel_ids: Iterable[int],
+    per_room_type: bool = False,
+    per_night: bool = False,
+    room_type: Optional[str] = None,
+    check_in_from: Optional[datetime] = None,
+    check_in_to: Optional[datetime] = None,
+    check_out_to: Optional[datetime] = None
+) -> Dict[Hashable, HotelPrice]:
+    """
+    Return the most recently scraped price for each hotel.
+
+    Keys are hotel IDs. With `per_room_type` and/or `per_night` the latest price is
+    taken per room type and/or per check-in date instead, and keys become tuples of
+    (hotel_id, room_type) / (hotel_id, check-in date) / (hotel_id, room_type, check-in
+    date). `room_type` restricts the prices to one room type.
+
+    The date filters match the ones used by the analytics routes: check-in on or
+    after `check_in_from` and on or before `check_in_to`, check-out on or before
+    `check_out_to`. Hotels without a matching price are absent from the result.
+    """
+    hotel_ids = list(hotel_ids)
+    if not hotel_ids:
+        return {}
+
+    filters = [HotelPrice.hotel_id.in_(hotel_ids)]
+    if room_type is not None:
+        filters.append(HotelPrice.room_type == room_type)
+    if check_in_from is not None:
+        filters.append(HotelPrice.check_in_date >= check_in_from)
+    if check_in_to is not None:
+        filters.append(HotelPrice.check_in_date <= check_in_to)
+    if check_out_to is not None:
+        filters.append(HotelPrice.check_out_date <= check_out_to)
+
+    partition = [HotelPrice.hotel_id]
+    if per_room_type:
+        partition.append(HotelPrice.room_type)
+    if per_night:
+        partition.append(func.date(HotelPrice.check_in_date))
+
+    ranked = select(
+        HotelPrice.id,
+        func.row_number().over(
+            partition_by=partition,
+            order_by=(HotelPrice.scraped_at.desc(), HotelPrice.id.desc())
+        ).label("position")
+    ).where(*filters).subquery()
+
+    prices = db.query(HotelPrice).join(ranked, ranked.c.id == HotelPrice.id).filter(
+        ranked.c.position == 1
+    ).all()
+
+    def key(price):
+        parts = [price.hotel_id]
+        if per_room_type:
+            parts.append(price.room_type)
+        if per_night:
+            parts.append(price.check_in_date.date())
+        return tuple(parts) if len(parts) > 1 else price.hotel_id
+
+    return {key(price): price for price in prices}
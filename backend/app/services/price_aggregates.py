@@ -0,0 +1,113 @@
+"""
+Monthly and seasonal price aggregates computed where the data lives.
+
+Prices are reduced to (count, sum, sum of squares, min, max) per check-in month by a
+GROUP BY in the database (or a group-by over an archive scan), so only a dozen rows
+reach Python. Months combine exactly into seasons, and `price_rollups.summarize`
+turns the aggregates into count/average/min/max/std.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.lazy_imports import lazy_import
+from app.models.hotel import HotelPrice
+
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+
+# (count, sum, sum of squares, min, max)
+Aggregates = Tuple[int, float, float, float, float]
+
+SEASON_MONTHS = {
+    'spring': [3, 4, 5],
+    'summer': [6, 7, 8],
+    'autumn': [9, 10, 11],
+    'winter': [12, 1, 2]
+}
+
+
+def monthly_aggregates(
+    db: Session,
+    hotel_ids: List[int],
+    check_in_from: Optional[datetime] = None,
+    check_in_to: Optional[datetime] = None,
+    months: Optional[Iterable[int]] = None
+) -> Dict[int, Aggregates]:
+    """Price aggregates per check-in month (1-12), computed by the database."""
+    month = func.extract('month', HotelPrice.check_in_date)
+    filters = [HotelPrice.hotel_id.in_(hotel_ids)]
+    if check_in_from is not None:
+        filters.append(HotelPrice.check_in_date >= check_in_from)
+    if check_in_to is not None:
+        filters.append(HotelPrice.check_in_date <= check_in_to)
+    if months is not None:
+        filters.append(month.in_(list(months)))
+
+    rows = db.execute(
+        select(
+            month,
+            func.count(HotelPrice.id),
+            func.sum(HotelPrice.price),
+            func.sum(HotelPrice.price * HotelPrice.price),
+            func.min(HotelPrice.price),
+            func.max(HotelPrice.price)
+        ).where(*filters).group_by(month)
+    ).all()
+    return {int(row[0]): tuple(row[1:]) for row in rows}
+
+
+def monthly_aggregates_from_table(table: pa.Table, months: Optional[Iterable[int]] = None) -> Dict[int, Aggregates]:
+    """Same as `monthly_aggregates` for an archive scan with check_in_date and price columns."""
+    price = table['price']
+    grouped = pa.table({
+        'month': pc.month(table['check_in_date']),
+        'price': price,
+        'price_sq': pc.multiply(price, price)
+    })
+    if months is not None:
+        grouped = grouped.filter(pc.is_in(grouped['month'], pa.array(list(months), pa.int64())))
+
+    result = grouped.group_by('month').aggregate([
+        ('price', 'count'),
+        ('price', 'sum'),
+        ('price_sq', 'sum'),
+        ('price', 'min'),
+        ('price', 'max')
+    ]).to_pydict()
+    return {
+        int(month): (count, total, total_sq, minimum, maximum)
+        for month, count, total, total_sq, minimum, maximum in zip(
+            result['month'], result['price_count'], result['price_sum'],
+            result['price_sq_sum'], result['price_min'], result['price_max']
+        )
+    }
+
+
+def combine(aggregates: Iterable[Aggregates]) -> Optional[Aggregates]:
+    """Merge aggregates of disjoint groups; None when there is nothing to merge."""
+    aggregates = [agg for agg in aggregates if agg[0]]
+    if not aggregates:
+        return None
+    return (
+        sum(agg[0] for agg in aggregates),
+        sum(agg[1] for agg in aggregates),
+        sum(agg[2] for agg in aggregates),
+        min(agg[3] for agg in aggregates),
+        max(agg[4] for agg in aggregates)
+    )
+
+
+def seasonal_aggregates(monthly: Dict[int, Aggregates]) -> Dict[str, Aggregates]:
+    """Roll monthly aggregates up into seasons, skipping seasons without data."""
+    seasons = {}
+    for season, months in SEASON_MONTHS.items():
+        merged = combine(monthly[month] for month in months if month in monthly)
+        if merged:
+            seasons[season] = merged
+    return seasons
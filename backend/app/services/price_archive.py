@@ -0,0 +1,279 @@
+"""
+Columnar Parquet archive of hotel price history.
+
+Prices are written as a hive-partitioned dataset (``city=<city>/month=<YYYY-MM>``)
+so long-horizon analytics can scan only the partitions and columns they need
+instead of loading ``hotel_prices`` row by row through the ORM.
+
+Usage:
+    python -m app.services.price_archive export   # full rewrite of the archive
+    python -m app.services.price_archive sync     # rewrite partitions touched since last run
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import shutil
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import quote
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.lazy_imports import lazy_import
+from app.models.hotel import Hotel, HotelPrice
+
+pa = lazy_import("pyarrow")
+ds = lazy_import("pyarrow.dataset")
+pq = lazy_import("pyarrow.parquet")
+
+# Archive location; the archive is disabled when this is not set
+PRICE_ARCHIVE_DIR = os.getenv("PRICE_ARCHIVE_DIR")
+
+# Analytics spanning more days than this are served from the archive when available
+LONG_HORIZON_DAYS = 90
+
+# Re-export partitions touched slightly before the last watermark, because
+# scraped_at mixes server (UTC) and application (local) timestamps
+SYNC_OVERLAP = timedelta(days=1)
+
+UNKNOWN_CITY = "__unknown__"
+STATE_FILE = "_sync_state.json"
+
+@functools.lru_cache(maxsize=None)
+def archive_schema() -> pa.Schema:
+    """Column types of the archive, built on first use so importing this module does not load PyArrow."""
+    dict_string = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("price_id", pa.int64()),
+        ("hotel_id", pa.int32()),
+        ("room_type", dict_string),
+        ("price", pa.float64()),
+        ("currency", dict_string),
+        ("check_in_date", pa.timestamp("us")),
+        ("check_out_date", pa.timestamp("us")),
+        ("scraped_at", pa.timestamp("us")),
+        ("board_type", dict_string),
+        ("source", dict_string),
+    ])
+
+
+@functools.lru_cache(maxsize=None)
+def partitioning() -> ds.Partitioning:
+    return ds.partitioning(
+        pa.schema([("city", pa.string()), ("month", pa.string())]),
+        flavor="hive"
+    )
+
+
+_PRICE_COLUMNS = [
+    HotelPrice.id, HotelPrice.hotel_id, HotelPrice.room_type, HotelPrice.price,
+    HotelPrice.currency, HotelPrice.check_in_date, HotelPrice.check_out_date,
+    HotelPrice.scraped_at, HotelPrice.board_type, HotelPrice.source
+]
+
+
+def archive_available(archive_dir: Optional[str] = None) -> bool:
+    """Return True when an archive directory is configured and holds data."""
+    archive_dir = archive_dir or PRICE_ARCHIVE_DIR
+    if not archive_dir or not os.path.isdir(archive_dir):
+        return False
+    return any(name.startswith("city=") for name in os.listdir(archive_dir))
+
+
+def use_archive_for(days: int) -> bool:
+    """Whether an analytics scan covering `days` days should read the archive."""
+    return days > LONG_HORIZON_DAYS and archive_available()
+
+
+def _month_key(value: datetime) -> str:
+    return value.strftime("%Y-%m")
+
+
+def _month_bounds(month: str) -> Tuple[datetime, datetime]:
+    start = datetime.strptime(month, "%Y-%m")
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def _partition_dir(archive_dir: str, city: str, month: str) -> str:
+    return os.path.join(archive_dir, f"city={quote(city, safe='')}", f"month={month}")
+
+
+def _rows_to_table(rows: List[tuple]) -> pa.Table:
+    columns = list(zip(*rows)) if rows else [[] for _ in archive_schema()]
+    arrays = []
+    for values, field in zip(columns, archive_schema()):
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=archive_schema())
+
+
+def _write_partition(archive_dir: str, city: str, month: str, rows: List[tuple]):
+    """Atomically replace one (city, month) partition with `rows`."""
+    partition_dir = _partition_dir(archive_dir, city, month)
+    if not rows:
+        shutil.rmtree(partition_dir, ignore_errors=True)
+        return
+
+    os.makedirs(partition_dir, exist_ok=True)
+    tmp_path = os.path.join(partition_dir, "part-0.parquet.tmp")
+    pq.write_table(_rows_to_table(rows), tmp_path, use_dictionary=True, compression="snappy")
+    os.replace(tmp_path, os.path.join(partition_dir, "part-0.parquet"))
+
+
+def _hotel_cities(db: Session) -> Dict[int, str]:
+    return {
+        hotel_id: city or UNKNOWN_CITY
+        for hotel_id, city in db.query(Hotel.id, Hotel.city).all()
+    }
+
+
+def _export_partitions(db: Session, archive_dir: str, partitions: Set[Tuple[str, str]],
+                       hotel_cities: Dict[int, str]) -> int:
+    """Rewrite the given (city, month) partitions from the database."""
+    hotels_by_city: Dict[str, List[int]] = {}
+    for hotel_id, city in hotel_cities.items():
+        hotels_by_city.setdefault(city, []).append(hotel_id)
+
+    rows_written = 0
+    for city, month in sorted(partitions):
+        start, end = _month_bounds(month)
+        rows = db.query(*_PRICE_COLUMNS).filter(
+            HotelPrice.hotel_id.in_(hotels_by_city.get(city, [])),
+            HotelPrice.check_in_date >= start,
+            HotelPrice.check_in_date < end
+        ).order_by(HotelPrice.hotel_id, HotelPrice.check_in_date).all()
+        _write_partition(archive_dir, city, month, [tuple(row) for row in rows])
+        rows_written += len(rows)
+    return rows_written
+
+
+def _load_state(archive_dir: str) -> Dict[str, str]:
+    path = os.path.join(archive_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_state(archive_dir: str, db: Session):
+    max_id, max_scraped = db.query(func.max(HotelPrice.id), func.max(HotelPrice.scraped_at)).one()
+    state = {
+        "max_price_id": max_id or 0,
+        "scraped_at_watermark": max_scraped.isoformat() if max_scraped else None,
+        "synced_at": datetime.now().isoformat()
+    }
+    with open(os.path.join(archive_dir, STATE_FILE), "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def export_price_history(db: Session, archive_dir: Optional[str] = None) -> Dict[str, int]:
+    """Write the full price history to the archive, replacing any previous content."""
+    archive_dir = archive_dir or PRICE_ARCHIVE_DIR
+    if not archive_dir:
+        raise ValueError("PRICE_ARCHIVE_DIR is not configured")
+
+    os.makedirs(archive_dir, exist_ok=True)
+    for name in os.listdir(archive_dir):
+        if name.startswith("city="):
+            shutil.rmtree(os.path.join(archive_dir, name))
+
+    hotel_cities = _hotel_cities(db)
+    partitions = set()
+    for hotel_id, check_in in db.query(HotelPrice.hotel_id, HotelPrice.check_in_date).yield_per(10000):
+        partitions.add((hotel_cities.get(hotel_id, UNKNOWN_CITY), _month_key(check_in)))
+
+    rows_written = _export_partitions(db, archive_dir, partitions, hotel_cities)
+    _save_state(archive_dir, db)
+    return {"partitions_written": len(partitions), "rows_written": rows_written}
+
+
+def sync_price_history(db: Session, archive_dir: Optional[str] = None) -> Dict[str, int]:
+    """
+    Bring the archive up to date with the database.
+
+    Only partitions containing prices inserted or re-scraped since the last run are
+    rewritten. Deleted hotels are not detected; run a full export to drop them.
+    """
+    archive_dir = archive_dir or PRICE_ARCHIVE_DIR
+    if not archive_dir:
+        raise ValueError("PRICE_ARCHIVE_DIR is not configured")
+
+    state = _load_state(archive_dir) if os.path.isdir(archive_dir) else {}
+    if not state:
+        return export_price_history(db, archive_dir)
+
+    changed = [HotelPrice.id > state.get("max_price_id", 0)]
+    if state.get("scraped_at_watermark"):
+        watermark = datetime.fromisoformat(state["scraped_at_watermark"]) - SYNC_OVERLAP
+        changed.append(HotelPrice.scraped_at > watermark)
+
+    hotel_cities = _hotel_cities(db)
+    partitions = set()
+    touched = db.query(HotelPrice.hotel_id, HotelPrice.check_in_date).filter(or_(*changed))
+    for hotel_id, check_in in touched.yield_per(10000):
+        partitions.add((hotel_cities.get(hotel_id, UNKNOWN_CITY), _month_key(check_in)))
+
+    rows_written = _export_partitions(db, archive_dir, partitions, hotel_cities)
+    _save_state(archive_dir, db)
+    return {"partitions_written": len(partitions), "rows_written": rows_written}
+
+
+def scan_prices(
+    columns: Iterable[str],
+    hotel_ids: Optional[Iterable[int]] = None,
+    cities: Optional[Iterable[Optional[str]]] = None,
+    check_in_from: Optional[datetime] = None,
+    check_in_to: Optional[datetime] = None,
+    scraped_from: Optional[datetime] = None,
+    archive_dir: Optional[str] = None
+) -> pa.Table:
+    """
+    Scan the archive with partition pruning and predicate pushdown.
+
+    `check_in_to` is inclusive, matching the `<=` filters used by the analytics routes.
+    """
+    dataset = ds.dataset(archive_dir or PRICE_ARCHIVE_DIR, format="parquet", partitioning=partitioning())
+
+    filters = []
+    if cities is not None:
+        filters.append(ds.field("city").isin([city or UNKNOWN_CITY for city in cities]))
+    if hotel_ids is not None:
+        filters.append(ds.field("hotel_id").isin(list(hotel_ids)))
+    if check_in_from is not None:
+        filters.append(ds.field("month") >= _month_key(check_in_from))
+        filters.append(ds.field("check_in_date") >= pa.scalar(check_in_from, pa.timestamp("us")))
+    if check_in_to is not None:
+        filters.append(ds.field("month") <= _month_key(check_in_to))
+        filters.append(ds.field("check_in_date") <= pa.scalar(check_in_to, pa.timestamp("us")))
+    if scraped_from is not None:
+        filters.append(ds.field("scraped_at") >= pa.scalar(scraped_from, pa.timestamp("us")))
+
+    expression = None
+    for condition in filters:
+        expression = condition if expression is None else expression & condition
+
+    return dataset.to_table(columns=list(columns), filter=expression)
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "sync"
+    if command not in ("export", "sync"):
+        print("Usage: python -m app.services.price_archive [export|sync]")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        result = export_price_history(db) if command == "export" else sync_price_history(db)
+        print(f"Archive {command} complete: {result}")
+    finally:
+        db.close()
@@ -0,0 +1,330 @@
+"""
+Incrementally maintained daily price rollups.
+
+`hotel_price_daily` aggregates `hotel_prices` per (hotel, check-in date, room category)
+and `city_price_daily` aggregates the hotel rollups per (city_id, check-in date). Both are
+refreshed from an `after_flush` hook, so they change in the same transaction as the
+price ingest that touched them.
+
+Usage:
+    python -m app.services.price_rollups rebuild   # backfill from hotel_prices
+"""
+
+import math
+import sys
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, delete, event, func, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.hotel import Hotel, HotelPrice
+from app.models.price_rollup import HotelPriceDaily, CityPriceDaily
+
+# Keyword matched against the lower-cased room type, first match wins
+ROOM_CATEGORIES = [
+    ("suite", "suite"),
+    ("apartment", "apartment"),
+    ("studio", "studio"),
+    ("family", "family"),
+    ("quad", "quad"),
+    ("triple", "triple"),
+    ("twin", "twin"),
+    ("double", "double"),
+    ("single", "single"),
+]
+DEFAULT_ROOM_CATEGORY = "other"
+
+_AGGREGATE_COLUMNS = ["price_count", "price_sum", "price_sum_sq", "price_min", "price_max"]
+
+
+def room_category(room_type: Optional[str]) -> str:
+    """Map a scraped room type to one of the rollup room categories."""
+    lowered = (room_type or "").lower()
+    for keyword, category in ROOM_CATEGORIES:
+        if keyword in lowered:
+            return category
+    return DEFAULT_ROOM_CATEGORY
+
+
+def room_category_expr(column=HotelPrice.room_type):
+    """SQL equivalent of `room_category` so rollups can be built with INSERT ... SELECT."""
+    lowered = func.lower(func.coalesce(column, ""))
+    return case(
+        *[(lowered.like(f"%{keyword}%"), category) for keyword, category in ROOM_CATEGORIES],
+        else_=DEFAULT_ROOM_CATEGORY
+    )
+
+
+def _day(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _hotel_rollup_select(*filters):
+    category = room_category_expr()
+    day = func.date(HotelPrice.check_in_date)
+    return select(
+        HotelPrice.hotel_id,
+        day,
+        category,
+        func.count(HotelPrice.id),
+        func.sum(HotelPrice.price),
+        func.sum(HotelPrice.price * HotelPrice.price),
+        func.min(HotelPrice.price),
+        func.max(HotelPrice.price)
+    ).where(*filters).group_by(HotelPrice.hotel_id, day, category)
+
+
+def _city_rollup_select(*filters):
+    return select(
+        Hotel.city_id,
+        HotelPriceDaily.check_in_date,
+        func.sum(HotelPriceDaily.price_count),
+        func.sum(HotelPriceDaily.price_sum),
+        func.sum(HotelPriceDaily.price_sum_sq),
+        func.min(HotelPriceDaily.price_min),
+        func.max(HotelPriceDaily.price_max)
+    ).join(Hotel, Hotel.id == HotelPriceDaily.hotel_id).where(
+        Hotel.city_id.isnot(None), *filters
+    ).group_by(Hotel.city_id, HotelPriceDaily.check_in_date)
+
+
+def _span(days: Iterable[date]) -> Tuple[date, date]:
+    days = list(days)
+    return min(days), max(days)
+
+
+def refresh_hotel_days(session: Session, hotel_days: Dict[int, Set[date]]):
+    """Recompute hotel rollups for each hotel over the span of the given check-in days."""
+    for hotel_id, days in hotel_days.items():
+        first, last = _span(days)
+        session.execute(delete(HotelPriceDaily).where(
+            HotelPriceDaily.hotel_id == hotel_id,
+            HotelPriceDaily.check_in_date >= first,
+            HotelPriceDaily.check_in_date <= last
+        ))
+        session.execute(insert(HotelPriceDaily).from_select(
+            ["hotel_id", "check_in_date", "room_category"] + _AGGREGATE_COLUMNS,
+            _hotel_rollup_select(
+                HotelPrice.hotel_id == hotel_id,
+                HotelPrice.check_in_date >= datetime.combine(first, datetime.min.time()),
+                HotelPrice.check_in_date < datetime.combine(last + timedelta(days=1), datetime.min.time())
+            )
+        ))
+
+
+def refresh_city_days(session: Session, city_days: Dict[int, Set[date]]):
+    """Recompute city rollups for each city ID over the span of the given check-in days."""
+    for city_id, days in city_days.items():
+        first, last = _span(days)
+        session.execute(delete(CityPriceDaily).where(
+            CityPriceDaily.city_id == city_id,
+            CityPriceDaily.check_in_date >= first,
+            CityPriceDaily.check_in_date <= last
+        ))
+        session.execute(insert(CityPriceDaily).from_select(
+            ["city_id", "check_in_date"] + _AGGREGATE_COLUMNS,
+            _city_rollup_select(
+                Hotel.city_id == city_id,
+                HotelPriceDaily.check_in_date >= first,
+                HotelPriceDaily.check_in_date <= last
+            )
+        ))
+
+
+def _hotel_rollup_span(session: Session, hotel_id: int) -> Set[date]:
+    first, last = session.execute(
+        select(func.min(HotelPriceDaily.check_in_date), func.max(HotelPriceDaily.check_in_date))
+        .where(HotelPriceDaily.hotel_id == hotel_id)
+    ).one()
+    return {first, last} if first else set()
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _maintain_rollups(session: Session, flush_context):
+    """Refresh the rollup groups touched by the flush, inside the same transaction."""
+    hotel_days: Dict[int, Set[date]] = {}
+    city_days: Dict[int, Set[date]] = {}
+    hotel_ids_for_city = set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, HotelPrice):
+            continue
+        state = inspect(obj)
+        hotel_ids = {obj.hotel_id, *state.attrs.hotel_id.history.deleted}
+        days = {_day(obj.check_in_date), *[_day(d) for d in state.attrs.check_in_date.history.deleted]}
+        for hotel_id in hotel_ids:
+            if hotel_id is not None:
+                hotel_days.setdefault(hotel_id, set()).update(d for d in days if d)
+                hotel_ids_for_city.add(hotel_id)
+
+    if hotel_days:
+        refresh_hotel_days(session, hotel_days)
+        city_ids = dict(session.execute(
+            select(Hotel.id, Hotel.city_id).where(Hotel.id.in_(hotel_ids_for_city))
+        ).all())
+        for hotel_id, days in hotel_days.items():
+            if city_ids.get(hotel_id):
+                city_days.setdefault(city_ids[hotel_id], set()).update(days)
+
+    # Hotels that moved city or were deleted change the city rollups over their whole history
+    for obj in list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, Hotel):
+            continue
+        city_history = inspect(obj).attrs.city_id.history
+        if obj not in session.deleted and not city_history.deleted:
+            continue
+        span = _hotel_rollup_span(session, obj.id)
+        if obj in session.deleted:
+            session.execute(delete(HotelPriceDaily).where(HotelPriceDaily.hotel_id == obj.id))
+        for city_id in {obj.city_id, *city_history.deleted}:
+            if city_id and span:
+                city_days.setdefault(city_id, set()).update(span)
+
+    if city_days:
+        refresh_city_days(session, city_days)
+
+
+def summarize(count, total, total_sq, minimum, maximum) -> Dict[str, float]:
+    """Turn rollup aggregates into count/average/min/max/std (population std, as np.std)."""
+    average = total / count
+    variance = max(total_sq / count - average * average, 0.0)
+    return {
+        "count": int(count),
+        "average": average,
+        "min": minimum,
+        "max": maximum,
+        "std": math.sqrt(variance)
+    }
+
+
+def _aggregates(model):
+    return (
+        func.sum(model.price_count),
+        func.sum(model.price_sum),
+        func.sum(model.price_sum_sq),
+        func.min(model.price_min),
+        func.max(model.price_max)
+    )
+
+
+def monthly_hotel_stats(session: Session, hotel_ids: List[int],
+                        first_day: date, last_day: date) -> Dict[int, Dict[str, float]]:
+    """Price statistics per check-in month for a set of hotels."""
+    month = func.extract("month", HotelPriceDaily.check_in_date)
+    rows = session.execute(
+        select(month, *_aggregates(HotelPriceDaily)).where(
+            HotelPriceDaily.hotel_id.in_(hotel_ids),
+            HotelPriceDaily.check_in_date >= first_day,
+            HotelPriceDaily.check_in_date <= last_day
+        ).group_by(month)
+    ).all()
+    return {int(row[0]): summarize(*row[1:]) for row in rows}
+
+
+def hotel_window_stats(session: Session, hotel_ids: List[int],
+                       first_day: Optional[date] = None,
+                       last_day: Optional[date] = None) -> Dict[int, Dict[str, float]]:
+    """Price statistics per hotel over a check-in window."""
+    filters = [HotelPriceDaily.hotel_id.in_(hotel_ids)]
+    if first_day:
+        filters.append(HotelPriceDaily.check_in_date >= first_day)
+    if last_day:
+        filters.append(HotelPriceDaily.check_in_date <= last_day)
+    rows = session.execute(
+        select(HotelPriceDaily.hotel_id, *_aggregates(HotelPriceDaily))
+        .where(*filters).group_by(HotelPriceDaily.hotel_id)
+    ).all()
+    return {row[0]: summarize(*row[1:]) for row in rows}
+
+
+def hotels_window_stats(session: Session, hotel_ids: List[int],
+                        first_day: Optional[date] = None,
+                        last_day: Optional[date] = None) -> Optional[Dict[str, float]]:
+    """Price statistics over a check-in window for a set of hotels combined, e.g. a compset."""
+    filters = [HotelPriceDaily.hotel_id.in_(hotel_ids)]
+    if first_day:
+        filters.append(HotelPriceDaily.check_in_date >= first_day)
+    if last_day:
+        filters.append(HotelPriceDaily.check_in_date <= last_day)
+    row = session.execute(select(*_aggregates(HotelPriceDaily)).where(*filters)).one()
+    return summarize(*row) if row[0] else None
+
+
+def city_window_stats(session: Session, city_ids: Iterable[int],
+                      first_day: Optional[date] = None,
+                      last_day: Optional[date] = None) -> Optional[Dict[str, float]]:
+    """Price statistics over a check-in window for one or more cities (by ID) combined."""
+    filters = [CityPriceDaily.city_id.in_(list(city_ids))]
+    if first_day:
+        filters.append(CityPriceDaily.check_in_date >= first_day)
+    if last_day:
+        filters.append(CityPriceDaily.check_in_date <= last_day)
+    row = session.execute(select(*_aggregates(CityPriceDaily)).where(*filters)).one()
+    return summarize(*row) if row[0] else None
+
+
+def daily_hotel_series(session: Session, hotel_ids: List[int],
+                       first_day: date) -> Dict[int, List[Tuple[date, float]]]:
+    """Average price per check-in day for each hotel, ordered by day."""
+    rows = session.execute(
+        select(
+            HotelPriceDaily.hotel_id,
+            HotelPriceDaily.check_in_date,
+            func.sum(HotelPriceDaily.price_sum) / func.sum(HotelPriceDaily.price_count)
+        ).where(
+            HotelPriceDaily.hotel_id.in_(hotel_ids),
+            HotelPriceDaily.check_in_date >= first_day
+        ).group_by(HotelPriceDaily.hotel_id, HotelPriceDaily.check_in_date)
+        .order_by(HotelPriceDaily.check_in_date)
+    ).all()
+    series: Dict[int, List[Tuple[date, float]]] = {}
+    for hotel_id, day, average in rows:
+        series.setdefault(hotel_id, []).append((day, average))
+    return series
+
+
+def refresh_cities(session: Session, city_ids: Optional[Iterable[int]] = None):
+    """
+    Recompute the city rollups of the given city IDs (all cities when None) from the
+    hotel rollups, e.g. after hotels were moved between cities in bulk.
+    """
+    if city_ids is None:
+        session.execute(delete(CityPriceDaily))
+        filters = []
+    else:
+        city_ids = list(city_ids)
+        session.execute(delete(CityPriceDaily).where(CityPriceDaily.city_id.in_(city_ids)))
+        filters = [Hotel.city_id.in_(city_ids)]
+    session.execute(insert(CityPriceDaily).from_select(
+        ["city_id", "check_in_date"] + _AGGREGATE_COLUMNS,
+        _city_rollup_select(*filters)
+    ))
+
+
+def rebuild_rollups(session: Session) -> Dict[str, int]:
+    """Rebuild both rollup tables from scratch, e.g. after a backfill of `hotel_prices`."""
+    session.execute(delete(HotelPriceDaily))
+    session.execute(insert(HotelPriceDaily).from_select(
+        ["hotel_id", "check_in_date", "room_category"] + _AGGREGATE_COLUMNS,
+        _hotel_rollup_select()
+    ))
+    refresh_cities(session)
+    session.commit()
+    return {
+        "hotel_rollup_rows": session.query(HotelPriceDaily).count(),
+        "city_rollup_rows": session.query(CityPriceDaily).count()
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild":
+        print("Usage: python -m app.services.price_rollups rebuild")
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        print(f"Rollup rebuild complete: {rebuild_rollups(db)}")
+    finally:
+        db.close()
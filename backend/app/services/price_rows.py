@@ -0,0 +1,121 @@
+"""
+ORM-free read path for price listings.
+
+Selects plain column tuples through SQLAlchemy Core, in the field order of the
+response models, so large listings skip ORM identity-map bookkeeping and
+per-row Pydantic validation and can be serialized directly with orjson.
+"""
+
+import base64
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.hotel import Hotel, HotelPrice
+
+# Keyset order for paginated and streamed listings; served by ix_hotel_prices_hotel_check_in
+KEYSET_ORDER = [HotelPrice.check_in_date.desc(), HotelPrice.id.desc()]
+STREAM_BATCH_SIZE = 1000
+
+# Same fields and order as HotelPriceResponse
+PRICE_COLUMNS = [
+    HotelPrice.hotel_id,
+    HotelPrice.check_in_date,
+    HotelPrice.check_out_date,
+    HotelPrice.price,
+    HotelPrice.currency,
+    HotelPrice.room_type,
+    HotelPrice.board_type,
+    HotelPrice.id,
+    HotelPrice.scraped_at,
+    HotelPrice.source,
+]
+
+# Same fields and order as HotelResponse
+HOTEL_COLUMNS = [
+    Hotel.name,
+    Hotel.booking_url,
+    Hotel.address,
+    Hotel.city,
+    Hotel.country,
+    Hotel.star_rating,
+    Hotel.user_rating,
+    Hotel.user_rating_count,
+    Hotel.amenities,
+    Hotel.latitude,
+    Hotel.longitude,
+    Hotel.id,
+    Hotel.created_at,
+    Hotel.updated_at,
+    Hotel.is_active,
+]
+
+
+def price_rows(db: Session, *filters, order_by=()) -> List[Row]:
+    """Price rows as named tuples (attribute access like the ORM objects)."""
+    return db.execute(select(*PRICE_COLUMNS).where(*filters).order_by(*order_by)).all()
+
+
+def as_dicts(rows: List[Row]) -> List[Dict[str, Any]]:
+    return [row._asdict() for row in rows]
+
+
+def encode_cursor(row: Row) -> str:
+    """Opaque cursor pointing just after `row` in keyset order."""
+    payload = orjson.dumps([row.check_in_date.isoformat(), row.id])
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of `encode_cursor`; raises ValueError for malformed cursors."""
+    try:
+        check_in, price_id = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(check_in), int(price_id)
+    except (TypeError, ValueError, orjson.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def after_cursor(cursor: str):
+    """Filter selecting the rows after `cursor` in keyset order."""
+    check_in, price_id = decode_cursor(cursor)
+    return tuple_(HotelPrice.check_in_date, HotelPrice.id) < tuple_(check_in, price_id)
+
+
+def price_page(db: Session, filters: list, limit: int) -> Tuple[List[Row], Optional[str]]:
+    """One keyset page of price rows and the cursor of the next page (None on the last page)."""
+    # One extra row tells whether another page follows
+    rows = db.execute(
+        select(*PRICE_COLUMNS).where(*filters).order_by(*KEYSET_ORDER).limit(limit + 1)
+    ).all()
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(rows[limit - 1])
+    return rows, None
+
+
+def stream_ndjson(filters: list, limit: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Yield price rows as NDJSON lines in keyset order.
+
+    Uses its own session and a server-side cursor (`yield_per`), so memory stays
+    bounded by the batch size however long the history is.
+    """
+    statement = select(*PRICE_COLUMNS).where(*filters).order_by(*KEYSET_ORDER)
+    if limit is not None:
+        statement = statement.limit(limit)
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+        for rows in result.partitions():
+            yield b"".join(orjson.dumps(row._asdict()) + b"\n" for row in rows)
+    finally:
+        db.close()
+
+
+def hotel_row(db: Session, hotel_id: int) -> Optional[Dict[str, Any]]:
+    row = db.execute(select(*HOTEL_COLUMNS).where(Hotel.id == hotel_id)).first()
+    return row._asdict() if row else None
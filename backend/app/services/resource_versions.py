@@ -0,0 +1,100 @@
+"""
+Per-resource data versions and conditional GET support.
+
+Every flush touching a hotel or its prices bumps ``hotel:<id>`` (and ``hotels`` for
+changes to the hotel list) in `resource_versions`, in the same transaction as the
+change. Endpoints derive their ETag from these versions, so `If-None-Match` can be
+answered with 304 Not Modified before querying or serializing anything.
+
+Writes that bypass the ORM session (raw SQL imports) do not bump versions.
+"""
+
+from typing import Dict, Iterable, Optional, Set
+
+from fastapi import Request, Response
+from sqlalchemy import event, inspect, select, update, insert
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.hotel import Hotel, HotelPrice
+from app.models.resource_version import ResourceVersion
+
+HOTEL_LIST = "hotels"
+
+
+def hotel_resource(hotel_id: int) -> str:
+    return f"hotel:{hotel_id}"
+
+
+def bump(session: Session, resources: Iterable[str]):
+    """Increment the version of each resource, creating it at version 1."""
+    for resource in sorted(set(resources)):
+        updated = session.execute(
+            update(ResourceVersion)
+            .where(ResourceVersion.resource == resource)
+            .values(version=ResourceVersion.version + 1)
+        )
+        if not updated.rowcount:
+            session.execute(insert(ResourceVersion).values(resource=resource, version=1))
+
+
+def versions(db: Session, resources: Iterable[str]) -> Dict[str, int]:
+    """Current version of each resource (0 if it never changed)."""
+    resources = list(resources)
+    found = dict(db.execute(
+        select(ResourceVersion.resource, ResourceVersion.version)
+        .where(ResourceVersion.resource.in_(resources))
+    ).all())
+    return {resource: found.get(resource, 0) for resource in resources}
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _bump_versions(session: Session, flush_context):
+    resources: Set[str] = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Hotel):
+            resources.update((HOTEL_LIST, hotel_resource(obj.id)))
+        elif isinstance(obj, HotelPrice):
+            hotel_ids = {obj.hotel_id, *inspect(obj).attrs.hotel_id.history.deleted}
+            resources.update(hotel_resource(hotel_id) for hotel_id in hotel_ids if hotel_id is not None)
+    if resources:
+        bump(session, resources)
+
+
+def make_etag(db: Session, resources: Iterable[str], *variant) -> str:
+    """
+    Weak ETag from the resources' versions plus anything else the body depends on
+    (e.g. the current date for time-windowed responses).
+    """
+    parts = [f"{resource}.{version}" for resource, version in versions(db, resources).items()]
+    parts += [str(value) for value in variant]
+    return 'W/"' + "-".join(parts) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def conditional_get(request: Request, response: Response, db: Session,
+                    resources: Iterable[str], *variant) -> Optional[Response]:
+    """
+    Set the ETag on `response` and return a 304 response when the client's
+    If-None-Match already matches it, or None when the body must be produced.
+    """
+    etag = make_etag(db, resources, *variant)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
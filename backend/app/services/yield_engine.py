@@ -0,0 +1,216 @@
+"""
+Vectorized yield management rules.
+
+The price-positioning, event and seasonal rules used by the yield recommendation
+endpoints, evaluated over NumPy arrays so a whole portfolio (or a whole check-in
+horizon) is scored in one pass.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.lazy_imports import lazy_import
+from app.models.historical_data import YieldRecommendation, MarketAnalysis
+
+np = lazy_import("numpy")
+
+MAINTAIN, RAISE_PRICE, LOWER_PRICE = 0, 1, 2
+RECOMMENDATION_TYPES = ["maintain", "raise_price", "lower_price"]
+
+SUMMER_MONTHS = [6, 7, 8]
+WINTER_MONTHS = [12, 1, 2]
+
+# Days before an event starts during which a night gets part of its impact
+NIGHT_EVENT_LEAD_DAYS = 2
+
+REASONS = [
+    "",
+    "Your hotel is significantly underpriced compared to competitors",
+    "Your hotel is overpriced compared to competitors",
+    "Local events suggest opportunity for price increase",
+    "Summer season typically allows for higher pricing",
+    "Winter season may require competitive pricing",
+]
+(REASON_NONE, REASON_UNDERPRICED, REASON_OVERPRICED,
+ REASON_EVENTS, REASON_SUMMER, REASON_WINTER) = range(len(REASONS))
+
+
+def event_weights(days_until_event: np.ndarray) -> np.ndarray:
+    """Share of an event's impact score applied given the days until it starts."""
+    return np.where(days_until_event <= 7, 0.3, np.where(days_until_event <= 30, 0.1, 0.0))
+
+
+def event_impacts(events: Sequence, group_index: np.ndarray, group_count: int,
+                  now: datetime) -> Tuple[np.ndarray, List[List[str]]]:
+    """
+    Aggregate event impact per group (e.g. per city).
+
+    `group_index[i]` is the group of `events[i]`. Returns the summed impact per group
+    and the human-readable event factors per group, in event order.
+    """
+    impacts = np.zeros(group_count)
+    factors: List[List[str]] = [[] for _ in range(group_count)]
+    if not len(events):
+        return impacts, factors
+
+    days_until = np.array([(event.start_date - now).days for event in events])
+    scores = np.array([event.impact_score or 0.0 for event in events], dtype=float)
+    impacts += np.bincount(group_index, weights=event_weights(days_until) * scores, minlength=group_count)
+
+    for event, group, days in zip(events, group_index, days_until):
+        if days <= 7:
+            factors[group].append(f"Major event: {event.name}")
+        elif days <= 30:
+            factors[group].append(f"Upcoming event: {event.name}")
+    return impacts, factors
+
+
+def nightly_event_impacts(events: Sequence, nights: Sequence[datetime]) -> Tuple[np.ndarray, List[List[str]]]:
+    """
+    Event impact for each check-in night.
+
+    An event running on the night (from its start day to its end day) weighs 0.3 and
+    is a major event for that night; one starting within `NIGHT_EVENT_LEAD_DAYS`
+    after the night weighs 0.1 and is an upcoming event.
+    """
+    impacts = np.zeros(len(nights))
+    factors: List[List[str]] = [[] for _ in nights]
+    if not len(events) or not len(nights):
+        return impacts, factors
+
+    night_days = np.array(nights, dtype="datetime64[D]")
+    start_days = np.array([event.start_date for event in events], dtype="datetime64[s]").astype("datetime64[D]")
+    end_days = np.array([event.end_date for event in events], dtype="datetime64[s]").astype("datetime64[D]")
+    scores = np.array([event.impact_score or 0.0 for event in events], dtype=float)
+
+    # nights x events matrices
+    days_until = (start_days[None, :] - night_days[:, None]) // np.timedelta64(1, "D")
+    during = (days_until <= 0) & (end_days[None, :] >= night_days[:, None])
+    ahead = (days_until > 0) & (days_until <= NIGHT_EVENT_LEAD_DAYS)
+    weights = np.where(during, 0.3, np.where(ahead, 0.1, 0.0))
+    impacts = weights @ scores
+
+    for night, event_index in zip(*np.nonzero(during | ahead)):
+        label = "Major event" if during[night, event_index] else "Upcoming event"
+        factors[night].append(f"{label}: {events[event_index].name}")
+    return impacts, factors
+
+
+def leave_one_out_median(market_sorted: np.ndarray, excluded: np.ndarray,
+                         has_excluded: np.ndarray, own: np.ndarray) -> np.ndarray:
+    """
+    Median of `market_sorted` with one occurrence of `excluded[i]` removed (where
+    `has_excluded[i]`) and `own[i]` added, for every i at once.
+
+    Matches np.percentile(competitors + [own], 50) for each hotel without building
+    a compset per hotel.
+    """
+    m = len(market_sorted)
+    removed_at = np.searchsorted(market_sorted, excluded, side="left")
+    below_own = np.searchsorted(market_sorted, own, side="left")
+    # Rank of `own` within the compset once the excluded price is removed
+    rank = below_own - (has_excluded & (removed_at < below_own))
+    size = m - has_excluded.astype(int) + 1
+
+    def compset_at(position):
+        shifted = np.where(has_excluded & (position >= removed_at), position + 1, position)
+        return market_sorted[np.clip(shifted, 0, max(m - 1, 0))] if m else np.zeros_like(own)
+
+    def combined_at(position):
+        return np.where(position < rank, compset_at(position),
+                        np.where(position == rank, own, compset_at(position - 1)))
+
+    lower = combined_at((size - 1) // 2)
+    upper = combined_at(size // 2)
+    return (lower + upper) / 2
+
+
+def evaluate_rules(your_price: np.ndarray, market_average: np.ndarray,
+                   event_impact: np.ndarray, month: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Apply the yield rules element-wise.
+
+    Returns arrays of recommendation codes, reason codes, suggested prices (NaN when
+    there is no suggestion), confidence scores and the masks behind each factor.
+    """
+    your_price = np.asarray(your_price, dtype=float)
+    market_average = np.asarray(market_average, dtype=float)
+    event_impact = np.asarray(event_impact, dtype=float)
+    month = np.asarray(month)
+
+    # Price positioning analysis
+    underpriced = your_price < market_average * 0.8
+    overpriced = ~underpriced & (your_price > market_average * 1.2)
+    recommendation = np.select([underpriced, overpriced], [RAISE_PRICE, LOWER_PRICE], MAINTAIN)
+    reason = np.select([underpriced, overpriced], [REASON_UNDERPRICED, REASON_OVERPRICED], REASON_NONE)
+    suggested = np.select([underpriced, overpriced], [market_average * 0.9, market_average * 1.1], np.nan)
+    confidence = np.where(underpriced | overpriced, 0.8, 0.7)
+
+    # Event-based adjustments
+    has_events = event_impact > 0
+    events_on_maintain = has_events & (recommendation == MAINTAIN)
+    events_on_raise = has_events & (recommendation == RAISE_PRICE)
+    suggested = np.where(events_on_maintain, your_price * (1 + event_impact), suggested)
+    suggested = np.where(events_on_raise, suggested * (1 + event_impact), suggested)
+    recommendation = np.where(events_on_maintain, RAISE_PRICE, recommendation)
+    reason = np.where(events_on_maintain, REASON_EVENTS, reason)
+    confidence = np.where(events_on_maintain, 0.7, confidence)
+
+    # Seasonal adjustments
+    summer = np.isin(month, SUMMER_MONTHS) & (recommendation == MAINTAIN)
+    winter = np.isin(month, WINTER_MONTHS) & (recommendation == MAINTAIN)
+    recommendation = np.select([summer, winter], [RAISE_PRICE, LOWER_PRICE], recommendation)
+    reason = np.select([summer, winter], [REASON_SUMMER, REASON_WINTER], reason)
+    suggested = np.select([summer, winter], [your_price * 1.1, your_price * 0.9], suggested)
+    confidence = np.where(summer | winter, 0.6, confidence)
+
+    return {
+        "recommendation": recommendation,
+        "reason": reason,
+        "suggested_price": suggested,
+        "confidence": confidence,
+        "underpriced": underpriced,
+        "overpriced": overpriced,
+        "event_factors": events_on_maintain | events_on_raise,
+        "summer": summer,
+        "winter": winter,
+    }
+
+
+def build_recommendation(rules: Dict[str, np.ndarray], i: int, your_price: float,
+                         market_average: float, price_percentile: float,
+                         competitor_count: int,
+                         event_factors: Optional[List[str]] = None) -> YieldRecommendation:
+    """Assemble the API model for element `i` of `evaluate_rules` output."""
+    factors = []
+    if rules["underpriced"][i]:
+        factors.append("Underpriced vs market average")
+    elif rules["overpriced"][i]:
+        factors.append("Overpriced vs market average")
+    if rules["event_factors"][i] and event_factors:
+        factors.extend(event_factors)
+    if rules["summer"][i]:
+        factors.append("Summer season")
+    elif rules["winter"][i]:
+        factors.append("Winter season")
+
+    suggested = rules["suggested_price"][i]
+    suggested = None if np.isnan(suggested) else round(float(suggested), 2)
+    confidence = float(rules["confidence"][i])
+
+    return YieldRecommendation(
+        recommendation_type=RECOMMENDATION_TYPES[rules["recommendation"][i]],
+        reasoning=REASONS[rules["reason"][i]],
+        suggested_price=suggested,
+        confidence_score=confidence,
+        factors=factors,
+        market_analysis=MarketAnalysis(
+            competitor_count=competitor_count,
+            average_market_price=round(float(market_average), 2),
+            price_percentile=round(float(price_percentile), 2),
+            recommended_price=suggested if suggested else your_price,
+            confidence_score=confidence
+        )
+    )
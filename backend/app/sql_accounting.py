@@ -0,0 +1,175 @@
+"""
+Per-request SQL query accounting.
+
+Engine cursor events count the queries and database time of the request being
+served (tracked through a context variable), group statements by shape to flag N+1
+patterns, and log the `EXPLAIN QUERY PLAN` of slow SELECTs.
+
+Configuration (environment):
+    SQL_DEBUG_HEADERS           1 to add X-DB-Query-Count, X-DB-Time-Ms and
+                                X-DB-N-Plus-One-Suspects to every response
+    SQL_N_PLUS_ONE_THRESHOLD    executions of one statement shape in a request that
+                                make it an N+1 suspect (default 10)
+    SQL_SLOW_QUERY_MS           duration above which a query's plan is logged (default 200)
+"""
+
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+
+from app import metrics
+from app.database import engine
+
+SQL_DEBUG_HEADERS = os.getenv("SQL_DEBUG_HEADERS", "").lower() in ("1", "true", "yes")
+N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))
+SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+
+logger = logging.getLogger(__name__)
+
+DB_QUERY_DURATION = metrics.Histogram(
+    "db_query_duration_seconds", "SQL statement execution time.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+DB_N_PLUS_ONE = metrics.Counter(
+    "db_n_plus_one_suspects_total", "Requests in which a statement shape repeated past the N+1 threshold.",
+    ("route",)
+)
+
+_WHITESPACE = re.compile(r"\s+")
+# Expanded IN lists and multi-row VALUES vary in length with the data, not the code path
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with whitespace and placeholder lists normalized."""
+    return _PLACEHOLDER_LIST.sub("?", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """Queries issued while a `track_queries` block is active."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def n_plus_one_suspects(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> Dict[str, int]:
+        """Statement shapes executed at least `threshold` times."""
+        return {shape: count for shape, count in self.shapes.most_common() if count >= threshold}
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "X-DB-Query-Count": str(self.count),
+            "X-DB-Time-Ms": f"{self.duration * 1000:.1f}",
+            "X-DB-N-Plus-One-Suspects": str(len(self.n_plus_one_suspects())),
+        }
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count the queries issued in this block (and tasks/threads started from it)."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def explain_query_plan(dbapi_connection, statement: str, parameters) -> List[str]:
+    """SQLite query plan of a SELECT, run on a raw cursor so it is not accounted itself."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._accounting_start = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_accounting_start", None)
+    if start is None:
+        return
+    duration = time.perf_counter() - start
+    DB_QUERY_DURATION.observe(duration)
+
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+    if duration * 1000 >= SLOW_QUERY_MS:
+        fields = {"duration_ms": round(duration * 1000, 1), "statement": statement_shape(statement)}
+        if (conn.dialect.name == "sqlite" and not executemany
+                and statement.lstrip().upper().startswith(("SELECT", "WITH"))):
+            try:
+                fields["plan"] = explain_query_plan(conn.connection.dbapi_connection, statement, parameters)
+            except Exception as e:
+                fields["plan_error"] = str(e)
+        logger.warning("Slow query (%.1f ms)", duration * 1000, extra=fields)
+
+
+def report_n_plus_one(stats: QueryStats, route: str):
+    suspects = stats.n_plus_one_suspects()
+    if not suspects:
+        return
+    DB_N_PLUS_ONE.labels(route).inc()
+    logger.warning(
+        "Possible N+1 queries in %s: %d statement shapes repeated", route, len(suspects),
+        extra={"route": route, "query_count": stats.count, "suspects": suspects}
+    )
+
+
+class QueryAccountingMiddleware:
+    """
+    ASGI middleware tracking the queries of each HTTP request.
+
+    N+1 suspects are logged and counted in metrics; with SQL_DEBUG_HEADERS the query
+    count, database time and number of suspect shapes are added to the response.
+    """
+
+    def __init__(self, app, debug_headers: bool = SQL_DEBUG_HEADERS):
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_with_headers(message):
+                if self.debug_headers and message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.extend(
+                        (name.lower().encode("latin-1"), value.encode("latin-1"))
+                        for name, value in stats.headers().items()
+                    )
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                report_n_plus_one(stats, metrics.route_template(scope))
@@ -0,0 +1,160 @@
+"""
+Micro-benchmarks of the analytics and recommendation kernels.
+
+Times each function of `app.services.analytics_kernels` on generated inputs of
+1k to 10M rows and compares the best time per size with the stored baselines in
+kernel_baselines.json. With `--check` the run fails when any kernel is slower than
+its baseline by more than the threshold (default 25%).
+
+    python -m benchmarks.kernels                          # all kernels, 1k..10M rows
+    python -m benchmarks.kernels --sizes 1000 100000 --kernels booking_curve
+    python -m benchmarks.kernels --check                  # exit 1 on regression
+    python -m benchmarks.kernels --save-baseline          # after an intended change
+
+Baselines are machine specific: record them on the machine that runs the checks.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from app.services import analytics_kernels
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "kernel_baselines.json")
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_THRESHOLD = 0.25
+# Slowdowns smaller than this are timer noise, whatever the ratio
+MIN_REGRESSION_MS = 0.05
+
+
+def make_inputs(rng: np.random.Generator, rows: int) -> Dict[str, object]:
+    """Historical bookings shaped like the synthetic dataset, as the routes pass them in."""
+    start = np.datetime64(datetime(2024, 1, 1), "us")
+    check_in = start + rng.integers(0, 365, rows).astype("timedelta64[D]")
+    lead_hours = (rng.gamma(2.0, 12.0, rows) * 24).astype(np.int64)
+    # ~2% of bookings are recorded after check-in and ~1% have no booking date
+    lead_hours[rng.random(rows) < 0.02] *= -1
+    booked = check_in - lead_hours.astype("timedelta64[h]")
+    booked[rng.random(rows) < 0.01] = np.datetime64("NaT")
+    occupancy = np.clip(rng.normal(0.6, 0.2, rows), 0.0, 1.0).round(4)
+    prices = (rng.gamma(9.0, 15.0, rows)).round(2)
+    # As loaded by historical_bookings.booking_columns
+    columns = {"check_in_dates": check_in, "booking_dates": booked, "occupancy_rates": occupancy, "prices": prices}
+    return {
+        "columns": columns,
+        "bookings": analytics_kernels.lead_time_bookings(**columns),
+        "prices": prices.tolist(),
+    }
+
+
+KERNELS: Dict[str, Callable[[Dict[str, object]], object]] = {
+    "lead_time_bookings": lambda inputs: analytics_kernels.lead_time_bookings(**inputs["columns"]),
+    "booking_curve": lambda inputs: analytics_kernels.booking_curve(inputs["bookings"]),
+    "booking_pace": lambda inputs: analytics_kernels.booking_pace(inputs["bookings"]),
+    "price_trend": lambda inputs: analytics_kernels.price_trend(inputs["prices"]),
+    "yield_recommendation": lambda inputs: analytics_kernels.yield_recommendation(
+        150.0, inputs["prices"], 0.1, ["Upcoming event: Benchmark"], 7
+    ),
+}
+
+
+def measure(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Best and median milliseconds per call over `repeat` samples of auto-ranged loops."""
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    gc.collect()
+    samples = [seconds / loops for seconds in timer.repeat(repeat=repeat, number=loops)]
+    return {"best_ms": round(min(samples) * 1000, 4), "median_ms": round(statistics.median(samples) * 1000, 4)}
+
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run(kernels: List[str], sizes: List[int], repeat: int, seed: int) -> Dict[str, Dict[str, dict]]:
+    results: Dict[str, Dict[str, dict]] = {name: {} for name in kernels}
+    for rows in sizes:
+        inputs = make_inputs(np.random.default_rng(seed), rows)
+        for name in kernels:
+            stats = measure(lambda: KERNELS[name](inputs), repeat)
+            stats["rows_per_s"] = round(rows / (stats["best_ms"] / 1000)) if stats["best_ms"] else None
+            results[name][str(rows)] = stats
+            print(f"{name:>22} {rows:>10,} rows  best {stats['best_ms']:>11.3f} ms", file=sys.stderr)
+        del inputs
+        gc.collect()
+    return results
+
+
+def compare(results: Dict[str, Dict[str, dict]], baseline: dict, threshold: float) -> List[dict]:
+    """Annotate results with their baseline and ratio; return the regressions."""
+    regressions = []
+    for name, by_size in results.items():
+        for rows, stats in by_size.items():
+            before = baseline.get("results", {}).get(name, {}).get(rows)
+            if before is None:
+                continue
+            stats["baseline_ms"] = before["best_ms"]
+            stats["ratio"] = round(stats["best_ms"] / before["best_ms"], 3) if before["best_ms"] else None
+            if (stats["best_ms"] > before["best_ms"] * (1 + threshold)
+                    and stats["best_ms"] - before["best_ms"] >= MIN_REGRESSION_MS):
+                regressions.append({"kernel": name, "rows": int(rows), **stats})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--kernels", nargs="*", choices=sorted(KERNELS), default=list(KERNELS))
+    parser.add_argument("--sizes", nargs="*", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=None,
+                        help=f"allowed slowdown ratio (default: stored with the baseline, else {DEFAULT_THRESHOLD})")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 on regressions")
+    parser.add_argument("--save-baseline", action="store_true", help="merge these results into the baseline file")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    threshold = args.threshold if args.threshold is not None else baseline.get("threshold", DEFAULT_THRESHOLD)
+    results = run(args.kernels, args.sizes, args.repeat, args.seed)
+    regressions = compare(results, baseline, threshold)
+    print(json.dumps({"threshold": threshold, "results": results, "regressions": regressions}, indent=2))
+
+    if args.save_baseline:
+        stored = baseline.get("results", {})
+        for name, by_size in results.items():
+            stored.setdefault(name, {}).update(
+                {rows: {"best_ms": stats["best_ms"]} for rows, stats in by_size.items()}
+            )
+        baseline = {
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "machine": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "processor": platform.machine(),
+            },
+            "threshold": threshold,
+            "results": stored,
+        }
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+    elif args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
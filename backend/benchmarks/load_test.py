@@ -0,0 +1,331 @@
+"""
+Async HTTP load driver for the API.
+
+Concurrent clients pick weighted requests covering every router in main.py (hotels,
+analytics, recommendations, events, scraping status, cache, health and metrics)
+with parameters drawn from the hotels, cities and events found in the target
+database, and the run reports throughput and p50/p95/p99 latency per endpoint as
+JSON. Pass `--baseline` with an earlier report to get per-endpoint ratios.
+
+Against a running server:
+    python -m benchmarks.load_test --base-url http://localhost:8000 --duration 60 --concurrency 32
+
+In-process (ASGI transport, no network; client and app share one event loop):
+    python -m benchmarks.synthetic_data --db /tmp/load.db
+    python -m benchmarks.load_test --db /tmp/load.db --duration 30 --output run.json
+
+Analytics responses are cached; run the server with ANALYTICS_CACHE_BACKEND=none to
+measure the uncached path. Scrape-triggering endpoints are not exercised.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+PERCENTILES = (50, 95, 99)
+
+
+class Targets:
+    """IDs, names and cities to draw request parameters from, fetched through the API."""
+
+    def __init__(self, hotels: List[dict], events: List[dict]):
+        if not hotels:
+            raise RuntimeError("No active hotels in the target database; seed it with benchmarks.synthetic_data")
+        self.hotels = hotels
+        self.hotel_ids = [hotel["id"] for hotel in hotels]
+        self.cities = sorted({hotel["city"] for hotel in hotels if hotel.get("city")})
+        self.event_ids = [item["id"] for item in events]
+
+    @classmethod
+    async def discover(cls, client: httpx.AsyncClient) -> "Targets":
+        hotels, after_id = [], 0
+        while True:
+            response = await client.get("/api/hotels/", params={"after_id": after_id, "limit": 1000})
+            response.raise_for_status()
+            hotels.extend(response.json())
+            after_id = response.headers.get("X-Next-After-Id")
+            if after_id is None:
+                break
+        response = await client.get("/api/events/", params={"limit": 1000})
+        return cls(hotels, response.json() if response.is_success else [])
+
+
+# (name, weight, request builder) -- builders return (method, path, query params)
+Scenario = Tuple[str, int, Callable[[random.Random, Targets], Tuple[str, str, Optional[dict]]]]
+
+
+def _day(offset: int) -> str:
+    return (datetime.now() + timedelta(days=offset)).strftime("%Y-%m-%d")
+
+
+def historical_hotel(r: random.Random, t: Targets) -> dict:
+    """Historical analyses by hotel ID, and one time in four by name through the resolver."""
+    hotel = r.choice(t.hotels)
+    return {"hotel_name": hotel["name"]} if r.random() < 0.25 else {"hotel_id": hotel["id"]}
+
+
+SCENARIOS: List[Scenario] = [
+    ("GET /", 1, lambda r, t: ("GET", "/", None)),
+    ("GET /health", 1, lambda r, t: ("GET", "/health", None)),
+    ("GET /metrics", 1, lambda r, t: ("GET", "/metrics", None)),
+    # hotels
+    ("GET /api/hotels/", 6, lambda r, t: ("GET", "/api/hotels/", {"limit": 100, "city": r.choice(t.cities)})),
+    # Autocomplete: a prefix of a hotel name, as typed
+    ("GET /api/hotels/search", 4, lambda r, t: (
+        "GET", "/api/hotels/search", {"q": r.choice(t.hotels)["name"][:r.randint(3, 10)]}
+    )),
+    ("GET /api/hotels/{hotel_id}", 8, lambda r, t: ("GET", f"/api/hotels/{r.choice(t.hotel_ids)}", None)),
+    ("GET /api/hotels/{hotel_id}/prices", 8, lambda r, t: (
+        "GET", f"/api/hotels/{r.choice(t.hotel_ids)}/prices",
+        {"limit": 500, "start_date": _day(-r.randint(0, 60)), "end_date": _day(r.randint(0, 60))}
+    )),
+    ("GET /api/hotels/{hotel_id}/with-prices", 4, lambda r, t: (
+        "GET", f"/api/hotels/{r.choice(t.hotel_ids)}/with-prices", None
+    )),
+    # Compset lookups: a radius or the k nearest
+    ("GET /api/hotels/{hotel_id}/competitors", 3, lambda r, t: (
+        "GET", f"/api/hotels/{r.choice(t.hotel_ids)}/competitors",
+        {"radius_km": r.choice([1, 3, 5])} if r.random() < 0.5 else {"k": r.choice([5, 10, 20])}
+    )),
+    ("GET /api/hotels/cities/list", 2, lambda r, t: ("GET", "/api/hotels/cities/list", None)),
+    ("GET /api/hotels/stats/overview", 2, lambda r, t: ("GET", "/api/hotels/stats/overview", None)),
+    # analytics
+    ("GET /api/analytics/price-evolution/{hotel_id}", 5, lambda r, t: (
+        "GET", f"/api/analytics/price-evolution/{r.choice(t.hotel_ids)}", {"days_back": r.choice([30, 90, 180])}
+    )),
+    ("GET /api/analytics/market-comparison", 4, lambda r, t: (
+        "GET", "/api/analytics/market-comparison", {"city": r.choice(t.cities), "use_rollups": r.random() < 0.5}
+    )),
+    ("GET /api/analytics/price-trends", 4, lambda r, t: (
+        "GET", "/api/analytics/price-trends",
+        {"hotel_ids": r.sample(t.hotel_ids, min(5, len(t.hotel_ids))), "days_back": r.choice([30, 90])}
+    )),
+    ("GET /api/analytics/occupancy-analysis", 3, lambda r, t: (
+        "GET", "/api/analytics/occupancy-analysis", historical_hotel(r, t)
+    )),
+    ("GET /api/analytics/seasonal-analysis", 2, lambda r, t: (
+        "GET", "/api/analytics/seasonal-analysis",
+        {"city": r.choice(t.cities), "year": datetime.now().year, "use_rollups": r.random() < 0.5}
+    )),
+    # recommendations
+    ("GET /api/recommendations/yield-recommendation/{hotel_id}", 5, lambda r, t: (
+        "GET", f"/api/recommendations/yield-recommendation/{r.choice(t.hotel_ids)}",
+        {"radius_km": r.choice([2, 5])} if r.random() < 0.3 else None
+    )),
+    ("GET /api/recommendations/yield-recommendation/{hotel_id}/horizon", 3, lambda r, t: (
+        "GET", f"/api/recommendations/yield-recommendation/{r.choice(t.hotel_ids)}/horizon", {"days": 30}
+    )),
+    ("GET /api/recommendations/yield-recommendations", 2, lambda r, t: (
+        "GET", "/api/recommendations/yield-recommendations", {"city": r.choice(t.cities)}
+    )),
+    ("GET /api/recommendations/booking-pace-analysis", 3, lambda r, t: (
+        "GET", "/api/recommendations/booking-pace-analysis", historical_hotel(r, t)
+    )),
+    ("GET /api/recommendations/seasonal-recommendations", 2, lambda r, t: (
+        "GET", "/api/recommendations/seasonal-recommendations", {"city": r.choice(t.cities)}
+    )),
+    ("GET /api/recommendations/amenity-impact-analysis", 2, lambda r, t: (
+        "GET", "/api/recommendations/amenity-impact-analysis", {"city": r.choice(t.cities)}
+    )),
+    # events
+    ("GET /api/events/", 3, lambda r, t: ("GET", "/api/events/", {"city": r.choice(t.cities)})),
+    ("GET /api/events/{event_id}", 2, lambda r, t: (
+        "GET", f"/api/events/{r.choice(t.event_ids) if t.event_ids else 0}", None
+    )),
+    ("GET /api/events/upcoming/events", 2, lambda r, t: ("GET", "/api/events/upcoming/events", {"days_ahead": 90})),
+    ("GET /api/events/cities/list", 1, lambda r, t: ("GET", "/api/events/cities/list", None)),
+    ("GET /api/events/types/list", 1, lambda r, t: ("GET", "/api/events/types/list", None)),
+    ("GET /api/events/impact-analysis/{city}", 2, lambda r, t: (
+        "GET", f"/api/events/impact-analysis/{r.choice(t.cities)}", None
+    )),
+    # scraping (status only; scrapes hit Booking.com) and cache
+    ("GET /api/scraping/status", 1, lambda r, t: ("GET", "/api/scraping/status", None)),
+    ("GET /api/scraping/stats", 1, lambda r, t: ("GET", "/api/scraping/stats", None)),
+    ("GET /api/cache/stats", 1, lambda r, t: ("GET", "/api/cache/stats", None)),
+]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(q / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Counter] = {}
+
+    def record(self, name: str, seconds: float, status: str):
+        self.latencies.setdefault(name, []).append(seconds)
+        self.statuses.setdefault(name, Counter())[status] += 1
+
+    @staticmethod
+    def summary(samples: List[float], statuses: Counter, elapsed: float) -> dict:
+        samples = sorted(samples)
+        errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "3")))
+        stats = {
+            "requests": len(samples),
+            "errors": errors,
+            "statuses": dict(sorted(statuses.items())),
+            "throughput_rps": round(len(samples) / elapsed, 2),
+            "mean_ms": round(sum(samples) / len(samples) * 1000, 2),
+        }
+        for q in PERCENTILES:
+            stats[f"p{q}_ms"] = round(percentile(samples, q) * 1000, 2)
+        stats["max_ms"] = round(samples[-1] * 1000, 2)
+        return stats
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {
+            name: self.summary(self.latencies[name], self.statuses[name], elapsed)
+            for name in sorted(self.latencies)
+        }
+        everything = [seconds for samples in self.latencies.values() for seconds in samples]
+        statuses = sum(self.statuses.values(), Counter())
+        return {
+            "total": self.summary(everything, statuses, elapsed) if everything else {},
+            "endpoints": endpoints,
+        }
+
+
+async def worker(client: httpx.AsyncClient, rng: random.Random, targets: Targets,
+                 scenarios: List[Scenario], deadline: float, remaining: List[int], recorder: Recorder):
+    names = [scenario[0] for scenario in scenarios]
+    weights = [scenario[1] for scenario in scenarios]
+    builders = {scenario[0]: scenario[2] for scenario in scenarios}
+    while time.perf_counter() < deadline and remaining[0] != 0:
+        remaining[0] -= 1
+        name = rng.choices(names, weights)[0]
+        method, path, params = builders[name](rng, targets)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, params=params)
+            await response.aread()
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        recorder.record(name, time.perf_counter() - started, status)
+
+
+def compare(report: dict, baseline: dict) -> Dict[str, dict]:
+    """Current / baseline ratio of throughput and latency percentiles per endpoint."""
+    ratios = {}
+    for name, stats in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        ratios[name] = {
+            key: round(stats[key] / before[key], 3) if before.get(key) else None
+            for key in ["throughput_rps"] + [f"p{q}_ms" for q in PERCENTILES]
+        }
+    return ratios
+
+
+async def run(client: httpx.AsyncClient, args) -> dict:
+    targets = await Targets.discover(client)
+    scenarios = [s for s in SCENARIOS if not args.only or any(part in s[0] for part in args.only)]
+    if not scenarios:
+        raise SystemExit(f"No scenario matches {args.only}")
+    recorder = Recorder()
+    remaining = [args.requests or -1]
+
+    if args.warmup:
+        warmup = Recorder()
+        await asyncio.gather(*(
+            worker(client, random.Random(args.seed - i - 1), targets, scenarios,
+                   time.perf_counter() + args.warmup, [-1], warmup)
+            for i in range(args.concurrency)
+        ))
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        worker(client, random.Random(args.seed + i), targets, scenarios, deadline, remaining, recorder)
+        for i in range(args.concurrency)
+    ))
+    elapsed = time.perf_counter() - started
+
+    report = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {
+            "target": args.base_url or f"in-process:{args.db}",
+            "duration_s": args.duration,
+            "requests_limit": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "hotels": len(targets.hotel_ids),
+            "cities": len(targets.cities),
+        },
+        "elapsed_s": round(elapsed, 2),
+        **recorder.report(elapsed),
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["vs_baseline"] = compare(report, json.load(f))
+    return report
+
+
+def make_client(args) -> httpx.AsyncClient:
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.base_url:
+        return httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits)
+
+    # The app binds its engine to DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.db)}"
+    from main import app
+    from app.database import engine
+    from app.migrations import init_db
+    # ASGITransport does not run the app's startup hook
+    init_db(engine)
+    # Unhandled errors become 500 responses, as behind a server
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://loadtest",
+                             timeout=timeout, limits=limits)
+
+
+async def amain(args) -> dict:
+    async with make_client(args) as client:
+        return await run(client, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--base-url", help="URL of a running server")
+    target.add_argument("--db", help="SQLite file to serve in-process")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run (after warmup)")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests (0: no limit)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=float, default=0.0, help="seconds of unrecorded load first")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--only", nargs="*", help="only endpoints whose name contains one of these")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--output", help="write the report here as well as to stdout")
+    args = parser.parse_args()
+
+    # One INFO line per request would swamp the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    report = asyncio.run(amain(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
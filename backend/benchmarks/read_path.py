@@ -0,0 +1,117 @@
+"""
+Benchmark the price listing read path: ORM objects + Pydantic validation versus
+Core column tuples + orjson, for a hotel with a large price history.
+
+Runs against a throwaway SQLite database:
+    python -m benchmarks.read_path --rows 10000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.hotel import Hotel, HotelPrice, HotelPriceResponse
+from app.services import price_rows
+
+price_list_adapter = TypeAdapter(List[HotelPriceResponse])
+
+
+def seed(session, rows: int):
+    hotel = Hotel(name="Benchmark Hotel", booking_url="https://example.com/benchmark", city="Paris")
+    session.add(hotel)
+    session.flush()
+    start = datetime(2024, 1, 1)
+    session.bulk_insert_mappings(HotelPrice, [
+        {
+            "hotel_id": hotel.id,
+            "room_type": ("Double Room", "Twin Room", "Suite")[i % 3],
+            "price": 80 + (i * 7) % 300,
+            "currency": "EUR",
+            "check_in_date": start + timedelta(days=i % 365),
+            "check_out_date": start + timedelta(days=i % 365 + 1),
+            "scraped_at": start + timedelta(minutes=i),
+            "source": "booking.com",
+        }
+        for i in range(rows)
+    ])
+    session.commit()
+    return hotel.id
+
+
+def orm_path(session, hotel_id: int) -> bytes:
+    """What the endpoint did before: ORM objects, response_model validation, json.dumps."""
+    prices = session.query(HotelPrice).filter(
+        HotelPrice.hotel_id == hotel_id
+    ).order_by(HotelPrice.check_in_date.desc()).all()
+    validated = price_list_adapter.validate_python(prices, from_attributes=True)
+    content = price_list_adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def core_path(session, hotel_id: int) -> bytes:
+    """Fast path: Core column tuples serialized with orjson."""
+    rows = price_rows.price_rows(
+        session, HotelPrice.hotel_id == hotel_id, order_by=[HotelPrice.check_in_date.desc()]
+    )
+    return orjson.dumps(price_rows.as_dicts(rows))
+
+
+def timed(fn, session_factory, hotel_id: int, repeat: int):
+    samples = []
+    body = b""
+    for _ in range(repeat):
+        session = session_factory()
+        try:
+            started = time.perf_counter()
+            body = fn(session, hotel_id)
+            samples.append(time.perf_counter() - started)
+        finally:
+            session.close()
+    return samples, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+
+        session = session_factory()
+        hotel_id = seed(session, args.rows)
+        session.close()
+
+        results = {}
+        bodies = {}
+        for name, fn in (("orm_pydantic", orm_path), ("core_orjson", core_path)):
+            samples, bodies[name] = timed(fn, session_factory, hotel_id, args.repeat)
+            results[name] = {
+                "median_ms": round(statistics.median(samples) * 1000, 2),
+                "min_ms": round(min(samples) * 1000, 2),
+                "bytes": len(bodies[name]),
+            }
+        engine.dispose()
+
+    results["rows"] = args.rows
+    results["speedup"] = round(results["orm_pydantic"]["median_ms"] / results["core_orjson"]["median_ms"], 2)
+    results["same_payload"] = json.loads(bodies["orm_pydantic"]) == json.loads(bodies["core_orjson"])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Cold start benchmark of the API process.
+
+Imports `main` in fresh interpreters under `python -X importtime` and reports the
+median import time of the app and of each module (self and cumulative), the time
+of the startup schema check (`init_db`), and which heavy libraries were loaded by
+the import; those should only load when an endpoint that needs them runs.
+
+    python -m benchmarks.startup                     # 5 runs, top 25 modules
+    python -m benchmarks.startup --runs 10 --top 50 --db /tmp/bench.db
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Imported on demand by the analytics, archive and scraping code paths
+HEAVY_MODULES = ["numpy", "pandas", "pyarrow", "bs4", "requests", "uvicorn"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from app.migrations import init_db
+init_db(main.engine)
+done = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "init_db_ms": (done - imported) * 1000,
+    "heavy_modules_loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| \s*(\S+)$")
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, float]]:
+    """Self and cumulative milliseconds per module from `-X importtime` output (first import only)."""
+    modules: Dict[str, Dict[str, float]] = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and match.group(3) not in modules:
+            modules[match.group(3)] = {
+                "self_ms": int(match.group(1)) / 1000,
+                "cumulative_ms": int(match.group(2)) / 1000,
+            }
+    return modules
+
+
+def probe(database_url: str) -> dict:
+    env = dict(os.environ, DATABASE_URL=database_url, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["modules"] = parse_importtime(proc.stderr)
+    return result
+
+
+def summarize(runs: List[dict], top: int) -> dict:
+    names = set.intersection(*(set(run["modules"]) for run in runs))
+    modules = {
+        name: {
+            "self_ms": round(statistics.median(run["modules"][name]["self_ms"] for run in runs), 2),
+            "cumulative_ms": round(statistics.median(run["modules"][name]["cumulative_ms"] for run in runs), 2),
+        }
+        for name in names
+    }
+    slowest = sorted(modules.items(), key=lambda item: item[1]["cumulative_ms"], reverse=True)[:top]
+    return {
+        "runs": len(runs),
+        "import_ms": round(statistics.median(run["import_ms"] for run in runs), 1),
+        "init_db_ms": round(statistics.median(run["init_db_ms"] for run in runs), 1),
+        "modules_imported": len(names),
+        "heavy_modules_loaded": sorted(set().union(*(run["heavy_modules_loaded"] for run in runs))),
+        "slowest_modules": [{"module": name, **stats} for name, stats in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25, help="modules to list, by cumulative import time")
+    parser.add_argument("--db", help="SQLite file to check the schema of (default: a fresh temporary file)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.abspath(args.db) if args.db else os.path.join(tmp, "startup.db")
+        runs = []
+        for i in range(args.runs):
+            runs.append(probe(f"sqlite:///{path}"))
+            print(f"run {i + 1}: import {runs[-1]['import_ms']:.0f} ms, "
+                  f"init_db {runs[-1]['init_db_ms']:.0f} ms", file=sys.stderr)
+    print(json.dumps(summarize(runs, args.top), indent=2))
+
+
+if __name__ == "__main__":
+    main()
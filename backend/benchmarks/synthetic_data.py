@@ -0,0 +1,306 @@
+"""
+Seeded synthetic dataset for load and scale testing.
+
+Generates hotels spread over European cities, nightly prices with seasonality,
+weekend and event uplifts and several scrape snapshots per stay date, city events
+and `HistoricalData` bookings that form booking curves, then rebuilds the price
+rollups. The same seed always produces the same data. Stay dates are centred on
+today so the "last N days" analytics find data.
+
+The defaults give ~10M price rows (1000 hotels x 365 nights x 3 rooms x 9 snapshots):
+    python -m benchmarks.synthetic_data --db /tmp/load.db
+    python -m benchmarks.synthetic_data --db /tmp/small.db --hotels 50 --snapshots 2
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.migrations import init_db
+from app.models.event import Event
+from app.models.historical_data import HistoricalData
+from app.models.hotel import Hotel, HotelPrice
+from app.services.cities import resolve_ids
+from app.services.price_rollups import rebuild_rollups
+
+# name, country, latitude, longitude, price level relative to the average city
+CITIES = [
+    ("Paris", "France", 48.8566, 2.3522, 1.35),
+    ("London", "United Kingdom", 51.5074, -0.1278, 1.45),
+    ("Barcelona", "Spain", 41.3874, 2.1686, 1.05),
+    ("Rome", "Italy", 41.9028, 12.4964, 1.10),
+    ("Amsterdam", "Netherlands", 52.3676, 4.9041, 1.30),
+    ("Berlin", "Germany", 52.5200, 13.4050, 0.95),
+    ("Lisbon", "Portugal", 38.7223, -9.1393, 0.85),
+    ("Vienna", "Austria", 48.2082, 16.3738, 0.95),
+    ("Prague", "Czech Republic", 50.0755, 14.4378, 0.75),
+    ("Madrid", "Spain", 40.4168, -3.7038, 0.90),
+]
+# room type, price multiplier
+ROOM_TYPES = [("Standard Double Room", 1.0), ("Twin Room", 0.95), ("Junior Suite", 1.8)]
+BOARD_TYPES = ["Room only", "Breakfast included", "Half board"]
+AMENITIES = [
+    "Free WiFi", "Air conditioning", "Parking", "Fitness centre", "Spa", "Swimming pool",
+    "Restaurant", "Bar", "Room service", "24-hour front desk", "Airport shuttle",
+    "Non-smoking rooms", "Family rooms", "Pet friendly", "Lift", "Sauna",
+]
+EVENT_TYPES = ["conference", "festival", "sports", "concert", "trade fair"]
+NAME_PARTS = (
+    ["Grand", "Royal", "City", "Park", "Central", "Boutique", "Old Town", "Riverside", "Garden", "Plaza"],
+    ["Hotel", "Suites", "Inn", "Residence", "Palace", "Lodge"],
+)
+# Days before check-in at which each scrape snapshot is taken, nearest first
+SNAPSHOT_LEADS = [1, 3, 7, 14, 21, 30, 45, 60, 90, 120, 180]
+BATCH_SIZE = 50000
+SQLITE_DATETIME = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def _sqlite_bulk_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.close()
+
+
+def make_hotels(rng: np.random.Generator, count: int) -> List[Dict]:
+    hotels = []
+    for i in range(count):
+        city, country, lat, lon, _ = CITIES[i % len(CITIES)]
+        stars = int(rng.choice([2, 3, 3, 4, 4, 4, 5]))
+        amenities = rng.choice(AMENITIES, size=int(rng.integers(4, 12)), replace=False)
+        hotels.append({
+            "name": f"{rng.choice(NAME_PARTS[0])} {city} {rng.choice(NAME_PARTS[1])} {i + 1}",
+            "booking_url": f"https://www.booking.com/hotel/synthetic/hotel-{i + 1}.html",
+            "address": f"{int(rng.integers(1, 200))} Synthetic Street, {city}",
+            "city": city,
+            "country": country,
+            "star_rating": float(stars),
+            "user_rating": round(float(np.clip(rng.normal(6.5 + stars * 0.5, 0.6), 5.0, 9.9)), 1),
+            "user_rating_count": int(rng.integers(20, 5000)),
+            "amenities": sorted(str(amenity) for amenity in amenities),
+            # ~ within 5 km of the centre
+            "latitude": round(lat + float(rng.normal(0, 0.02)), 6),
+            "longitude": round(lon + float(rng.normal(0, 0.03)), 6),
+            "is_active": True,
+        })
+    return hotels
+
+
+def make_events(rng: np.random.Generator, start: datetime, days: int, per_city: int) -> List[Dict]:
+    events = []
+    for city, country, _, _, _ in CITIES:
+        for i in range(per_city):
+            first_day = start + timedelta(days=int(rng.integers(0, days)))
+            event_type = str(rng.choice(EVENT_TYPES))
+            events.append({
+                "name": f"{city} {event_type.title()} {i + 1}",
+                "city": city,
+                "country": country,
+                "start_date": first_day,
+                "end_date": first_day + timedelta(days=int(rng.integers(1, 5))),
+                "event_type": event_type,
+                "expected_attendance": int(rng.integers(1000, 80000)),
+                "impact_score": round(float(rng.uniform(1.05, 1.8)), 2),
+                "description": f"Synthetic {event_type} in {city}",
+            })
+    return events
+
+
+def event_uplift(events: List[Dict], city: str, start: datetime, days: int) -> np.ndarray:
+    """Price multiplier per stay date from the city's events (largest impact wins)."""
+    uplift = np.ones(days)
+    for item in events:
+        if item["city"] != city:
+            continue
+        first = max((item["start_date"] - start).days, 0)
+        last = min((item["end_date"] - start).days, days - 1)
+        if first <= last:
+            uplift[first:last + 1] = np.maximum(uplift[first:last + 1], item["impact_score"])
+    return uplift
+
+
+def seasonality(start: datetime, days: int) -> np.ndarray:
+    """Summer peak, winter trough, Friday/Saturday bump."""
+    stay_dates = [start + timedelta(days=offset) for offset in range(days)]
+    day_of_year = np.array([day.timetuple().tm_yday for day in stay_dates])
+    weekend = np.array([day.weekday() in (4, 5) for day in stay_dates])
+    return (1 + 0.25 * np.sin(2 * math.pi * (day_of_year - 105) / 365.25)) * np.where(weekend, 1.15, 1.0)
+
+
+def season_name(day: datetime) -> str:
+    if day.month in (6, 7, 8, 12):
+        return "high"
+    if day.month in (1, 2, 11):
+        return "low"
+    return "shoulder"
+
+
+def _stored(value: datetime) -> str:
+    """A datetime in the string format SQLAlchemy stores in SQLite."""
+    return value.strftime(SQLITE_DATETIME)
+
+
+PRICE_COLUMNS = ("hotel_id", "room_type", "price", "currency", "check_in_date", "check_out_date",
+                 "scraped_at", "board_type", "source")
+
+
+def price_rows(rng: np.random.Generator, hotel_id: int, base_price: float, season: np.ndarray,
+               uplift: np.ndarray, start: datetime, now: datetime, snapshots: int):
+    """Scrape snapshots of every room for every stay date, as `PRICE_COLUMNS` tuples; later snapshots cost more."""
+    days = len(season)
+    leads = SNAPSHOT_LEADS[:snapshots]
+    stay_dates = [start + timedelta(days=offset) for offset in range(days + 1)]
+    stored = [_stored(day) for day in stay_dates]
+    scraped = {lead: [_stored(min(day - timedelta(days=lead), now)) for day in stay_dates] for lead in leads}
+    for room_index, (room_type, room_factor) in enumerate(ROOM_TYPES):
+        board_type = BOARD_TYPES[room_index % len(BOARD_TYPES)]
+        noise = rng.normal(1.0, 0.04, size=(len(leads), days))
+        for lead_index, lead in enumerate(leads):
+            # Last-minute prices run up to ~15% above the early ones
+            lead_factor = 1.15 - 0.15 * min(lead, 90) / 90
+            prices = np.round(base_price * room_factor * season * uplift * lead_factor * noise[lead_index], 2)
+            scraped_at = scraped[lead]
+            for offset, price in enumerate(prices.tolist()):
+                yield (hotel_id, room_type, price, "EUR", stored[offset], stored[offset + 1],
+                       scraped_at[offset], board_type, "synthetic")
+
+
+BOOKING_COLUMNS = ("hotel_id", "hotel_name", "check_in_date", "check_out_date", "price", "currency", "room_type",
+                   "board_type", "occupancy_rate", "booking_date", "revenue", "cost_per_night",
+                   "profit_margin", "season", "event_impact", "created_at")
+
+
+def booking_rows(rng: np.random.Generator, hotel_id: int, hotel_name: str, base_price: float, season: np.ndarray,
+                 uplift: np.ndarray, start: datetime, stay_offsets: np.ndarray, bookings_per_night: int,
+                 created_at: str):
+    """
+    Bookings of past stay dates forming a booking curve, as `BOOKING_COLUMNS` tuples.
+
+    Lead times are gamma distributed (most bookings in the last month) and each
+    booking carries the occupancy reached once it was made, so occupancy rises
+    towards check-in.
+    """
+    for offset in stay_offsets:
+        check_in = start + timedelta(days=int(offset))
+        stored, stored_out = _stored(check_in), _stored(check_in + timedelta(days=1))
+        final_occupancy = float(np.clip(rng.normal(0.72 * season[offset] * min(uplift[offset], 1.3), 0.08), 0.2, 1.0))
+        leads = np.sort(rng.gamma(2.0, 12.0, size=bookings_per_night).astype(int))[::-1]
+        for rank, lead in enumerate(leads, start=1):
+            lead = int(lead)
+            # Early birds get a discount, last-minute bookings pay a premium
+            price = round(float(base_price * season[offset] * uplift[offset] * (1.1 - 0.2 * min(lead, 60) / 60)
+                                * rng.normal(1.0, 0.05)), 2)
+            cost = round(base_price * 0.55, 2)
+            yield (hotel_id, hotel_name, stored, stored_out, price, "EUR", ROOM_TYPES[rank % len(ROOM_TYPES)][0],
+                   BOARD_TYPES[rank % len(BOARD_TYPES)], round(final_occupancy * rank / len(leads), 4),
+                   _stored(check_in - timedelta(days=lead, hours=int(rng.integers(0, 24)))),
+                   price, cost, round((price - cost) / price, 4), season_name(check_in),
+                   round(float(uplift[offset]) - 1, 2), created_at)
+
+
+def _insert_batches(connection, table: str, columns, rows) -> int:
+    """executemany straight on the driver; row tuples are already in storage format."""
+    statement = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            connection.exec_driver_sql(statement, batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        connection.exec_driver_sql(statement, batch)
+        count += len(batch)
+    return count
+
+
+def generate(engine, hotels: int = 1000, days: int = 365, snapshots: int = 9, events_per_city: int = 12,
+             history_nights: int = 90, bookings_per_night: int = 12, seed: int = 42) -> Dict[str, int]:
+    """Create the schema on `engine` and fill it; returns row counts per table."""
+    if not 1 <= snapshots <= len(SNAPSHOT_LEADS):
+        raise ValueError(f"snapshots must be between 1 and {len(SNAPSHOT_LEADS)}")
+    rng = np.random.default_rng(seed)
+    init_db(engine)
+
+    now = datetime.now().replace(microsecond=0)
+    start = datetime.combine(now.date(), datetime.min.time()) - timedelta(days=days // 2)
+    season = seasonality(start, days)
+    # Bookings only exist for nights that already happened
+    past_nights = np.arange(0, min(days // 2, days))
+    history_nights = min(history_nights, len(past_nights))
+
+    hotel_rows = make_hotels(rng, hotels)
+    event_rows = make_events(rng, start, days, events_per_city)
+    counts = {"hotels": len(hotel_rows), "events": len(event_rows), "hotel_prices": 0, "historical_data": 0}
+
+    with engine.begin() as connection:
+        # Core inserts bypass the session hook that resolves city IDs
+        city_ids = resolve_ids(connection, {city: country for city, country, _, _, _ in CITIES})
+        for row in hotel_rows + event_rows:
+            row["city_id"] = city_ids[row["city"]]
+        connection.execute(insert(Hotel.__table__), hotel_rows)
+        connection.execute(insert(Event.__table__), event_rows)
+        hotel_ids = [row[0] for row in connection.exec_driver_sql("SELECT id FROM hotels ORDER BY id")][-hotels:]
+
+    uplifts = {city: event_uplift(event_rows, city, start, days) for city, _, _, _, _ in CITIES}
+    city_levels = {city: level for city, _, _, _, level in CITIES}
+    for hotel_id, hotel in zip(hotel_ids, hotel_rows):
+        base_price = 45 * hotel["star_rating"] * city_levels[hotel["city"]] * float(rng.uniform(0.85, 1.15))
+        uplift = uplifts[hotel["city"]]
+        stay_offsets = np.sort(rng.choice(past_nights, size=history_nights, replace=False))
+        with engine.begin() as connection:
+            counts["hotel_prices"] += _insert_batches(
+                connection, HotelPrice.__tablename__, PRICE_COLUMNS,
+                price_rows(rng, hotel_id, base_price, season, uplift, start, now, snapshots)
+            )
+            counts["historical_data"] += _insert_batches(
+                connection, HistoricalData.__tablename__, BOOKING_COLUMNS,
+                booking_rows(rng, hotel_id, hotel["name"], base_price, season, uplift, start, stay_offsets,
+                             bookings_per_night, now.strftime("%Y-%m-%d %H:%M:%S"))
+            )
+
+    # Bulk inserts bypass the session hook that maintains the rollups
+    session = sessionmaker(bind=engine)()
+    try:
+        counts.update(rebuild_rollups(session))
+    finally:
+        session.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", required=True, help="SQLite file to create or extend")
+    parser.add_argument("--hotels", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=365, help="stay dates per hotel, centred on today")
+    parser.add_argument("--snapshots", type=int, default=9, help="scrapes per room and stay date")
+    parser.add_argument("--events-per-city", type=int, default=12)
+    parser.add_argument("--history-nights", type=int, default=90, help="past stay dates with bookings per hotel")
+    parser.add_argument("--bookings-per-night", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{os.path.abspath(args.db)}")
+    event.listen(engine, "connect", _sqlite_bulk_pragmas)
+    started = time.perf_counter()
+    counts = generate(
+        engine, hotels=args.hotels, days=args.days, snapshots=args.snapshots,
+        events_per_city=args.events_per_city, history_nights=args.history_nights,
+        bookings_per_night=args.bookings_per_night, seed=args.seed
+    )
+    engine.dispose()
+    counts["seconds"] = round(time.perf_counter() - started, 1)
+    print(json.dumps(counts, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,38 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
-import uvicorn
 from dotenv import load_dotenv
 import os
 
-from app.database import engine, Base
-from app.routes import hotels, scraping, analytics, recommendations, events
+from app.database import engine
+from app import metrics, sql_accounting
+from app.logging_config import setup_logging
+from app.migrations import SCHEMA_CHECK_ON_STARTUP, init_db
+from app.routes import hotels, scraping, analytics, recommendations, events, cache
+from app.services import price_rollups  # Registers the rollup maintenance hook
 
 # Load environment variables
 load_dotenv()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Queue-based logging; configure before anything logs
+setup_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema checks run when the server starts, not on import (SCHEMA_CHECK_ON_STARTUP)
+    if SCHEMA_CHECK_ON_STARTUP:
+        init_db(engine)
+    yield
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Hotel Monitoring MVP API",
     description="API for hotel monitoring and yield strategy simulation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -28,14 +42,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "ETag", "X-Next-Cursor", "X-Next-After-Id",
+        "X-Downsampling-Method", "X-Original-Count", "X-Returned-Count", "X-Reduction-Ratio",
+        "X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-N-Plus-One-Suspects"
+    ],
 )
 
+# Per-request SQL query counts, N+1 detection and debug headers (SQL_DEBUG_HEADERS)
+app.add_middleware(sql_accounting.QueryAccountingMiddleware)
+
+# Per-route request metrics; added last so it also times the middleware above
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(hotels.router, prefix="/api/hotels", tags=["hotels"])
 app.include_router(scraping.router, prefix="/api/scraping", tags=["scraping"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
 app.include_router(recommendations.router, prefix="/api/recommendations", tags=["recommendations"])
 app.include_router(events.router, prefix="/api/events", tags=["events"])
+app.include_router(cache.router, prefix="/api/cache", tags=["cache"])
 
 @app.get("/")
 async def root():
@@ -45,7 +71,14 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "hotel-monitoring-api"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Process metrics in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 if __name__ == "__main__":
+    import uvicorn
+    
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
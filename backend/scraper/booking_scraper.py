@@ -3,17 +3,38 @@ from bs4 import BeautifulSoup
 import re
 import time
 import random
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import json
 import logging
 import os
 from urllib.parse import urlparse, parse_qs
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from extraction_telemetry import hit, instrument
+from selector_ranking import ranking
+
 logger = logging.getLogger(__name__)
 
+# Callables notified of scraper activity as observer(event, **fields):
+#   "fetch": url, status (HTTP status code or "error"), bytes, duration
+#   "parse": url, duration, rooms
+_observers: List[Callable[..., None]] = []
+
+
+def add_observer(observer: Callable[..., None]):
+    """Register a callable notified of every page fetch and parse (e.g. for metrics)."""
+    if observer not in _observers:
+        _observers.append(observer)
+
+
+def _notify(event: str, **fields):
+    for observer in _observers:
+        try:
+            observer(event, **fields)
+        except Exception as e:
+            logger.warning(f"Scraper observer failed on {event}: {e}")
+
+
 class BookingScraper:
     def __init__(self):
         self.session = requests.Session()
@@ -61,9 +82,9 @@ class BookingScraper:
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(soup.prettify())
             
-            print(f"Saved HTML for debugging to: {filepath}")
+            logger.debug("Saved HTML for debugging to %s", filepath, extra={'url': url})
         except Exception as e:
-            print(f"Failed to save HTML for debugging: {e}")
+            logger.warning(f"Failed to save HTML for debugging: {e}")
 
     def extract_hotel_data(self, url: str, check_in_date: Optional[str] = None, 
                           check_out_date: Optional[str] = None) -> Dict[str, Any]:
@@ -90,25 +111,39 @@ class BookingScraper:
             if final_check_in and final_check_out:
                 url = self._add_dates_to_url(url, final_check_in, final_check_out)
             
-            logger.info(f"Scraping hotel data from: {url}")
-            logger.info(f"Check-in: {final_check_in}, Check-out: {final_check_out}")
-            if guest_info:
-                logger.info(f"Guest info: {guest_info}")
+            logger.info(
+                "Scraping hotel page",
+                extra={'url': url, 'check_in': final_check_in, 'check_out': final_check_out, 'guests': guest_info}
+            )
             
             # Make request
             headers = self._add_headers(url)
-            response = self.session.get(url, headers=headers, timeout=30)
+            fetch_start = time.perf_counter()
+            try:
+                response = self.session.get(url, headers=headers, timeout=30)
+            except requests.RequestException:
+                _notify('fetch', url=url, status='error', bytes=0, duration=time.perf_counter() - fetch_start)
+                raise
+            _notify(
+                'fetch', url=url, status=response.status_code, bytes=len(response.content),
+                duration=time.perf_counter() - fetch_start
+            )
             response.raise_for_status()
             
             # Parse HTML
+            parse_start = time.perf_counter()
             soup = BeautifulSoup(response.content, 'html.parser')
             
-            # Save HTML for debugging
-            self._save_html_for_debugging(soup, url)
+            # Save HTML for debugging (a full page write per scrape, so only at DEBUG level)
+            if logger.isEnabledFor(logging.DEBUG):
+                self._save_html_for_debugging(soup, url)
             
             # Extract data from hotel page
-            print("=== Extracting from HOTEL page ===")
             result = self._extract_from_hotel_page(soup, url)
+            _notify(
+                'parse', url=url, duration=time.perf_counter() - parse_start,
+                rooms=len(result.get('rooms_data') or [])
+            )
             
             # Add extracted dates and guest info to result
             if final_check_in:
@@ -128,6 +163,7 @@ class BookingScraper:
                 'scraped_at': datetime.now().isoformat()
             }
     
+    @instrument
     def _extract_dates_from_url(self, url: str) -> tuple[Optional[str], Optional[str], Optional[dict]]:
         """Extract check-in, check-out dates and guest info from URL parameters."""
         try:
@@ -149,7 +185,7 @@ class BookingScraper:
             if 'req_children' in params:
                 guest_info['children'] = int(params['req_children'][0])
             
-            print(f"Extracted from URL - Check-in: {check_in}, Check-out: {check_out}, Guests: {guest_info}")
+            logger.debug("Extracted from URL - Check-in: %s, Check-out: %s, Guests: %s", check_in, check_out, guest_info)
             
             return check_in, check_out, guest_info if guest_info else None
             
@@ -157,14 +193,12 @@ class BookingScraper:
             logger.warning(f"Error extracting dates from URL: {e}")
             return None, None, None
     
+    @instrument
     def _extract_from_hotel_page(self, soup: BeautifulSoup, url: str) -> Dict[str, Any]:
         """Extract data from individual hotel page."""
         try:
-            print(f"\n=== Extracting data from hotel page: {url} ===")
-            
             # Extract hotel name
             name = self._extract_hotel_name(soup)
-            print(f"Extracted name: {name}")
             
             # Extract JSON data first (more reliable)
             json_data = self._extract_json_data(soup)
@@ -173,52 +207,38 @@ class BookingScraper:
             
             # Extract address and location (use JSON data as fallback)
             address = self._extract_address(soup) or json_data.get('address')
-            print(f"Extracted address: {address}")
             
             city = self._extract_city(soup) or json_data.get('city')
-            print(f"Extracted city: {city}")
             
             country = self._extract_country(soup) or json_data.get('country')
-            print(f"Extracted country: {country}")
             
             # Extract ratings
             star_rating = self._extract_star_rating(soup)
-            print(f"Extracted star rating: {star_rating}")
             
             user_rating = self._extract_user_rating(soup) or json_review_score
-            print(f"Extracted user rating: {user_rating}")
             
             user_rating_count = self._extract_rating_count(soup)
-            print(f"Extracted rating count: {user_rating_count}")
             
             # Extract amenities (use JSON data as fallback)
             amenities = self._extract_amenities(soup) or json_amenities
-            print(f"Extracted amenities: {amenities}")
             
             # Extract coordinates
             latitude = self._extract_latitude(soup)
-            print(f"Extracted latitude: {latitude}")
             
             longitude = self._extract_longitude(soup)
-            print(f"Extracted longitude: {longitude}")
             
             # Extract price
             price = self._extract_price(soup)
-            print(f"Extracted price: {price}")
             
             currency = self._extract_currency(soup)
-            print(f"Extracted currency: {currency}")
             
             # Extract room and board info
             room_type = self._extract_room_type(soup)
-            print(f"Extracted room type: {room_type}")
             
             board_type = self._extract_board_type(soup)
-            print(f"Extracted board type: {board_type}")
             
             # Extract multiple room types and prices
             rooms_data = self._extract_room_types_and_prices(soup)
-            print(f"Extracted rooms data: {rooms_data}")
             
             result = {
                 'type': 'hotel_page',
@@ -241,7 +261,10 @@ class BookingScraper:
                 'scraped_at': datetime.now().isoformat()
             }
             
-            print(f"=== Final result: {result} ===")
+            logger.debug(
+                "Extracted hotel page: %s, %d rooms", name, len(rooms_data or []),
+                extra={'url': url, 'missing_fields': [field for field, value in result.items() if value is None]}
+            )
             return result
             
         except Exception as e:
@@ -253,6 +276,7 @@ class BookingScraper:
                 'scraped_at': datetime.now().isoformat()
             }
     
+    @instrument
     def _extract_price(self, soup: BeautifulSoup) -> Optional[float]:
         """Extract current price."""
         try:
@@ -280,7 +304,8 @@ class BookingScraper:
                 '.b5cd09854e.d10a6220b4.e46e88563a'   # Price class
             ]
             
-            for selector in selectors:
+            attempts = ranking.attempts("_extract_price", selectors)
+            for selector in attempts:
                 elements = soup.select(selector)
                 for element in elements:
                     text = element.get_text(strip=True)
@@ -288,7 +313,8 @@ class BookingScraper:
                         # Extract number from price text
                         price = self._extract_price_from_text(text)
                         if price:
-                            print(f"Found price with selector '{selector}': {price}")
+                            logger.debug("Found price with selector '%s': %s", selector, price)
+                            attempts.hit(selector)
                             return price
             
             # Try to find price in any element containing currency symbols
@@ -301,22 +327,25 @@ class BookingScraper:
                 r'(\d+)\s*£'
             ]
             
-            for pattern in currency_patterns:
+            pattern_attempts = ranking.attempts("_extract_price", currency_patterns, kind="pattern")
+            for pattern in pattern_attempts:
                 matches = soup.find_all(text=re.compile(pattern))
                 for match in matches:
                     if match.parent:
                         text = match.parent.get_text(strip=True)
                         price = self._extract_price_from_text(text)
                         if price:
-                            print(f"Found price with currency pattern: {price}")
+                            logger.debug("Found price with currency pattern: %s", price)
+                            pattern_attempts.hit(pattern)
                             return price
             
-            print("No price found")
+            logger.debug("No price found")
             return None
         except Exception as e:
             logger.warning(f"Error extracting price: {e}")
             return None
     
+    @instrument
     def _extract_price_from_json(self, soup: BeautifulSoup) -> Optional[float]:
         """Extract price from JSON data embedded in the HTML."""
         try:
@@ -344,6 +373,7 @@ class BookingScraper:
                         if match:
                             price = float(match.group(1))
                             if price > 0 and price < 10000:  # Reasonable price range
+                                hit(f"pattern:{pattern}")
                                 return price
             
             return None
@@ -351,6 +381,7 @@ class BookingScraper:
             logger.warning(f"Error extracting price from JSON: {e}")
             return None
     
+    @instrument
     def _extract_room_types_and_prices(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
         """Extract multiple room types with their prices."""
         try:
@@ -359,13 +390,15 @@ class BookingScraper:
             # Try to extract from room selection table FIRST (most reliable)
             table_rooms = self._extract_rooms_from_selection_table(soup)
             if table_rooms:
-                print(f"Found {len(table_rooms)} rooms in selection table")
+                logger.debug("Found %d rooms in selection table", len(table_rooms))
+                hit("selection_table")
                 return table_rooms
             
             # Try to extract from JSON data as fallback
             json_rooms = self._extract_room_types_from_json(soup)
             if json_rooms:
-                print(f"Found {len(json_rooms)} rooms in JSON data")
+                logger.debug("Found %d rooms in JSON data", len(json_rooms))
+                hit("json")
                 return json_rooms
             
             # Try HTML selectors for room cards - use more specific selectors
@@ -384,10 +417,12 @@ class BookingScraper:
                 # '[class*="room"]'  # Removed this as it's too broad
             ]
             
-            for selector in room_selectors:
+            # Nested cards match several selectors, so the first selector that yields rooms wins
+            attempts = ranking.attempts("_extract_room_types_and_prices", room_selectors)
+            for selector in attempts:
                 room_elements = soup.select(selector)
                 if room_elements:
-                    print(f"Found {len(room_elements)} room elements with selector '{selector}'")
+                    logger.debug("Found %d room elements with selector '%s'", len(room_elements), selector)
                     
                     for room_element in room_elements:
                         try:
@@ -409,11 +444,15 @@ class BookingScraper:
                                     'currency': 'EUR'  # Default
                                 }
                                 rooms_data.append(room_data)
-                                print(f"Extracted room: {room_type} - {price} EUR")
+                                logger.debug("Extracted room: %s - %s EUR", room_type, price)
                         
                         except Exception as e:
                             logger.warning(f"Error extracting room data: {e}")
                             continue
+                
+                if rooms_data:
+                    attempts.hit(selector)
+                    break
             
             return rooms_data
             
@@ -421,6 +460,7 @@ class BookingScraper:
             logger.warning(f"Error extracting room types and prices: {e}")
             return []
     
+    @instrument
     def _extract_rooms_from_selection_table(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
         """Extract room types and prices from the room selection table."""
         try:
@@ -430,7 +470,7 @@ class BookingScraper:
             price_elements = soup.find_all(attrs={'data-hotel-rounded-price': True})
             
             if price_elements:
-                print(f"Found {len(price_elements)} elements with data-hotel-rounded-price attribute")
+                logger.debug("Found %d elements with data-hotel-rounded-price attribute", len(price_elements))
                 
                 for price_element in price_elements:
                     try:
@@ -448,13 +488,15 @@ class BookingScraper:
                             room_span = next_element.find('span', class_='hprt-roomtype-icon-link')
                             if room_span:
                                 room_type = room_span.get_text(strip=True)
-                                print(f"Found room type: {room_type}")
+                                logger.debug("Found room type: %s", room_type)
+                                hit("room_type:sibling_child")
                                 break
                             
                             # Check if this element itself is the room type span
                             if next_element.name == 'span' and 'hprt-roomtype-icon-link' in next_element.get('class', []):
                                 room_type = next_element.get_text(strip=True)
-                                print(f"Found room type: {room_type}")
+                                logger.debug("Found room type: %s", room_type)
+                                hit("room_type:sibling")
                                 break
                             
                             # Move to next sibling
@@ -467,7 +509,8 @@ class BookingScraper:
                                 room_span = container.find('span', class_='hprt-roomtype-icon-link')
                                 if room_span:
                                     room_type = room_span.get_text(strip=True)
-                                    print(f"Found room type in container: {room_type}")
+                                    logger.debug("Found room type in container: %s", room_type)
+                                    hit("room_type:container")
                         
                         # Only add if we have both price and room type
                         if price and room_type:
@@ -478,19 +521,20 @@ class BookingScraper:
                                 'currency': 'EUR'  # Default
                             }
                             rooms_data.append(room_data)
-                            print(f"Extracted room: {room_type} - {price} EUR")
+                            logger.debug("Extracted room: %s - %s EUR", room_type, price)
                     
                     except Exception as e:
-                        print(f"Error extracting room from price element: {e}")
+                        logger.warning(f"Error extracting room from price element: {e}")
                         continue
             
-            print(f"Total rooms extracted: {len(rooms_data)}")
+            logger.debug("Total rooms extracted: %d", len(rooms_data))
             return rooms_data
             
         except Exception as e:
             logger.error(f"Error extracting rooms from selection table: {e}")
             return []
     
+    @instrument
     def _extract_room_type_from_element(self, element) -> Optional[str]:
         """Extract room type from a specific element."""
         try:
@@ -506,7 +550,8 @@ class BookingScraper:
                 '[class*="room"]'
             ]
             
-            for selector in selectors:
+            attempts = ranking.attempts("_extract_room_type_from_element", selectors)
+            for selector in attempts:
                 room_element = element.select_one(selector)
                 if room_element:
                     room_type = room_element.get_text(strip=True)
@@ -529,6 +574,7 @@ class BookingScraper:
                         ]
                         
                         if any(keyword in room_type.lower() for keyword in valid_room_keywords):
+                            attempts.hit(selector)
                             return room_type
             
             return None
@@ -536,6 +582,7 @@ class BookingScraper:
             logger.warning(f"Error extracting room type from element: {e}")
             return None
     
+    @instrument
     def _extract_price_from_element(self, element) -> Optional[float]:
         """Extract price from a specific element."""
         try:
@@ -549,13 +596,15 @@ class BookingScraper:
                 '.b5cd09854e'  # Common Booking.com price class
             ]
             
-            for selector in selectors:
+            attempts = ranking.attempts("_extract_price_from_element", selectors)
+            for selector in attempts:
                 price_element = element.select_one(selector)
                 if price_element:
                     text = price_element.get_text(strip=True)
                     if text:
                         price = self._extract_price_from_text(text)
                         if price:
+                            attempts.hit(selector)
                             return price
             
             return None
@@ -563,6 +612,7 @@ class BookingScraper:
             logger.warning(f"Error extracting price from element: {e}")
             return None
     
+    @instrument
     def _extract_board_type_from_element(self, element) -> Optional[str]:
         """Extract board type from a specific element."""
         try:
@@ -576,11 +626,13 @@ class BookingScraper:
                 '[class*="meal"]'
             ]
             
-            for selector in selectors:
+            attempts = ranking.attempts("_extract_board_type_from_element", selectors)
+            for selector in attempts:
                 board_element = element.select_one(selector)
                 if board_element:
                     board_type = board_element.get_text(strip=True)
                     if board_type and len(board_type) < 50:
+                        attempts.hit(selector)
                         return board_type
             
             return None
@@ -588,6 +640,7 @@ class BookingScraper:
             logger.warning(f"Error extracting board type from element: {e}")
             return None
 
+    @instrument
     def _extract_price_from_text(self, price_text: str) -> Optional[float]:
         """Extract numeric price from text."""
         if not price_text:
@@ -599,6 +652,7 @@ class BookingScraper:
             return float(price_match.group())
         return None
     
+    @instrument
     def _extract_rating_from_text(self, rating_text: str) -> Optional[float]:
         """Extract numeric rating from text."""
         if not rating_text:
@@ -632,13 +686,15 @@ class BookingScraper:
         
         return url
     
+    @instrument
     def _extract_hotel_name(self, soup: BeautifulSoup) -> Optional[str]:
         """Extract hotel name from the page."""
         try:
             # First try to extract from JSON data (cleaner name)
             json_name = self._extract_hotel_name_from_json(soup)
             if json_name:
-                print(f"Found hotel name in JSON: {json_name}")
+                logger.debug("Found hotel name in JSON: %s", json_name)
+                hit("json")
                 return json_name
             
             # Try multiple selectors for hotel name
@@ -652,14 +708,16 @@ class BookingScraper:
                 '.hp__hotel-name'
             ]
             
-            for selector in selectors:
+            attempts = ranking.attempts("_extract_hotel_name", selectors)
+            for selector in attempts:
                 element = soup.select_one(selector)
                 if element:
                     name = element.get_text(strip=True)
                     if name and len(name) > 3:
                         # Clean up the name - remove extra text like "(updated prices 2025)"
                         clean_name = self._clean_hotel_name(name)
-                        print(f"Found hotel name with selector '{selector}': {clean_name}")
+                        logger.debug("Found hotel name with selector '%s': %s", selector, clean_name)
+                        attempts.hit(selector)
                         return clean_name
             
             # Try to find any h1 or h2 with hotel-like text
@@ -669,15 +727,17 @@ class BookingScraper:
                     text = element.get_text(strip=True)
                     if text and ('hotel' in text.lower() or 'hostel' in text.lower() or 'inn' in text.lower()):
                         clean_name = self._clean_hotel_name(text)
-                        print(f"Found hotel name in {tag}: {clean_name}")
+                        logger.debug("Found hotel name in %s: %s", tag, clean_name)
+                        hit(f"tag:{tag}")
                         return clean_name
             
-            print("No hotel name found")
+            logger.debug("No hotel name found")
             return None
         except Exception as e:
             logger.warning(f"Error extracting hotel name: {e}")
             return None
     
+    @instrument
     def _extract_hotel_name_from_json(self, soup: BeautifulSoup) -> Optional[str]:
         """Extract hotel name from JSON data embedded in the HTML."""
         try:
@@ -702,6 +762,7 @@ class BookingScraper:
                             if name and len(name) > 3:
                                 # Clean up the name
                                 clean_name = self._clean_hotel_name(name)
+                                hit(f"pattern:{pattern}")
                                 return clean_name
             
             return None
@@ -734,6 +795,7 @@ class BookingScraper:
         
         return clean_name
     
+    @instrument
     def _extract_address(self, soup: BeautifulSoup) -> Optional[str]:
         """Extract hotel address."""
         try:
@@ -750,26 +812,30 @@ class BookingScraper:
                 '.hotel-address'
             ]
             
-            for selector in selectors:
+            attempts = ranking.attempts("_extract_address", selectors)
+            for selector in attempts:
                 element = soup.select_one(selector)
                 if element:
                     address = element.get_text(strip=True)
                     if address and len(address) > 5:
-                        print(f"Found address with selector '{selector}': {address}")
+                        logger.debug("Found address with selector '%s': %s", selector, address)
+                        attempts.hit(selector)
                         return address
             
             # Try to find address in meta tags
             meta_address = soup.find('meta', {'property': 'og:street-address'})
             if meta_address and meta_address.get('content'):
-                print(f"Found address in meta tag: {meta_address['content']}")
+                logger.debug("Found address in meta tag: %s", meta_address['content'])
+                hit("meta")
                 return meta_address['content']
             
-            print("No address found")
+            logger.debug("No address found")
             return None
         except Exception as e:
             logger.warning(f"Error extracting address: {e}")
             return None
     
+    @instrument
     def _extract_city(self, soup: BeautifulSoup) -> Optional[str]:
         """Extract city from address or breadcrumb."""
         try:
@@ -782,27 +848,31 @@ class BookingScraper:
                 '.breadcrumbs'
             ]
             
-            for selector in breadcrumb_selectors:
+            attempts = ranking.attempts("_extract_city", breadcrumb_selectors, kind="breadcrumb")
+            for selector in attempts:
                 breadcrumb = soup.select_one(selector)
                 if breadcrumb:
                     links = breadcrumb.find_all('a')
                     if len(links) >= 2:
                         city = links[1].get_text(strip=True)
-                        print(f"Found city in breadcrumb: {city}")
+                        logger.debug("Found city in breadcrumb: %s", city)
+                        attempts.hit(selector)
                         return city
             
             # Try to find city in meta tags
             meta_city = soup.find('meta', {'property': 'og:locality'})
             if meta_city and meta_city.get('content'):
-                print(f"Found city in meta tag: {meta_city['content']}")
+                logger.debug("Found city in meta tag: %s", meta_city['content'])
+                hit("meta")
                 return meta_city['content']
             
-            print("No city found")
+            logger.debug("No city found")
             return None
         except Exception as e:
             logger.warning(f"Error extracting city: {e}")
             return None
     
+    @instrument
     def _extract_country(self, soup: BeautifulSoup) -> Optional[str]:
         """Extract country from breadcrumb or address."""
         try:
@@ -815,27 +885,31 @@ class BookingScraper:
                 '.breadcrumbs'
             ]
             
-            for selector in breadcrumb_selectors:
+            attempts = ranking.attempts("_extract_country", breadcrumb_selectors, kind="breadcrumb")
+            for selector in attempts:
                 breadcrumb = soup.select_one(selector)
                 if breadcrumb:
                     links = breadcrumb.find_all('a')
                     if len(links) >= 3:
                         country = links[-1].get_text(strip=True)
-                        print(f"Found country in breadcrumb: {country}")
+                        logger.debug("Found country in breadcrumb: %s", country)
+                        attempts.hit(selector)
                         return country
             
             # Try to find country in meta tags
             meta_country = soup.find('meta', {'property': 'og:country-name'})
             if meta_country and meta_country.get('content'):
-                print(f"Found country in meta tag: {meta_country['content']}")
+                logger.debug("Found country in meta tag: %s", meta_country['content'])
+                hit("meta")
                 return meta_country['content']
             
-            print("No country found")
+            logger.debug("No country found")
             return None
         except Exception as e:
             logger.warning(f"Error extracting country: {e}")
             return None
     
+    @instrument
     def _extract_star_rating(self, soup: BeautifulSoup) -> Optional[float]:
         """Extract star rating."""
         try:
@@ -848,7 +922,8 @@ class BookingScraper:
                 '[aria-label*="star"]'
             ]
             
-            for selector in selectors:
+            attempts = ranking.attempts("_extract_star_rating", selectors)
+            for selector in attempts:
                 element = soup.select_one(selector)
                 if element:
                     text = element.get_text(strip=True)
@@ -856,7 +931,8 @@ class BookingScraper:
                     match = re.search(r'(\d+)', text)
                     if match:
                         stars = float(match.group(1))
-                        print(f"Found star rating with selector '{selector}': {stars}")
+                        logger.debug("Found star rating with selector '%s': %s", selector, stars)
+                        attempts.hit(selector)
                         return stars
             
             # Try to find stars in aria-label
@@ -866,15 +942,17 @@ class BookingScraper:
                 match = re.search(r'(\d+)', aria_label)
                 if match:
                     stars = float(match.group(1))
-                    print(f"Found star rating in aria-label: {stars}")
+                    logger.debug("Found star rating in aria-label: %s", stars)
+                    hit("aria-label")
                     return stars
             
-            print("No star rating found")
+            logger.debug("No star rating found")
             return None
         except Exception as e:
             logger.warning(f"Error extracting star rating: {e}")
             return None
     
+    @instrument
     def _extract_user_rating(self, soup: BeautifulSoup) -> Optional[float]:
         """Extract user rating score."""
         try:
@@ -888,7 +966,8 @@ class BookingScraper:
                 '.hp__hotel-rating'
             ]
             
-            for selector in selectors:
+            attempts = ranking.attempts("_extract_user_rating", selectors)
+            for selector in attempts:
                 element = soup.select_one(selector)
                 if element:
                     text = element.get_text(strip=True)
@@ -899,7 +978,8 @@ class BookingScraper:
                         # Normalize to 0-10 scale if needed
                         if rating > 10:
                             rating = rating / 10
-                        print(f"Found user rating with selector '{selector}': {rating}")
+                        logger.debug("Found user rating with selector '%s': %s", selector, rating)
+                        attempts.hit(selector)
                         return rating
             
             # Try to find rating in data attributes
@@ -912,15 +992,17 @@ class BookingScraper:
                     rating = float(match.group(1))
                     if rating > 10:
                         rating = rating / 10
-                    print(f"Found user rating in review-score: {rating}")
+                    logger.debug("Found user rating in review-score: %s", rating)
+                    hit("review-score")
                     return rating
             
-            print("No user rating found")
+            logger.debug("No user rating found")
             return None
         except Exception as e:
             logger.warning(f"Error extracting user rating: {e}")
             return None
     
+    @instrument
     def _extract_rating_count(self, soup: BeautifulSoup) -> Optional[int]:
         """Extract number of reviews."""
         try:
@@ -932,7 +1014,8 @@ class BookingScraper:
                 '.reviews-count'
             ]
             
-            for selector in selectors:
+            attempts = ranking.attempts("_extract_rating_count", selectors)
+            for selector in attempts:
                 element = soup.select_one(selector)
                 if element:
                     text = element.get_text(strip=True)
@@ -941,7 +1024,8 @@ class BookingScraper:
                     if match:
                         count_str = match.group(1).replace(',', '')
                         count = int(count_str)
-                        print(f"Found rating count with selector '{selector}': {count}")
+                        logger.debug("Found rating count with selector '%s': %s", selector, count)
+                        attempts.hit(selector)
                         return count
             
             # Try to find reviews count in the same area as rating
@@ -955,15 +1039,17 @@ class BookingScraper:
                     if match:
                         count_str = match.group(1).replace(',', '')
                         count = int(count_str)
-                        print(f"Found rating count near review-score: {count}")
+                        logger.debug("Found rating count near review-score: %s", count)
+                        hit("review-score")
                         return count
             
-            print("No rating count found")
+            logger.debug("No rating count found")
             return None
         except Exception as e:
             logger.warning(f"Error extracting rating count: {e}")
             return None
     
+    @instrument
     def _extract_amenities(self, soup: BeautifulSoup) -> List[str]:
         """Extract hotel amenities."""
         amenities = []
@@ -981,7 +1067,8 @@ class BookingScraper:
                 '[data-testid="amenity-icon"]'
             ]
             
-            for selector in selectors:
+            attempts = ranking.attempts("_extract_amenities", selectors)
+            for selector in attempts:
                 elements = soup.select(selector)
                 for element in elements:
                     # Try to get text from the element or its parent
@@ -996,18 +1083,20 @@ class BookingScraper:
                         amenities.append(amenity_text)
                 
                 if amenities:
-                    print(f"Found {len(amenities)} amenities with selector '{selector}'")
+                    logger.debug("Found %d amenities with selector '%s'", len(amenities), selector)
+                    attempts.hit(selector)
                     break
             
             # Remove duplicates and clean
             amenities = list(set(amenities))
-            print(f"Total unique amenities found: {len(amenities)}")
+            logger.debug("Total unique amenities found: %d", len(amenities))
             return amenities[:20]  # Limit to 20 amenities
             
         except Exception as e:
             logger.warning(f"Error extracting amenities: {e}")
             return []
     
+    @instrument
     def _extract_latitude(self, soup: BeautifulSoup) -> Optional[float]:
         """Extract latitude from page."""
         try:
@@ -1018,6 +1107,7 @@ class BookingScraper:
                     # Look for latitude in JSON data
                     match = re.search(r'"latitude":\s*([\d.-]+)', script.string)
                     if match:
+                        hit("script")
                         return float(match.group(1))
             
             return None
@@ -1025,6 +1115,7 @@ class BookingScraper:
             logger.warning(f"Error extracting latitude: {e}")
             return None
     
+    @instrument
     def _extract_longitude(self, soup: BeautifulSoup) -> Optional[float]:
         """Extract longitude from page."""
         try:
@@ -1035,6 +1126,7 @@ class BookingScraper:
                     # Look for longitude in JSON data
                     match = re.search(r'"longitude":\s*([\d.-]+)', script.string)
                     if match:
+                        hit("script")
                         return float(match.group(1))
             
             return None
@@ -1042,6 +1134,7 @@ class BookingScraper:
             logger.warning(f"Error extracting longitude: {e}")
             return None
     
+    @instrument
     def _extract_currency(self, soup: BeautifulSoup) -> str:
         """Extract currency symbol."""
         try:
@@ -1051,11 +1144,14 @@ class BookingScraper:
                 '[class*="price"]'
             ]
             
-            for selector in selectors:
+            attempts = ranking.attempts("_extract_currency", selectors)
+            for selector in attempts:
                 element = soup.select_one(selector)
                 if element:
                     text = element.get_text(strip=True)
                     # Look for currency symbols
+                    if any(symbol in text for symbol in '€$£'):
+                        attempts.hit(selector)
                     if '€' in text:
                         return 'EUR'
                     elif '$' in text:
@@ -1063,11 +1159,13 @@ class BookingScraper:
                     elif '£' in text:
                         return 'GBP'
             
+            hit("default")
             return 'EUR'  # Default
         except Exception as e:
             logger.warning(f"Error extracting currency: {e}")
             return 'EUR'
     
+    @instrument
     def _extract_room_type(self, soup: BeautifulSoup) -> Optional[str]:
         """Extract room type."""
         try:
@@ -1079,18 +1177,22 @@ class BookingScraper:
                 '.room-name'
             ]
             
-            for selector in selectors:
+            attempts = ranking.attempts("_extract_room_type", selectors)
+            for selector in attempts:
                 element = soup.select_one(selector)
                 if element:
                     room_type = element.get_text(strip=True)
                     if room_type and len(room_type) < 100:  # Avoid huge strings
-                        print(f"Found room type with selector '{selector}': {room_type}")
+                        logger.debug("Found room type with selector '%s': %s", selector, room_type)
+                        attempts.hit(selector)
                         return room_type
             
             # Try to extract from the page title or breadcrumb
             title = soup.find('title')
             if title:
                 title_text = title.get_text(strip=True)
+                if any(word in title_text.lower() for word in ('single', 'double', 'twin', 'suite')):
+                    hit("title")
                 # Look for room type in title
                 if 'single' in title_text.lower():
                     return 'Single Room'
@@ -1101,12 +1203,13 @@ class BookingScraper:
                 elif 'suite' in title_text.lower():
                     return 'Suite'
             
-            print("No room type found")
+            logger.debug("No room type found")
             return None
         except Exception as e:
             logger.warning(f"Error extracting room type: {e}")
             return None
     
+    @instrument
     def _extract_board_type(self, soup: BeautifulSoup) -> Optional[str]:
         """Extract board type (breakfast, half-board, etc.)."""
         try:
@@ -1121,31 +1224,36 @@ class BookingScraper:
                 '.meal-info'
             ]
             
-            for selector in selectors:
+            attempts = ranking.attempts("_extract_board_type", selectors)
+            for selector in attempts:
                 element = soup.select_one(selector)
                 if element:
                     board_type = element.get_text(strip=True)
                     if board_type and len(board_type) < 50:  # Avoid huge strings
-                        print(f"Found board type with selector '{selector}': {board_type}")
+                        logger.debug("Found board type with selector '%s': %s", selector, board_type)
+                        attempts.hit(selector)
                         return board_type
             
             # Try to find breakfast information in text
             breakfast_keywords = ['breakfast', 'meal', 'board', 'dining']
-            for keyword in breakfast_keywords:
+            keyword_attempts = ranking.attempts("_extract_board_type", breakfast_keywords, kind="keyword")
+            for keyword in keyword_attempts:
                 elements = soup.find_all(text=re.compile(keyword, re.IGNORECASE))
                 for element in elements:
                     if element.parent:
                         text = element.parent.get_text(strip=True)
                         if len(text) < 100 and keyword in text.lower():
-                            print(f"Found board type with keyword '{keyword}': {text}")
+                            logger.debug("Found board type with keyword '%s': %s", keyword, text)
+                            keyword_attempts.hit(keyword)
                             return text
             
-            print("No board type found")
+            logger.debug("No board type found")
             return None
         except Exception as e:
             logger.warning(f"Error extracting board type: {e}")
             return None
 
+    @instrument
     def _extract_json_data(self, soup: BeautifulSoup) -> Dict[str, Any]:
         """Extract hotel data from JSON embedded in the HTML."""
         try:
@@ -1160,7 +1268,8 @@ class BookingScraper:
                     address_match = re.search(r'"formattedAddress":"([^"]+)"', script_text)
                     if address_match:
                         address = address_match.group(1)
-                        print(f"Found address in JSON: {address}")
+                        logger.debug("Found address in JSON: %s", address)
+                        hit("formattedAddress")
                         
                         # Extract city and country from address
                         parts = address.split(',')
@@ -1200,6 +1309,7 @@ class BookingScraper:
             logger.warning(f"Error extracting JSON data: {e}")
             return {}
     
+    @instrument
     def _extract_review_score_from_json(self, soup: BeautifulSoup) -> Optional[float]:
         """Extract review score from JSON data."""
         try:
@@ -1221,7 +1331,8 @@ class BookingScraper:
                         match = re.search(pattern, script_text)
                         if match:
                             score = float(match.group(1))
-                            print(f"Found review score in JSON: {score}")
+                            logger.debug("Found review score in JSON: %s", score)
+                            hit(f"pattern:{pattern}")
                             return score
             
             return None
@@ -1229,6 +1340,7 @@ class BookingScraper:
             logger.warning(f"Error extracting review score from JSON: {e}")
             return None
     
+    @instrument
     def _extract_amenities_from_json(self, soup: BeautifulSoup) -> List[str]:
         """Extract amenities from JSON data."""
         try:
@@ -1253,16 +1365,18 @@ class BookingScraper:
                         for match in matches:
                             if match and len(match) > 2 and match not in amenities:
                                 amenities.append(match)
+                                hit(f"pattern:{pattern}")
             
             # Remove duplicates and clean
             amenities = list(set(amenities))
-            print(f"Found {len(amenities)} amenities in JSON")
+            logger.debug("Found %d amenities in JSON", len(amenities))
             return amenities[:20]  # Limit to 20
             
         except Exception as e:
             logger.warning(f"Error extracting amenities from JSON: {e}")
             return []
     
+    @instrument
     def _extract_board_type_from_json(self, soup: BeautifulSoup) -> Optional[str]:
         """Extract board type from JSON data."""
         try:
@@ -1286,12 +1400,14 @@ class BookingScraper:
                                 # Handle tuple matches
                                 for item in match:
                                     if item and len(item) > 3:
-                                        print(f"Found board type in JSON: {item}")
+                                        logger.debug("Found board type in JSON: %s", item)
+                                        hit(f"pattern:{pattern}")
                                         return item
                             else:
                                 # Handle string matches
                                 if match and len(match) > 3:
-                                    print(f"Found board type in JSON: {match}")
+                                    logger.debug("Found board type in JSON: %s", match)
+                                    hit(f"pattern:{pattern}")
                                     return match
             
             return None
@@ -1299,6 +1415,7 @@ class BookingScraper:
             logger.warning(f"Error extracting board type from JSON: {e}")
             return None
     
+    @instrument
     def _extract_room_types_from_json(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
         """Extract room types and prices from JSON data."""
         try:
@@ -1341,6 +1458,7 @@ class BookingScraper:
                                         try:
                                             price = float(price_match.group(1))
                                             if price > 0 and price < 10000:
+                                                hit(f"pattern:{pattern}")
                                                 rooms_data.append({
                                                     'room_type': room_type,
                                                     'price': price,
@@ -1357,6 +1475,7 @@ class BookingScraper:
                                 try:
                                     price = float(match[1])
                                     if price > 0 and price < 10000:
+                                        hit(f"pattern:{pattern}")
                                         rooms_data.append({
                                             'room_type': room_type,
                                             'price': price,
@@ -1374,6 +1493,7 @@ class BookingScraper:
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     scraper = BookingScraper()
     
     # Example search results URL
@@ -0,0 +1,136 @@
+"""
+In-memory telemetry for the scraper's extraction fallback chains.
+
+Every `_extract_*` method of `BookingScraper` is wrapped with `instrument`, which
+records its wall time and whether it returned nothing. Inside an extractor, `hit`
+names the selector, pattern or fallback that produced the value, so the stats show
+which branches of each chain actually succeed (and which are dead weight), and a
+drop in a hit rate points at a Booking.com layout change.
+
+Stats are per process and reset on restart or with `telemetry.reset()`.
+"""
+
+import functools
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List
+
+# Source recorded when an extractor returns a value without naming where it came from
+UNATTRIBUTED = "unattributed"
+
+
+def _is_empty(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, tuple):
+        return all(item is None for item in value)
+    if isinstance(value, (list, dict, str)):
+        return len(value) == 0
+    return False
+
+
+class _ExtractorStats:
+    __slots__ = ("calls", "empty", "errors", "total_seconds", "max_seconds", "sources")
+
+    def __init__(self):
+        self.calls = 0
+        self.empty = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.sources: Counter = Counter()
+
+
+class ExtractionTelemetry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _ExtractorStats] = {}
+        self._local = threading.local()
+        self.started_at = time.time()
+
+    def _frames(self) -> List[List[str]]:
+        frames = getattr(self._local, "frames", None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def instrument(self, func: Callable) -> Callable:
+        """Decorator recording timing, empty results and hit sources of an extractor."""
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            frames = self._frames()
+            sources: List[str] = []
+            frames.append(sources)
+            start = time.perf_counter()
+            failed = False
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            except Exception:
+                failed = True
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                frames.pop()
+                self._record(name, elapsed, failed, _is_empty(result), sources)
+
+        return wrapper
+
+    def hit(self, source: str):
+        """Name the selector/pattern/fallback that produced (part of) the current extractor's value."""
+        frames = self._frames()
+        if frames and source not in frames[-1]:
+            frames[-1].append(source)
+
+    def _record(self, name: str, elapsed: float, failed: bool, empty: bool, sources: List[str]):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = _ExtractorStats()
+            stats.calls += 1
+            stats.total_seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+            if failed:
+                stats.errors += 1
+            elif empty:
+                stats.empty += 1
+            else:
+                stats.sources.update(sources or [UNATTRIBUTED])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-extractor calls, null rate, timing and hit rate of each source, slowest first."""
+        with self._lock:
+            items = [(name, stats, dict(stats.sources)) for name, stats in self._stats.items()]
+
+        extractors = {}
+        for name, stats, sources in sorted(items, key=lambda item: item[1].total_seconds, reverse=True):
+            extractors[name] = {
+                'calls': stats.calls,
+                'null_rate': round(stats.empty / stats.calls, 4),
+                'error_rate': round(stats.errors / stats.calls, 4),
+                'total_ms': round(stats.total_seconds * 1000, 2),
+                'avg_ms': round(stats.total_seconds * 1000 / stats.calls, 3),
+                'max_ms': round(stats.max_seconds * 1000, 3),
+                'sources': {
+                    source: {'hits': hits, 'hit_rate': round(hits / stats.calls, 4)}
+                    for source, hits in sorted(sources.items(), key=lambda item: -item[1])
+                }
+            }
+        return {
+            'since': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+            'extractors': extractors
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.started_at = time.time()
+
+
+telemetry = ExtractionTelemetry()
+instrument = telemetry.instrument
+hit = telemetry.hit
@@ -0,0 +1,160 @@
+"""
+Adaptive ordering of the scraper's selector fallback chains.
+
+Extractors that try a list of CSS selectors (or text patterns) until one matches ask
+`ranking.attempts(...)` for the order to try them in. Each selector keeps an
+exponentially decayed hit rate; selectors that keep missing sink to the back, so
+pages stop paying for DOM queries that Booking.com's current markup no longer
+matches, and a selector that starts matching again climbs back.
+
+Source order still encodes preference: selectors are ranked by hit rate rounded to
+one decimal and ties keep their source order, so a generic selector that "always
+matches something" does not overtake an equally reliable specific one. With
+probability `SCRAPER_RANKING_EPSILON` the source order is used as is, which keeps
+re-testing demoted selectors instead of locking the ranking in.
+
+The ranking is saved to `SCRAPER_RANKING_PATH` (JSON, default
+`scraper_selector_ranking.json` in `DATA_DIR`) periodically and at exit, and loaded
+on first use.
+"""
+
+import atexit
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from extraction_telemetry import hit as record_hit
+
+logger = logging.getLogger(__name__)
+
+# Same default as the app's DATA_DIR (backend/data), which git ignores
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+RANKING_PATH = os.getenv("SCRAPER_RANKING_PATH", os.path.join(DATA_DIR, "scraper_selector_ranking.json"))
+EPSILON = float(os.getenv("SCRAPER_RANKING_EPSILON", "0.1"))
+# Weight of the latest outcome in the decayed hit rate (~ memory of the last 20 attempts)
+DECAY = 0.05
+PRIOR = 0.5
+SAVE_INTERVAL = 60.0
+
+
+class Attempts:
+    """
+    Iterator over one extractor's candidates in ranked order.
+
+    Call `hit(candidate)` when a candidate produced the value: candidates tried before
+    it count as misses. If the loop runs out without a hit, every candidate counts as
+    a miss.
+    """
+
+    def __init__(self, ranking: "SelectorRanking", chain: str, candidates: List[str], kind: str):
+        self._ranking = ranking
+        self._chain = chain
+        self._candidates = candidates
+        self._kind = kind
+        self._tried: List[str] = []
+        self._done = False
+
+    def __iter__(self) -> Iterator[str]:
+        for candidate in self._candidates:
+            if self._done:
+                return
+            self._tried.append(candidate)
+            yield candidate
+        if not self._done:
+            self._done = True
+            self._ranking.record(self._chain, {candidate: 0.0 for candidate in self._tried})
+
+    def hit(self, candidate: str):
+        record_hit(f"{self._kind}:{candidate}")
+        if self._done:
+            return
+        self._done = True
+        outcomes = {tried: 0.0 for tried in self._tried if tried != candidate}
+        outcomes[candidate] = 1.0
+        self._ranking.record(self._chain, outcomes)
+
+
+class SelectorRanking:
+    def __init__(self, path: Optional[str] = RANKING_PATH, epsilon: float = EPSILON):
+        self.path = path
+        self.epsilon = epsilon
+        self._lock = threading.Lock()
+        # chain ("<extractor>:<kind>") -> candidate -> decayed hit rate
+        self._scores: Dict[str, Dict[str, float]] = {}
+        self._loaded = False
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def _load(self):
+        self._loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self._scores = {
+                chain: {candidate: float(score) for candidate, score in scores.items()}
+                for chain, scores in data.get("scores", {}).items()
+            }
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable selector ranking {self.path}: {e}")
+
+    def order(self, chain: str, candidates: Sequence[str]) -> List[str]:
+        """Candidates by rounded hit rate, ties (and exploration rounds) in source order."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if random.random() < self.epsilon:
+                return list(candidates)
+            scores = self._scores.get(chain, {})
+            position = {candidate: index for index, candidate in enumerate(candidates)}
+            return sorted(candidates, key=lambda c: (-round(scores.get(c, PRIOR), 1), position[c]))
+
+    def attempts(self, extractor: str, candidates: Sequence[str], kind: str = "selector") -> Attempts:
+        chain = f"{extractor}:{kind}"
+        return Attempts(self, chain, self.order(chain, candidates), kind)
+
+    def record(self, chain: str, outcomes: Dict[str, float]):
+        if not outcomes:
+            return
+        with self._lock:
+            scores = self._scores.setdefault(chain, {})
+            for candidate, outcome in outcomes.items():
+                scores[candidate] = (1 - DECAY) * scores.get(candidate, PRIOR) + DECAY * outcome
+            self._dirty = True
+            due = time.monotonic() - self._last_save >= SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                chain: {candidate: round(score, 4) for candidate, score in
+                        sorted(scores.items(), key=lambda item: -item[1])}
+                for chain, scores in self._scores.items()
+            }
+
+    def save(self):
+        """Write the ranking atomically if it changed since the last save."""
+        with self._lock:
+            self._last_save = time.monotonic()
+            if not self.path or not self._dirty:
+                return
+            data = {"scores": {chain: dict(scores) for chain, scores in self._scores.items()}}
+            self._dirty = False
+        tmp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save selector ranking to {self.path}: {e}")
+
+
+ranking = SelectorRanking()
+atexit.register(ranking.save)